@@ -0,0 +1,119 @@
+import csv
+import os
+import numpy as np
+import pandas as pd
+
+# --- CONFIGURATION ---
+SYSTEM_FILE = "system_metrics.csv"
+SYSTEM_RING = "system_metrics.ring"
+TRAFFIC_FILE = "traffic_metrics.csv"
+ALIGN_TOLERANCE = 1    # Seconds an as-of match may reach back
+MAX_POINTS = 2000      # Points per plotted series after downsampling
+
+# How each column collapses into one value per second (anything else: mean)
+AGGREGATIONS = {'Tokens_Lost': 'sum', 'Replicas': 'max', 'Context_Switches': 'last', 'Network_RX_MB': 'last'}
+
+# plot_results.py inputs: positional columns when the file has no header
+RESULT_COLUMNS = ['Time_Sec', 'CPU_Load', 'Replicas']
+RESULT_ALIASES = {'Time': 'Time_Sec', 'CPU_Percent': 'CPU_Load', 'Container_CPU': 'CPU_Load', 'CPU': 'CPU_Load',
+                  'cpu': 'CPU_Load'}
+
+def load_system(run_dir='.'):
+    """ System telemetry from the logger's ring when present, else system_metrics.csv """
+    ring = os.path.join(run_dir, SYSTEM_RING)
+    if os.path.exists(ring):
+        from telemetry_ring import RingReader
+        reader = RingReader(ring)
+        columns = reader.meta.get('csv_columns') or {name: name for name in reader.dtype.names}
+        records = reader.snapshot()
+        return pd.DataFrame({col: records[field] for col, field in columns.items()})
+    return pd.read_csv(os.path.join(run_dir, SYSTEM_FILE))
+
+def load_traffic(run_dir='.'):
+    return pd.read_csv(os.path.join(run_dir, TRAFFIC_FILE))
+
+def has_header(path):
+    """ A first line that does not parse as numbers is a header """
+    with open(path, newline='') as f:
+        first = next(csv.reader(f), [])
+    try:
+        [float(v) for v in first]
+        return False
+    except ValueError:
+        return True
+
+def load_results(path):
+    """
+    A results_*.csv run with Time_Sec, CPU_Load and Replicas columns, with or without a header.
+    A header naming none of the known aliases falls back to the column order every logger writes.
+    """
+    if has_header(path):
+        df = pd.read_csv(path).rename(columns=RESULT_ALIASES)
+        if set(RESULT_COLUMNS) <= set(df.columns):
+            return df
+        return df.rename(columns=dict(zip(df.columns, RESULT_COLUMNS)))
+    df = pd.read_csv(path, header=None)
+    return df.rename(columns=dict(enumerate(RESULT_COLUMNS)))
+
+def per_second(df, time_col='Time'):
+    """ One row per whole second: gauges averaged, counts summed (see AGGREGATIONS) """
+    seconds = np.floor(df[time_col].to_numpy(dtype=np.float64)).astype(np.int64)
+    how = {c: AGGREGATIONS.get(c, 'mean') for c in df.columns if c != time_col}
+    out = df.drop(columns=time_col).groupby(seconds, sort=True).agg(how)
+    out.index.name = time_col
+    return out.reset_index()
+
+def align(sys_df, traf_df, time_col='Time', tolerance=ALIGN_TOLERANCE, traffic_offset=0.0):
+    """
+    Puts both streams on one per-second timeline: each is aggregated to whole seconds, then
+    every system second takes the most recent traffic second at most `tolerance` s earlier.
+    `traffic_offset` shifts traffic time when the two loggers did not start together.
+    """
+    system = per_second(sys_df, time_col)
+    traffic = per_second(traf_df.assign(**{time_col: traf_df[time_col] + traffic_offset}), time_col)
+    overlap = [c for c in traffic.columns if c in system.columns and c != time_col]
+    return pd.merge_asof(system, traffic.drop(columns=overlap), on=time_col,
+                         direction='backward', tolerance=int(tolerance))
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling: keeps the first and last points and, per
+    bucket, the point forming the largest triangle with the previous pick and the next
+    bucket's mean, so peaks and dips survive. Returns the selected indices.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)  # n_out - 2 inner buckets
+    picks = np.empty(n_out, dtype=np.int64)
+    picks[0], picks[-1] = 0, n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if hi <= lo:  # Empty bucket when n_out is close to n
+            picks[i + 1] = prev
+            continue
+        nxt_lo, nxt_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[nxt_lo:nxt_hi].mean(), y[nxt_lo:nxt_hi].mean()
+        area = np.abs((x[prev] - avg_x) * (y[lo:hi] - y[prev]) - (x[prev] - x[lo:hi]) * (avg_y - y[prev]))
+        prev = lo + int(np.argmax(area))
+        picks[i + 1] = prev
+    return np.unique(picks)
+
+def downsample(df, x_col, y_col, n_out=MAX_POINTS):
+    """ (x, y) arrays of one series after LTTB; missing values are dropped first """
+    series = df[[x_col, y_col]].dropna()
+    idx = lttb(series[x_col].to_numpy(), series[y_col].to_numpy(), n_out)
+    return series[x_col].to_numpy()[idx], series[y_col].to_numpy()[idx]
+
+def bucket(df, x_col, y_cols, n_out=MAX_POINTS, how='mean'):
+    """ Fixed-width buckets on a shared x grid, for bars and stacks where every series needs the same x """
+    if len(df) <= n_out:
+        return df[[x_col] + list(y_cols)]
+    bins = np.linspace(df[x_col].min(), df[x_col].max(), n_out + 1)
+    groups = np.clip(np.searchsorted(bins, df[x_col], side='right') - 1, 0, n_out - 1)
+    out = df[list(y_cols)].groupby(groups).agg(how)
+    out.insert(0, x_col, bins[out.index.to_numpy()])
+    return out.reset_index(drop=True)
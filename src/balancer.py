@@ -0,0 +1,162 @@
+import argparse
+import http.client
+import itertools
+import os
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- CONFIGURATION ---
+# Runs as the web_lb Swarm service in front of web_app (see run_benchmark.ensure_service). Env vars override these.
+PORT = int(os.environ.get('BALANCER_PORT', 8080))
+UPSTREAM = os.environ.get('BALANCER_UPSTREAM', 'web_app')  # Name resolved through Docker's DNS on the shared overlay
+UPSTREAM_PORT = int(os.environ.get('BALANCER_UPSTREAM_PORT', 8080))
+REFRESH_INTERVAL = 0.25   # Seconds between DNS lookups and /health probes of every address
+PROBE_TIMEOUT = 0.2       # A backend that does not answer /health within this gets no traffic (paused, booting)
+FAIL_AFTER = 4            # Consecutive failed probes before a serving backend is dropped (a busy one can miss a few)
+UPSTREAM_TIMEOUT = 10.0   # Seconds a forwarded request may take
+
+class Backends:
+    """
+    Healthy addresses behind one DNS name. With web_app in dnsrr mode the name resolves to every
+    task's IP plus every standalone container attached under the same alias (the standby pool),
+    so each refresh probes all of them on /health and only those answering 200 get traffic:
+    a paused standby or a still-booting task never joins, an unpaused one joins on the next pass.
+    A serving backend is dropped only after FAIL_AFTER missed probes in a row or when it leaves
+    DNS, and if every probe fails the last healthy set is kept: under saturation /health queues
+    behind real requests, and dropping busy backends would turn overload into 503s.
+    """
+
+    def __init__(self, host=UPSTREAM, port=UPSTREAM_PORT, interval=REFRESH_INTERVAL, probe_timeout=PROBE_TIMEOUT):
+        self.host, self.port = host, port
+        self.interval = interval
+        self.probe_timeout = probe_timeout
+        self.healthy = []  # Replaced whole on every refresh, so readers need no lock
+        self._misses = {}  # address -> consecutive failed probes while serving
+        self._turn = itertools.count()
+        self._stop = threading.Event()
+
+    def start(self):
+        self.refresh()
+        threading.Thread(target=self._run, name='balancer-refresh', daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def pick(self, skip=()):
+        """ Next healthy address round robin, or None """
+        candidates = [a for a in self.healthy if a not in skip]
+        return candidates[next(self._turn) % len(candidates)] if candidates else None
+
+    def refresh(self):
+        try:
+            addresses = sorted({info[4][0] for info in socket.getaddrinfo(self.host, self.port, type=socket.SOCK_STREAM)})
+        except OSError:
+            addresses = []
+        up = {}
+        probes = [threading.Thread(target=self._probe, args=(a, up), daemon=True) for a in addresses]
+        for probe in probes:
+            probe.start()
+        for probe in probes:
+            probe.join(self.probe_timeout + 0.1)
+        healthy = []
+        for a in addresses:
+            self._misses[a] = 0 if up.get(a) else self._misses.get(a, 0) + 1
+            if up.get(a) or (a in self.healthy and self._misses[a] < FAIL_AFTER):
+                healthy.append(a)
+        self._misses = {a: self._misses[a] for a in addresses}
+        self.healthy = healthy or [a for a in self.healthy if a in addresses]
+
+    def _probe(self, address, up):
+        conn = http.client.HTTPConnection(address, self.port, timeout=self.probe_timeout)
+        try:
+            conn.request('GET', '/health')
+            up[address] = conn.getresponse().status == 200
+        except (OSError, http.client.HTTPException):
+            up[address] = False
+        finally:
+            conn.close()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.refresh()
+
+class ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive to the client; upstream connections are kept per client connection
+    disable_nagle_algorithm = True  # Headers and body go out as two writes; Nagle would hold the body for the client's delayed ACK
+    backends = None
+    upstream_timeout = UPSTREAM_TIMEOUT
+
+    def setup(self):
+        super().setup()
+        self._conns = {}  # address -> upstream connection, reused for every request on this client connection
+
+    def do_GET(self):
+        tried = set()
+        for _ in range(2):  # One retry on another backend: a task can go away between refreshes
+            address = self.backends.pick(tried)
+            if address is None:
+                break
+            tried.add(address)
+            try:
+                status, content_type, body = self._forward(address)
+            except (OSError, http.client.HTTPException):
+                self._close(address)
+                continue
+            return self._reply(status, content_type, body)
+        self._reply(503, 'text/plain', b'no healthy backend')
+
+    def _forward(self, address):
+        conn = self._conns.get(address)
+        if conn is None:
+            conn = self._conns[address] = http.client.HTTPConnection(address, self.backends.port, timeout=self.upstream_timeout)
+        conn.request('GET', self.path)
+        resp = conn.getresponse()
+        return resp.status, resp.getheader('Content-Type', 'application/json'), resp.read()
+
+    def _close(self, address):
+        conn = self._conns.pop(address, None)
+        if conn is not None:
+            conn.close()
+
+    def _reply(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def finish(self):
+        super().finish()
+        for conn in self._conns.values():
+            conn.close()
+
+    def log_message(self, *args):
+        pass
+
+def serve(port=PORT, upstream=UPSTREAM, upstream_port=UPSTREAM_PORT, host='0.0.0.0'):
+    """
+    HTTP load balancer choosing a backend per request, not per connection, so a keep-alive
+    client (traffic_bot's pool) reaches a newly promoted replica without reconnecting.
+    """
+    backends = Backends(upstream, upstream_port).start()
+    handler = type('Handler', (ProxyHandler,), {'backends': backends})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    print(f"Balancer on :{port} -> {upstream}:{upstream_port} ({len(backends.healthy)} healthy)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        backends.stop()
+        server.server_close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-request round-robin HTTP balancer over the healthy addresses of a DNS name")
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--upstream', default=UPSTREAM, help="service name / network alias to resolve")
+    parser.add_argument('--upstream-port', type=int, default=UPSTREAM_PORT)
+    args = parser.parse_args()
+    serve(args.port, args.upstream, args.upstream_port)
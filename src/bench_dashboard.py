@@ -0,0 +1,168 @@
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import numpy as np
+import pandas as pd
+import psutil
+import requests
+
+# --- CONFIGURATION ---
+HOURS = 1.0        # Length of the pre-filled metric files (one row per second)
+SSE_CLIENTS = 100
+POLL_CLIENTS = 50
+DURATION = 20.0    # Seconds of live load
+REQUESTS = 200     # Requests per point in the per-request comparison
+
+SYSTEM_HEADER = "Time,CPU_Percent,Memory_Percent,Network_RX_MB,Disk_Usage_Percent,Context_Switches,Replicas\n"
+TRAFFIC_HEADER = "Time,Avg_Latency_ms,Throughput_RPS,Tokens_Lost,Success_Rate\n"
+
+def system_row(t):
+    return f"{t},{40 + 30 * np.sin(t / 60):.1f},55.2,{t * 0.01:.2f},61.0,{1000000 + t * 500},{1 + t % 5}\n"
+
+def traffic_row(t):
+    return f"{t},{120 + t % 40:.2f},{18.5:.1f},{t % 3},{97.5:.1f}\n"
+
+def write_files(tmp, rows):
+    system, traffic = os.path.join(tmp, 'system_metrics.csv'), os.path.join(tmp, 'traffic_metrics.csv')
+    with open(system, 'w') as f:
+        f.write(SYSTEM_HEADER + ''.join(system_row(t) for t in range(rows)))
+    with open(traffic, 'w') as f:
+        f.write(TRAFFIC_HEADER + ''.join(traffic_row(t) for t in range(rows)))
+    return system, traffic
+
+def legacy_data(system, traffic):
+    """ What /api/data did before: parse both whole files on every request """
+    sys_df = pd.read_csv(system).tail(60)
+    traf_df = pd.read_csv(traffic).tail(60)
+    return {'sys_time': sys_df['Time'].tolist(), 'cpu': sys_df['CPU_Percent'].tolist(),
+            'latency': traf_df['Avg_Latency_ms'].tolist()}
+
+def per_request(system, traffic, n):
+    import dashboard_modern
+    dashboard_modern.hub = dashboard_modern.make_hub(system, os.path.join(os.path.dirname(system), 'none.ring'), traffic)
+    client = dashboard_modern.app.test_client()
+    etag = client.get('/api/data').headers['ETag']
+
+    def timed(fn):
+        start = time.perf_counter()
+        for _ in range(n):
+            fn()
+        return (time.perf_counter() - start) / n * 1000
+
+    return {
+        'legacy full read': timed(lambda: legacy_data(system, traffic)),
+        'window (200)': timed(lambda: client.get('/api/data')),
+        'unchanged (304)': timed(lambda: client.get('/api/data', headers={'If-None-Match': etag})),
+    }
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def load_test(system, traffic, start_row, sse_clients, poll_clients, duration):
+    port = free_port()
+    server = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dashboard_modern.py'),
+                               '--no-debug', '--port', str(port), '--system', system, '--traffic', traffic,
+                               '--system-ring', system + '.ring'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            requests.get(base + '/api/data', timeout=1)
+            break
+        except requests.ConnectionError:
+            time.sleep(0.1)
+
+    stop = threading.Event()
+    written = {}          # Time value -> wall time the row hit the file
+    delays, events = [], [0]
+    polls = {200: 0, 304: 0}
+    lock = threading.Lock()
+
+    def writer():
+        t = start_row
+        while not stop.wait(1.0):
+            with open(system, 'a') as f_sys, open(traffic, 'a') as f_traf:
+                written[float(t)] = time.time()
+                f_sys.write(system_row(t))
+                f_traf.write(traffic_row(t))
+            t += 1
+
+    def sse_client():
+        try:
+            with requests.get(base + '/api/stream', stream=True, timeout=duration + 30) as r:
+                event = None
+                for line in r.iter_lines():
+                    if stop.is_set():
+                        break
+                    line = line.decode()
+                    if line.startswith('event: '):
+                        event = line[7:]
+                    elif line.startswith('data: ') and event == 'delta':
+                        now = time.time()
+                        payload = json.loads(line[6:])
+                        with lock:
+                            events[0] += 1
+                            delays.extend(now - written[t] for t in payload.get('sys_time', []) if t in written)
+        except requests.RequestException:
+            pass  # Server shut down at the end of the run
+
+    def poll_client():
+        session, etag = requests.Session(), None
+        while not stop.wait(1.0):
+            try:
+                r = session.get(base + '/api/data', headers={'If-None-Match': etag} if etag else {})
+            except requests.RequestException:
+                break
+            etag = r.headers.get('ETag', etag)
+            with lock:
+                polls[r.status_code] = polls.get(r.status_code, 0) + 1
+
+    threads = [threading.Thread(target=sse_client, daemon=True) for _ in range(sse_clients)]
+    threads += [threading.Thread(target=poll_client, daemon=True) for _ in range(poll_clients)]
+    for thread in threads:
+        thread.start()
+    time.sleep(1.0)  # Let every client connect and take its snapshot
+
+    proc = psutil.Process(server.pid)
+    cpu_start, wall_start = sum(proc.cpu_times()[:2]), time.time()
+    writer_thread = threading.Thread(target=writer, daemon=True)
+    writer_thread.start()
+    time.sleep(duration)
+    cpu = (sum(proc.cpu_times()[:2]) - cpu_start) / (time.time() - wall_start) * 100
+    stop.set()
+    time.sleep(1.0)  # Pollers see the stop flag before the server goes away
+    server.terminate()
+    server.wait()
+    return cpu, np.array(delays), events[0], polls
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard cost with long metric files and many clients")
+    parser.add_argument('--hours', type=float, default=HOURS)
+    parser.add_argument('--sse-clients', type=int, default=SSE_CLIENTS)
+    parser.add_argument('--poll-clients', type=int, default=POLL_CLIENTS)
+    parser.add_argument('--duration', type=float, default=DURATION)
+    args = parser.parse_args()
+
+    rows = int(args.hours * 3600)
+    with tempfile.TemporaryDirectory() as tmp:
+        system, traffic = write_files(tmp, rows)
+        print(f"--- DASHBOARD BENCHMARK ({rows:,} rows per file, {os.path.getsize(system) / 1e6:.1f} MB system log) ---")
+        for name, ms in per_request(system, traffic, REQUESTS).items():
+            print(f"{name:>18}: {ms:8.3f} ms/request")
+
+        cpu, delays, events, polls = load_test(system, traffic, rows, args.sse_clients, args.poll_clients, args.duration)
+        print(f"\nLive load: {args.sse_clients} SSE clients + {args.poll_clients} pollers for {args.duration:g}s, one row/s appended")
+        print(f"  Server CPU: {cpu:.1f}% of one core")
+        print(f"  SSE deltas delivered: {events:,} | row-to-client latency p50 {np.percentile(delays, 50) * 1000:.0f}ms "
+              f"p99 {np.percentile(delays, 99) * 1000:.0f}ms" if len(delays) else "  No SSE deltas delivered")
+        print(f"  Polls: {polls.get(200, 0):,} full windows, {polls.get(304, 0):,} not modified (304)")
+
+if __name__ == "__main__":
+    main()
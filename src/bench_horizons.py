@@ -0,0 +1,57 @@
+import argparse
+import glob
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+import simulator
+from load_profiles import diurnal, ramp
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SINGLE_MODEL = os.path.join(BASE_DIR, 'models', 'orchestrator_brain.h5')
+SYNTHETIC_TRACES = 4
+SYNTHETIC_TICKS = 3600
+POLICIES = ['static_ai', 'adaptive']
+
+def synthetic_traces(out_dir, n=SYNTHETIC_TRACES, ticks=SYNTHETIC_TICKS, seed=0):
+    """ Utilisation runs (system_metrics.csv layout) with a compressed day plus ramped bursts every few minutes """
+    rng = np.random.default_rng(seed)
+    paths = []
+    for i in range(n):
+        util = diurnal(ticks, low=0.05, high=0.35, period=1200, phase=rng.uniform(0, 1200))
+        for at in np.arange(rng.integers(100, 300), ticks - 240, rng.integers(300, 600)):
+            peak = rng.uniform(0.3, 0.6)
+            util += ramp(ticks, [(at, 0), (at + 90, peak), (at + 150, peak), (at + 210, 0)])
+        util = (util + rng.normal(0, 0.02, ticks)).clip(0, 1)
+        path = os.path.join(out_dir, f"synthetic_{i}.csv")
+        pd.DataFrame({'CPU_Percent': (util * 100).round(2)}).to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+def summarise(results):
+    summary = results.groupby('policy', sort=False)[['sla_violation_s', 'replica_s', 'rises', 'lead_s', 'rises_covered']].sum()
+    summary['mean_lead_s'] = (summary.pop('lead_s') / summary['rises']).round(1)
+    summary['covered_pct'] = (100 * summary.pop('rises_covered') / summary['rises']).round(1)
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Scale-up lead time: single-step vs multi-horizon forecaster on replayed traces")
+    parser.add_argument('--single', default=SINGLE_MODEL, help="single-step model (.h5)")
+    parser.add_argument('--multi', required=True, help="multi-horizon model, e.g. from lstm_trainer.py --horizons 1,5,15,30,60 --out ...")
+    parser.add_argument('--quantile', type=float, default=None, help="quantile over the boot-delay horizons (default: max)")
+    parser.add_argument('--boot-delay', type=int, default=simulator.BOOT_DELAY)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sets = {'Bitbrains traces': sorted(glob.glob(os.path.join(simulator.RAW_DIR, '*.csv'))),
+                'Synthetic bursts': synthetic_traces(tmp)}
+        print(f"--- SCALE-UP LEAD TIME (boot delay {args.boot_delay} ticks; lead >= boot delay = serving before the rise) ---")
+        for label, traces in sets.items():
+            for model_label, path in (('single-step', args.single), ('multi-horizon', args.multi)):
+                results = simulator.run(traces, POLICIES, boot_delay=args.boot_delay, model_path=path, quantile=args.quantile)
+                print(f"\n[{label}, {model_label}: {os.path.basename(path)}]")
+                print(summarise(results).to_string())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+# --- CONFIGURATION ---
+WINDOW_SIZE = 60
+N_PREDICTIONS = 500
+RUNTIMES = ['numpy', 'keras']
+
+def _rss_mb():
+    import psutil
+    return psutil.Process().memory_info().rss / 1024 / 1024
+
+def run_worker(runtime, n_predictions):
+    """ Runs inside a fresh interpreter so import + load time and RSS are measured cold """
+    t0 = time.perf_counter()
+    import numpy as np
+    from numpy_brain import load_brain
+    model = load_brain(runtime=runtime)
+    cold_start = time.perf_counter() - t0
+
+    x = np.random.rand(1, WINDOW_SIZE, 1).astype(np.float32)
+    model.predict(x, verbose=0)  # First call pays tracing / allocation costs; keep it out of the average
+
+    latencies = []
+    for _ in range(n_predictions):
+        start = time.perf_counter()
+        model.predict(x, verbose=0)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+
+    return {
+        'runtime': runtime,
+        'cold_start_s': round(cold_start, 3),
+        'rss_mb': round(_rss_mb(), 1),
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        'p99_ms': round(latencies[int(len(latencies) * 0.99) - 1], 3),
+    }
+
+def check_agreement(n_windows=256):
+    """ Max absolute difference between the NumPy runtime and Keras on random windows """
+    import numpy as np
+    from numpy_brain import load_brain
+    x = np.random.rand(n_windows, WINDOW_SIZE, 1).astype(np.float32)
+    ours = load_brain(runtime='numpy').predict(x)
+    ref = load_brain(runtime='keras').predict(x, verbose=0)
+    return float(np.abs(ours - ref).max())
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start, RSS and per-prediction latency: NumPy runtime vs Keras")
+    parser.add_argument('--worker', choices=RUNTIMES, help=argparse.SUPPRESS)
+    parser.add_argument('-n', type=int, default=N_PREDICTIONS, help="predictions per runtime")
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.n)))
+        return
+
+    print(f"--- INFERENCE BENCHMARK ({args.n} predictions of (1, {WINDOW_SIZE}, 1)) ---")
+    env = dict(os.environ, TF_CPP_MIN_LOG_LEVEL='3')
+    results = []
+    for runtime in RUNTIMES:
+        try:
+            out = subprocess.check_output([sys.executable, os.path.abspath(__file__), '--worker', runtime, '-n', str(args.n)],
+                                          env=env, stderr=subprocess.DEVNULL, cwd=os.path.dirname(os.path.abspath(__file__)))
+            results.append(json.loads(out.decode().strip().splitlines()[-1]))
+        except subprocess.CalledProcessError:
+            print(f"   Skipping {runtime}: runtime not available")
+
+    print(f"{'Runtime':<8} {'Cold start (s)':>15} {'RSS (MB)':>10} {'Mean (ms)':>10} {'p99 (ms)':>10}")
+    for r in results:
+        print(f"{r['runtime']:<8} {r['cold_start_s']:>15} {r['rss_mb']:>10} {r['mean_ms']:>10} {r['p99_ms']:>10}")
+
+    if len(results) == len(RUNTIMES):
+        print(f"Max |numpy - keras| on random windows: {check_agreement():.2e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import csv
+import os
+import tempfile
+import time
+from logger import HostSampler, CsvSink, HOST_DTYPE, CSV_COLUMNS, open_ring, sample_loop
+from telemetry_ring import RingReader, export_csv
+
+# --- CONFIGURATION ---
+INTERVALS = [1.0, 0.5, 0.1, 0.05, 0.02, 0.01]
+DURATION = 10.0  # Seconds sampled per point
+
+class ReopenCsvSink(CsvSink):
+    """ The previous logger: reopen system_metrics.csv in append mode for every sample """
+
+    def __init__(self, path, interval):
+        super().__init__(path, interval)
+        self._path = path
+        self._file.close()
+
+    def append(self, record):
+        with open(self._path, 'a', newline='') as f:
+            self._file, self._writer = f, csv.writer(f)
+            super().append(record)
+
+    def close(self):
+        pass
+
+def overhead(make_sink, interval, duration):
+    """ Logger CPU time as a percentage of one core, over `duration` seconds of sampling """
+    sink = make_sink(interval)
+    ticks = int(duration / interval)
+    wall, cpu = time.perf_counter(), time.process_time()
+    loop = sample_loop(sink, HostSampler(), interval, replicas=lambda: 1, ticks=ticks, status=False)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    sink.close()
+    return cpu / wall * 100, loop.overruns.value
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU overhead of the telemetry logger per sampling rate")
+    parser.add_argument('--duration', type=float, default=DURATION)
+    parser.add_argument('--intervals', default=','.join(map(str, INTERVALS)))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sinks = {
+            'CSV (reopen)': lambda i: ReopenCsvSink(os.path.join(tmp, 'reopen.csv'), i),
+            'CSV (open)': lambda i: CsvSink(os.path.join(tmp, 'open.csv'), i),
+            'Ring': lambda i: open_ring(os.path.join(tmp, 'bench.ring'), i, seconds=3600),
+        }
+        print(f"--- LOGGER OVERHEAD ({args.duration:g}s per point, % of one core) ---")
+        print(f"{'Interval (ms)':>13} " + ' '.join(f"{name:>14}" for name in sinks) + f" {'Ring overruns':>14}")
+        for interval in map(float, args.intervals.split(',')):
+            cells, overruns = [], 0
+            for make_sink in sinks.values():
+                pct, overruns = overhead(make_sink, interval, args.duration)
+                cells.append(f"{pct:>13.2f}%")
+            print(f"{interval * 1000:>13g} " + ' '.join(cells) + f" {overruns:>14.0f}")
+
+        # Round trip: the ring exports to the same columns as system_metrics.csv
+        ring_path = os.path.join(tmp, 'bench.ring')
+        reader = RingReader(ring_path)
+        out = os.path.join(tmp, 'export.csv')
+        exported = export_csv(ring_path, out)
+        with open(out) as f:
+            header = f.readline().strip().split(',')
+        assert header == list(CSV_COLUMNS), header
+        print(f"\nRing: {reader.dtype.itemsize} B/record ({HOST_DTYPE.itemsize} expected), "
+              f"{len(reader):,} records, exported {exported:,} rows with the system_metrics.csv header")
+
+if __name__ == "__main__":
+    main()
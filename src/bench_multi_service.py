@@ -0,0 +1,66 @@
+import argparse
+import time
+import numpy as np
+from numpy_brain import load_brain
+from orchestrator import MODEL_PATH, predict_batch
+from policies import AdaptivePolicy, WINDOW_SIZE
+
+# --- CONFIGURATION ---
+SERVICE_COUNTS = [1, 10, 50, 100, 200, 400]
+TICKS = 20
+
+class MockPolicy(AdaptivePolicy):
+    """ Computes the real decision but always holds, so every mock service keeps a steady state """
+
+    def decide(self, prediction, current_replicas):
+        super().decide(prediction, current_replicas)
+        return current_replicas
+
+def mock_policies(n, rng):
+    """ N mock services with full windows of random CPU load """
+    policies = {f"svc_{i}": MockPolicy() for i in range(n)}
+    for policy in policies.values():
+        policy.history.extend(rng.random(WINDOW_SIZE))
+    return policies
+
+def tick_batched(model, policies, rng):
+    for policy in policies.values():
+        policy.observe(rng.random())
+    predictions = predict_batch(model, policies)
+    for name, prediction in predictions.items():
+        policies[name].decide(prediction, 2)
+
+def tick_per_service(model, policies, rng):
+    """ What N single-service orchestrators would cost: one predict per service """
+    for policy in policies.values():
+        policy.observe(rng.random())
+        prediction = model.predict(policy.history.window().reshape(1, WINDOW_SIZE, 1), verbose=0)[0][0]
+        policy.decide(prediction, 2)
+
+def time_ticks(tick, model, policies, rng, ticks):
+    tick(model, policies, rng)  # Warm-up
+    start = time.perf_counter()
+    for _ in range(ticks):
+        tick(model, policies, rng)
+    return (time.perf_counter() - start) / ticks * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Orchestrator tick time vs number of monitored services")
+    parser.add_argument('--ticks', type=int, default=TICKS)
+    parser.add_argument('--counts', default=','.join(map(str, SERVICE_COUNTS)))
+    parser.add_argument('--runtime', default=None, help="numpy (default) or keras")
+    args = parser.parse_args()
+
+    model = load_brain(MODEL_PATH, runtime=args.runtime)
+    rng = np.random.default_rng(0)
+
+    print(f"--- MULTI-SERVICE TICK BENCHMARK ({args.ticks} ticks per point) ---")
+    print(f"{'Services':>8} {'Batched (ms)':>14} {'Per-service (ms)':>18} {'Batched / service (ms)':>24}")
+    for n in map(int, args.counts.split(',')):
+        batched = time_ticks(tick_batched, model, mock_policies(n, rng), rng, args.ticks)
+        # The unbatched loop grows linearly; a couple of ticks are enough to show it
+        per_service = time_ticks(tick_per_service, model, mock_policies(n, rng), rng, max(1, args.ticks // 10))
+        print(f"{n:>8} {batched:>14.1f} {per_service:>18.1f} {batched / n:>24.3f}")
+
+if __name__ == "__main__":
+    main()
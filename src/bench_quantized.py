@@ -0,0 +1,87 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INPUT_FILE = os.path.join(BASE_DIR, 'data', 'processed', 'universal_training_data.csv')
+WINDOW_SIZE = 60
+TAIL_FRACTION = 0.2   # Held-out tail, the same share lstm_trainer validates on
+N_PREDICTIONS = 500
+RUNTIMES = ['keras', 'numpy', 'float16', 'int8']
+
+def artifact_size(runtime):
+    from numpy_brain import MODEL_PATH, brain_path
+    path = MODEL_PATH if runtime == 'keras' else brain_path(MODEL_PATH, None if runtime == 'numpy' else runtime)
+    return os.path.getsize(path) / 1024
+
+def run_worker(runtime, n_predictions):
+    """ Fresh interpreter per runtime, so import + load time is measured cold """
+    t0 = time.perf_counter()
+    import numpy as np
+    from numpy_brain import load_brain
+    model = load_brain(runtime=runtime)
+    load_s = time.perf_counter() - t0
+
+    import pandas as pd
+    from windowing import create_sequences
+    series = pd.read_csv(INPUT_FILE).values.astype(np.float32)
+    tail = series[int(len(series) * (1 - TAIL_FRACTION)):]
+    X, y = create_sequences(tail, WINDOW_SIZE, 1)
+    forecasts = model.predict(np.ascontiguousarray(X), verbose=0)[:, :1]
+    mse = float(np.mean((forecasts - y) ** 2))
+
+    x = np.ascontiguousarray(X[:1])
+    model.predict(x, verbose=0)  # First call pays tracing / allocation costs
+    latencies = []
+    for _ in range(n_predictions):
+        start = time.perf_counter()
+        model.predict(x, verbose=0)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    np.save(os.path.join(os.environ['BENCH_OUT'], f'{runtime}.npy'), forecasts)
+
+    return {'runtime': runtime, 'size_kb': round(artifact_size(runtime), 1), 'load_s': round(load_s, 3),
+            'mean_ms': round(sum(latencies) / len(latencies), 3), 'p99_ms': round(latencies[int(len(latencies) * 0.99) - 1], 3),
+            'mse': mse, 'windows': len(X)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantized forecaster vs the original: size, load time, latency and tail MSE")
+    parser.add_argument('--worker', choices=RUNTIMES, help=argparse.SUPPRESS)
+    parser.add_argument('-n', type=int, default=N_PREDICTIONS, help="timed single-window predictions per runtime")
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.n)))
+        return
+
+    import tempfile
+    import numpy as np
+    from numpy_brain import load_brain
+    for runtime in ('numpy', 'float16', 'int8'):
+        load_brain(runtime=runtime)  # Export any missing .npz up front so it is not timed as load
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        env = dict(os.environ, TF_CPP_MIN_LOG_LEVEL='3', BENCH_OUT=out_dir)
+        results = []
+        for runtime in RUNTIMES:
+            try:
+                out = subprocess.check_output([sys.executable, os.path.abspath(__file__), '--worker', runtime, '-n', str(args.n)],
+                                              env=env, stderr=subprocess.DEVNULL, cwd=os.path.dirname(os.path.abspath(__file__)))
+                results.append(json.loads(out.decode().strip().splitlines()[-1]))
+            except subprocess.CalledProcessError:
+                print(f"   Skipping {runtime}: runtime not available")
+
+        reference = np.load(os.path.join(out_dir, f"{results[0]['runtime']}.npy"))
+        print(f"--- QUANTIZED FORECASTER BENCHMARK ({results[0]['windows']:,} held-out windows, CPU) ---")
+        print(f"{'Runtime':<8} {'Size (KB)':>10} {'Load (s)':>9} {'Mean (ms)':>10} {'p99 (ms)':>9} {'Tail MSE':>11} {'Max |diff|':>11}")
+        for r in results:
+            diff = np.abs(np.load(os.path.join(out_dir, f"{r['runtime']}.npy")) - reference).max()
+            print(f"{r['runtime']:<8} {r['size_kb']:>10} {r['load_s']:>9} {r['mean_ms']:>10} {r['p99_ms']:>9} {r['mse']:>11.3e} {diff:>11.2e}")
+        print(f"(Max |diff| is against {results[0]['runtime']})")
+
+if __name__ == "__main__":
+    main()
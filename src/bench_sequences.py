@@ -0,0 +1,55 @@
+import argparse
+import os
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from windowing import create_sequences
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INPUT_FILE = os.path.join(BASE_DIR, 'data', 'processed', 'universal_training_data.csv')
+WINDOW_SIZE = 60
+PREDICT_HORIZON = 1
+
+def create_sequences_loop(data, seq_length):
+    """ The previous lstm_trainer implementation, kept here as the baseline """
+    xs, ys = [], []
+    for i in range(len(data) - seq_length - PREDICT_HORIZON):
+        x = data[i:(i + seq_length)]
+        y = data[i + seq_length + PREDICT_HORIZON - 1]
+        xs.append(x)
+        ys.append(y)
+    return np.array(xs), np.array(ys)
+
+def measure(fn, data):
+    tracemalloc.start()
+    start = time.perf_counter()
+    X, y = fn(data)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1000, peak / 1024 / 1024, X.shape
+
+def main():
+    parser = argparse.ArgumentParser(description="Sequence construction: Python loop vs strided views")
+    parser.add_argument('--synthetic-rows', type=int, default=500_000,
+                        help="also benchmark a synthetic series of this length (0 to skip)")
+    args = parser.parse_args()
+
+    inputs = []
+    if os.path.exists(INPUT_FILE):
+        inputs.append((os.path.basename(INPUT_FILE), pd.read_csv(INPUT_FILE).values))
+    if args.synthetic_rows:
+        inputs.append((f"synthetic {args.synthetic_rows:,} rows", np.random.rand(args.synthetic_rows, 1)))
+
+    print(f"--- SEQUENCE CONSTRUCTION BENCHMARK (window={WINDOW_SIZE}) ---")
+    print(f"{'Input':<34} {'Method':<8} {'Time (ms)':>10} {'Peak (MB)':>10}  Shape")
+    for label, data in inputs:
+        for method, fn in (('loop', lambda d: create_sequences_loop(d, WINDOW_SIZE)),
+                           ('strided', lambda d: create_sequences(d, WINDOW_SIZE, PREDICT_HORIZON))):
+            ms, peak_mb, shape = measure(fn, data)
+            print(f"{label:<34} {method:<8} {ms:>10.1f} {peak_mb:>10.2f}  {shape}")
+
+if __name__ == "__main__":
+    main()
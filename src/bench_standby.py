@@ -0,0 +1,157 @@
+import argparse
+import itertools
+import threading
+import time
+import numpy as np
+import scaler as scaler_module
+from balancer import REFRESH_INTERVAL
+from scaler import AsyncScaler
+from standby_pool import StandbyPool
+
+# --- CONFIGURATION ---
+SERVICE = 'web_app'
+BOOT_DELAY = 5.0      # Seconds from a new Swarm task being scheduled to it serving (image pull, start, app boot)
+CREATE_DELAY = 0.5    # containers.run round trip
+UNPAUSE_DELAY = 0.02  # containers.unpause round trip
+SCALE_UPS = 8
+PROBE_INTERVAL = 0.005
+
+class FakeContainer:
+    _ids = itertools.count()
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.name = f"standby_{next(self._ids)}"
+        self.attrs = {'State': {'Status': 'running'}}
+        self.paused = False
+        self.unpaused_at = time.monotonic()
+
+    def reload(self):
+        pass
+
+    def pause(self):
+        self.paused = True
+
+    def unpause(self):
+        time.sleep(UNPAUSE_DELAY)
+        self.paused = False
+        self.unpaused_at = time.monotonic()
+
+    def remove(self, force=False):
+        with self.backend.lock:
+            self.backend.containers_.discard(self)
+
+class FakeService:
+    def __init__(self, backend):
+        self.backend = backend
+        self.name = SERVICE
+
+    @property
+    def attrs(self):
+        return {'Spec': {'Mode': {'Replicated': {'Replicas': len(self.backend.ready_at)}},
+                         'TaskTemplate': {'ContainerSpec': {'Image': 'web:latest'}, 'Networks': [{'Target': 'web_net'}]}}}
+
+    def scale(self, replicas):
+        with self.backend.lock:
+            tasks = self.backend.ready_at
+            tasks[:] = tasks[:replicas] + [time.monotonic() + self.backend.boot_delay] * (replicas - len(tasks))
+
+class FakeDocker:
+    """
+    Just enough of the Docker SDK for AsyncScaler and StandbyPool: one replicated service whose
+    new tasks serve `boot_delay` seconds after being scheduled, and standalone containers that
+    serve while unpaused. serving() is what balancer.py in front of the service would see: a
+    task or container gets traffic from the first health-probe pass after it can answer.
+    """
+
+    def __init__(self, boot_delay=BOOT_DELAY, replicas=1):
+        self.boot_delay = boot_delay
+        self.lock = threading.Lock()
+        self.ready_at = [0.0] * replicas  # Monotonic time each task starts serving
+        self.containers_ = set()
+        self.services = self
+        self.containers = self
+        self.networks = self
+        self.api = self
+
+    # services.get / networks.get / containers.run / containers.list / api.tasks
+    def get(self, name):
+        return FakeService(self) if name == SERVICE else self
+
+    def connect(self, container, aliases=None):
+        pass
+
+    def run(self, image, **kwargs):
+        time.sleep(CREATE_DELAY)
+        container = FakeContainer(self)
+        with self.lock:
+            self.containers_.add(container)
+        return container
+
+    def list(self, **kwargs):
+        return []
+
+    def tasks(self, filters=None):
+        now = time.monotonic()
+        with self.lock:
+            return [{'Status': {'State': 'running' if t <= now else 'starting'}} for t in self.ready_at]
+
+    def serving(self):
+        probed = np.floor(time.monotonic() / REFRESH_INTERVAL) * REFRESH_INTERVAL  # The balancer's last refresh
+        with self.lock:
+            return (sum(t <= probed for t in self.ready_at) +
+                    sum(not c.paused and c.unpaused_at <= probed for c in self.containers_))
+
+def time_to_first_served(backend, scaler, pool):
+    """ Seconds from a scale-up decision until one more replica is serving """
+    before = backend.serving()
+    start = time.perf_counter()
+    target = scaler.desired(SERVICE) + 1
+    scaler.scale(SERVICE, target)
+    if pool is not None:
+        pool.promote(1, target)
+    while backend.serving() <= before:
+        time.sleep(PROBE_INTERVAL)
+    return time.perf_counter() - start
+
+def settle(backend, scaler, pool, timeout=60):
+    """ Waits until the last scale-up converged, its standby retired and the pool is full again """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        standby_serving = sum(not c.paused for c in backend.containers_)
+        if not scaler.converging(SERVICE) and not standby_serving and (pool is None or pool.size() >= pool.target):
+            return
+        time.sleep(0.05)
+
+def run(with_pool, scale_ups, boot_delay):
+    backend = FakeDocker(boot_delay)
+    scaler = AsyncScaler(backend)
+    pool = StandbyPool(backend, SERVICE, scaler, min_size=2, max_size=2, warmup=0.1).start() if with_pool else None
+    settle(backend, scaler, pool)
+    results, refills = [], []
+    for _ in range(scale_ups):
+        results.append(time_to_first_served(backend, scaler, pool))
+        start = time.perf_counter()
+        settle(backend, scaler, pool)
+        refills.append(time.perf_counter() - start)
+    scaler.stop()
+    if pool is not None:
+        pool.stop()
+    return np.array(results), np.array(refills)
+
+def main():
+    parser = argparse.ArgumentParser(description="Time to first served request after a scale-up, standby pool on vs off (fake Docker)")
+    parser.add_argument('--scale-ups', type=int, default=SCALE_UPS)
+    parser.add_argument('--boot-delay', type=float, default=BOOT_DELAY)
+    args = parser.parse_args()
+    scaler_module.WATCH_INTERVAL = 0.1
+
+    print(f"--- STANDBY POOL BENCHMARK (fake backend: task boot {args.boot_delay}s, create {CREATE_DELAY}s, unpause {UNPAUSE_DELAY * 1000:.0f}ms) ---")
+    print(f"{'Pool':<5} {'Scale-ups':>9} {'Mean (s)':>9} {'p50 (s)':>8} {'Max (s)':>8} {'Settle + refill (s)':>20}")
+    for with_pool in (False, True):
+        served, refills = run(with_pool, args.scale_ups, args.boot_delay)
+        print(f"{'on' if with_pool else 'off':<5} {len(served):>9} {served.mean():>9.3f} {np.median(served):>8.3f} "
+              f"{served.max():>8.3f} {refills.mean():>20.2f}")
+
+if __name__ == "__main__":
+    main()
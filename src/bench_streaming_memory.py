@@ -0,0 +1,88 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import numpy as np
+
+# --- CONFIGURATION ---
+SIZES = [100_000, 400_000, 1_600_000]  # Total raw rows per run
+FILES_PER_RUN = 4
+CHUNK_ROWS = 20_000
+WINDOW_SIZE = 60
+BATCH_SIZE = 128
+
+def write_synthetic_traces(raw_dir, total_rows, rng):
+    """ Bitbrains-shaped traces (';\\t' separated) with a random CPU usage walk """
+    os.makedirs(raw_dir, exist_ok=True)
+    header = "Timestamp [ms];\tCPU cores;\tCPU capacity provisioned [MHZ];\tCPU usage [MHZ]"
+    for i in range(FILES_PER_RUN):
+        n = total_rows // FILES_PER_RUN
+        capacity = np.full(n, 5852.0)
+        usage = np.clip(np.cumsum(rng.normal(0, 50, n)) % capacity, 0, None)
+        rows = np.column_stack([1376314846 + 300 * np.arange(n), np.full(n, 2), capacity, usage])
+        np.savetxt(os.path.join(raw_dir, f"{i}.csv"), rows, delimiter=';\t', header=header, comments='', fmt=['%d', '%d', '%.6f', '%.6f'])
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Linux reports KB
+
+def run_streaming(raw_dir, work_dir):
+    from data_loader_universal import process_universal_data_streaming
+    from windowing import iter_window_batches
+    shards = process_universal_data_streaming(raw_dir, os.path.join(work_dir, 'shards'),
+                                              os.path.join(work_dir, 'scaler.json'), CHUNK_ROWS)
+    windows = 0
+    for subset in ('train', 'val'):
+        for X, _ in iter_window_batches(shards, WINDOW_SIZE, batch_size=BATCH_SIZE, subset=subset):
+            windows += len(X)
+    return windows
+
+def run_in_memory(raw_dir, work_dir):
+    """ The merged-array path: every trace concatenated and scaled in memory, then windowed """
+    import glob
+    from data_loader_universal import parse_trace
+    from windowing import create_sequences
+    full = np.concatenate([parse_trace(f) for f in sorted(glob.glob(os.path.join(raw_dir, '*.csv')))])
+    scaled = (full - full.min()) / ((full.max() - full.min()) or 1.0)
+    X, _ = create_sequences(scaled, WINDOW_SIZE)
+    windows = 0
+    for i in range(0, len(X), BATCH_SIZE):
+        windows += len(np.array(X[i:i + BATCH_SIZE]))
+    return windows
+
+def worker(mode, raw_dir):
+    with tempfile.TemporaryDirectory() as work_dir:
+        windows = (run_streaming if mode == 'stream' else run_in_memory)(raw_dir, work_dir)
+    return {'windows': windows, 'peak_rss_mb': round(peak_rss_mb(), 1)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak RSS of streaming vs in-memory preparation as input grows")
+    parser.add_argument('--worker', nargs=2, metavar=('MODE', 'RAW_DIR'), help=argparse.SUPPRESS)
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)))
+    args = parser.parse_args()
+
+    if args.worker:
+        with open(os.devnull, 'w') as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            result = worker(*args.worker)
+            sys.stdout = stdout
+        print(json.dumps(result))
+        return
+
+    rng = np.random.default_rng(0)
+    print(f"--- STREAMING MEMORY BENCHMARK (chunk={CHUNK_ROWS:,} rows) ---")
+    print(f"{'Raw rows':>10} {'Windows':>10} {'Stream peak RSS (MB)':>22} {'In-memory peak RSS (MB)':>25}")
+    here = os.path.dirname(os.path.abspath(__file__))
+    for size in map(int, args.sizes.split(',')):
+        with tempfile.TemporaryDirectory() as raw_dir:
+            write_synthetic_traces(raw_dir, size, rng)
+            results = {}
+            for mode in ('stream', 'memory'):
+                out = subprocess.check_output([sys.executable, os.path.abspath(__file__), '--worker', mode, raw_dir], cwd=here)
+                results[mode] = json.loads(out.decode().strip().splitlines()[-1])
+        print(f"{size:>10,} {results['stream']['windows']:>10,} {results['stream']['peak_rss_mb']:>22} {results['memory']['peak_rss_mb']:>25}")
+
+if __name__ == "__main__":
+    main()
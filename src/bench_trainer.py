@@ -0,0 +1,83 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import numpy as np
+
+# --- CONFIGURATION ---
+EPOCHS = 2           # Epoch 1 includes graph tracing; the last epoch is the reported rate
+TRAIN_WINDOWS = 20_000
+
+def sequence_batches(series, starts, batch_size):
+    """ The previous lstm_trainer input path, kept here as the baseline """
+    import tensorflow as tf
+    from windowing import create_sequences
+    from lstm_trainer import WINDOW_SIZE, PREDICT_HORIZONS
+
+    class WindowBatches(tf.keras.utils.Sequence):
+        def __init__(self, X, y, indices, batch_size, **kwargs):
+            super().__init__(**kwargs)
+            self.X, self.y = X, y
+            self.indices = np.array(indices)
+            self.batch_size = batch_size
+            np.random.shuffle(self.indices)
+
+        def __len__(self):
+            return int(np.ceil(len(self.indices) / self.batch_size))
+
+        def __getitem__(self, i):
+            idx = self.indices[i * self.batch_size:(i + 1) * self.batch_size]
+            return self.X[idx], self.y[idx]
+
+        def on_epoch_end(self):
+            np.random.shuffle(self.indices)
+
+    X, y = create_sequences(series, WINDOW_SIZE, PREDICT_HORIZONS)
+    return WindowBatches(X, y, starts, batch_size)
+
+def worker(pipeline, intra, inter, epochs):
+    import lstm_trainer as trainer
+    trainer.configure_threads(intra, inter)
+    series = trainer.load_dataset() if os.path.exists(trainer.INPUT_FILE) else \
+        np.random.default_rng(0).random((TRAIN_WINDOWS + trainer.WINDOW_SIZE + 1, 1), dtype=np.float32)
+    starts = np.arange(min(TRAIN_WINDOWS, len(series) - trainer.WINDOW_SIZE - max(trainer.PREDICT_HORIZONS)))
+    if pipeline == 'sequence':
+        batches = sequence_batches(series, starts, trainer.BATCH_SIZE)
+    else:
+        batches = trainer.window_dataset(series, starts, shuffle=True)
+
+    throughput = trainer.Throughput(trainer.BATCH_SIZE, len(starts))
+    trainer.build_model().fit(batches, epochs=epochs, callbacks=[throughput], verbose=0)
+    return {'samples_per_sec': round(throughput.rates[-1], 1), 'windows': len(starts)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Training samples/sec: Keras Sequence vs tf.data, across thread settings")
+    parser.add_argument('--worker', nargs=4, metavar=('PIPELINE', 'INTRA', 'INTER', 'EPOCHS'), help=argparse.SUPPRESS)
+    parser.add_argument('--epochs', type=int, default=EPOCHS)
+    args = parser.parse_args()
+
+    if args.worker:
+        with open(os.devnull, 'w') as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            result = worker(args.worker[0], *map(int, args.worker[1:]))
+            sys.stdout = stdout
+        print(json.dumps(result))
+        return
+
+    # Thread counts only apply before TensorFlow's first op, so every setting runs in a fresh process
+    cores = os.cpu_count() or 1
+    settings = sorted({(0, 0), (1, 1), (cores, 2), (max(cores // 2, 1), 2)})
+    print(f"--- TRAINER THROUGHPUT BENCHMARK ({cores} CPU core(s), batch 128, last of {args.epochs} epochs) ---")
+    print(f"{'Pipeline':<10} {'Intra':>6} {'Inter':>6} {'Windows':>9} {'Samples/s':>10}")
+    here = os.path.dirname(os.path.abspath(__file__))
+    label = lambda n: 'auto' if n == 0 else n
+    for intra, inter in settings:
+        for pipeline in ('sequence', 'tf.data'):
+            out = subprocess.check_output([sys.executable, os.path.abspath(__file__), '--worker', pipeline,
+                                           str(intra), str(inter), str(args.epochs)], cwd=here, stderr=subprocess.DEVNULL)
+            result = json.loads(out.decode().strip().splitlines()[-1])
+            print(f"{pipeline:<10} {label(intra):>6} {label(inter):>6} {result['windows']:>9,} {result['samples_per_sec']:>10,.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- CONFIGURATION ---
+PERIOD = 1.0           # Seconds between tick deadlines
+SUMMARY_EVERY = 60     # Ticks between summary lines (0 disables)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)  # Seconds
+
+def _fmt_labels(labels):
+    return '{' + ','.join(f'{k}="{v}"' for k, v in labels.items()) + '}' if labels else ''
+
+class Counter:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+class Gauge(Counter):
+    def set(self, value):
+        with self._lock:
+            self.value = value
+
+class Histogram:
+    """ Prometheus-style cumulative histogram (seconds) """
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self.sum += value
+            self.count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+    def quantile(self, q):
+        """ Upper bound of the bucket holding the q-quantile (inf if it is past the last bucket) """
+        with self._lock:
+            target, seen = q * self.count, 0
+            for bound, n in zip(self.buckets, self.counts):
+                seen += n
+                if seen >= target and self.count:
+                    return bound
+        return float('inf') if self.count else 0.0
+
+    def render(self, name, labels):
+        lines, cumulative = [], 0
+        with self._lock:
+            for bound, n in zip(self.buckets, self.counts):
+                cumulative += n
+                lines.append(f"{name}_bucket{_fmt_labels(dict(labels, le=bound))} {cumulative}")
+            lines.append(f"{name}_bucket{_fmt_labels(dict(labels, le='+Inf'))} {self.count}")
+            lines.append(f"{name}_sum{_fmt_labels(labels)} {self.sum:.6f}")
+            lines.append(f"{name}_count{_fmt_labels(labels)} {self.count}")
+        return lines
+
+class MetricsRegistry:
+    """ Minimal metric registry rendered in the Prometheus text exposition format """
+
+    def __init__(self, **const_labels):
+        self.const_labels = const_labels
+        self._families = {}  # name -> (type, help, {labels tuple: metric})
+
+    def _get(self, kind, factory, name, help_text, labels):
+        family = self._families.setdefault(name, (kind, help_text, {}))[2]
+        key = tuple(sorted((labels or {}).items()))
+        if key not in family:
+            family[key] = factory()
+        return family[key]
+
+    def counter(self, name, help_text, labels=None):
+        return self._get('counter', Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text, labels=None):
+        return self._get('gauge', Gauge, name, help_text, labels)
+
+    def histogram(self, name, help_text, labels=None, buckets=BUCKETS):
+        return self._get('histogram', lambda: Histogram(buckets), name, help_text, labels)
+
+    def render(self):
+        lines = []
+        for name, (kind, help_text, family) in self._families.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            for key, metric in family.items():
+                labels = dict(self.const_labels, **dict(key))
+                if kind == 'histogram':
+                    lines += metric.render(name, labels)
+                else:
+                    lines.append(f"{name}{_fmt_labels(labels)} {metric.value}")
+        return '\n'.join(lines) + '\n'
+
+def start_metrics_server(registry, port, host='0.0.0.0'):
+    """ Serves registry.render() on http://host:port/metrics from a daemon thread """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    return server
+
+class ControlLoop:
+    """
+    Fixed-rate tick scheduler. Ticks run on absolute deadlines (start + k * period), so the
+    time spent observing, predicting and acting does not stretch the period. A tick that runs
+    past its deadline counts as an overrun, and every deadline it ran over is counted as skipped.
+    """
+
+    def __init__(self, name, period=PERIOD, metrics_port=None, summary_every=SUMMARY_EVERY):
+        self.name = name
+        self.period = period
+        self.summary_every = summary_every
+        self.metrics = MetricsRegistry(controller=name)
+        self.metrics.gauge('controller_tick_period_seconds', "Configured control-loop period").set(period)
+        self.ticks = self.metrics.counter('controller_ticks_total', "Ticks executed")
+        self.overruns = self.metrics.counter('controller_overruns_total', "Ticks that finished after the next deadline")
+        self.skipped = self.metrics.counter('controller_skipped_ticks_total', "Deadlines missed because a tick overran")
+        self.jitter = self.metrics.histogram('controller_tick_jitter_seconds', "Tick start minus its scheduled deadline")
+        self.duration = self.metrics.histogram('controller_tick_duration_seconds', "Wall time of a whole tick")
+        self._phases = {}
+        self._server = start_metrics_server(self.metrics, metrics_port) if metrics_port else None
+
+    def phase_histogram(self, phase):
+        if phase not in self._phases:
+            self._phases[phase] = self.metrics.histogram('controller_phase_duration_seconds',
+                                                         "Time spent in each control-loop phase", {'phase': phase})
+        return self._phases[phase]
+
+    @contextmanager
+    def phase(self, phase):
+        """ with loop.phase('observe'): ... records the block's duration """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_histogram(phase).observe(time.perf_counter() - start)
+
+    def __iter__(self):
+        deadline = time.monotonic()
+        tick = 0
+        while True:
+            started = time.monotonic()
+            self.jitter.observe(max(0.0, started - deadline))
+            yield tick
+            finished = time.monotonic()
+            self.duration.observe(finished - started)
+            self.ticks.inc()
+            tick += 1
+
+            deadline += self.period
+            if finished > deadline:
+                missed = int((finished - deadline) // self.period) + 1
+                self.overruns.inc()
+                self.skipped.inc(missed)
+                deadline += missed * self.period  # Realign to the grid instead of bursting to catch up
+
+            if self.summary_every and tick % self.summary_every == 0:
+                print('\n' + self.summary_line())
+            time.sleep(max(0.0, deadline - time.monotonic()))
+
+    def summary_line(self):
+        phases = ' | '.join(f"{p} p50<={h.quantile(0.5) * 1000:g}ms p99<={h.quantile(0.99) * 1000:g}ms"
+                            for p, h in self._phases.items())
+        return (f"[LOOP {self.name}] ticks={self.ticks.value:.0f} overruns={self.overruns.value:.0f} "
+                f"skipped={self.skipped.value:.0f} jitter p99<={self.jitter.quantile(0.99) * 1000:g}ms | {phases}")
@@ -0,0 +1,159 @@
+import csv
+import io
+import json
+import os
+import time
+import numpy as np
+from logger import CONTAINER_RING_FILE, CONTAINERS_PER_SAMPLE, LOG_FILE, RING_FILE, SERVICE_NAME as LOGGED_SERVICE
+from policies import WINDOW_SIZE
+from telemetry_ring import RingReader
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATE_DIR = os.path.join(BASE_DIR, 'data', 'state')
+SAVE_EVERY = 5       # Ticks between snapshots (and one more on a clean exit)
+MAX_AGE = 30.0       # Seconds: an older snapshot or logger tail no longer describes the present load
+CSV_TAIL_BYTES = 256 * 1024  # Read from the end of system_metrics.csv; plenty for one window at 0.1s sampling
+
+def _per_period(times, values, period, n):
+    """ Means over `period`-second bins, last `n` bins, oldest first """
+    bins = np.floor(np.asarray(times) / period).astype(np.int64)
+    _, inverse = np.unique(bins, return_inverse=True)
+    means = np.bincount(inverse, weights=values) / np.bincount(inverse)
+    return means[-n:]
+
+def _csv_tail(path, n, period):
+    """ (last sample time, host CPU 0-1) from the tail of system_metrics.csv; its mtime dates the last row """
+    with open(path, 'rb') as f:
+        header = f.readline().decode()
+        start = max(f.seek(0, os.SEEK_END) - CSV_TAIL_BYTES, f.seek(len(header)))
+        f.seek(start)
+        chunk = f.read().decode(errors='ignore')
+    if start > len(header):
+        chunk = chunk.split('\n', 1)[-1]  # Drop the partial first row
+    rows = list(csv.DictReader(io.StringIO(header + chunk)))
+    rows = [r for r in rows if r.get('Time') and r.get('CPU_Percent')]
+    if not rows:
+        return None
+    elapsed = np.array([float(r['Time']) for r in rows])
+    cpu = np.array([float(r['CPU_Percent']) for r in rows]) / 100.0
+    last = os.path.getmtime(path)
+    return last, _per_period(last - (elapsed[-1] - elapsed), cpu, period, n)
+
+def logger_tail(service, n=WINDOW_SIZE, period=1.0, max_age=MAX_AGE, directory='.'):
+    """
+    Last `n` per-period load samples (0-1) recorded by logger.py for `service`, or None when the
+    logger has nothing recent. The per-container ring is the same per-replica mean the agents
+    observe; the host ring or system_metrics.csv (host CPU) stand in when only they exist.
+    """
+    now = time.time()
+    for name in (CONTAINER_RING_FILE, RING_FILE):
+        path = os.path.join(directory, name)
+        if not os.path.exists(path):
+            continue
+        try:
+            reader = RingReader(path)
+        except (ValueError, OSError):
+            continue
+        if reader.meta.get('service') != service or not len(reader):
+            continue
+        samples = int(n * period / reader.meta.get('interval', period)) + 1
+        records = reader.snapshot(samples * (CONTAINERS_PER_SAMPLE if name == CONTAINER_RING_FILE else 1))
+        if len(records) and now - records['time'][-1] <= max_age:
+            return _per_period(records['time'], records['cpu_percent'].astype(np.float64) / 100.0, period, n)
+    path = os.path.join(directory, LOG_FILE)
+    if service == LOGGED_SERVICE and os.path.exists(path):
+        tail = _csv_tail(path, n, period)
+        if tail is not None and now - tail[0] <= max_age:
+            return tail[1]
+    return None
+
+class ControllerState:
+    """
+    Per-controller snapshot of every service's policy state (history window, rolling stats,
+    breach counts) and last scale request, written atomically every `save_every` ticks.
+    On startup seed() restores a service from the snapshot when it is at most `max_age`
+    seconds old, else from the logger's recorded tail, so predictions start on the first tick;
+    only when neither is recent does the policy warm up from scratch.
+    """
+
+    def __init__(self, controller, period=1.0, path=None, save_every=SAVE_EVERY, max_age=MAX_AGE):
+        self.controller = controller
+        self.period = period
+        self.path = path or os.path.join(STATE_DIR, f'{controller}.json')
+        self.save_every = save_every
+        self.max_age = max_age
+        self.decisions = {}   # service -> {'request': replicas, 'time': epoch seconds}
+        self._ticks = 0
+        self._saved = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        age = time.time() - saved.get('time', 0)
+        if saved.get('period') != self.period or age > self.max_age:
+            print(f"Saved state {self.path} is {age:.0f}s old (max {self.max_age:.0f}s) or for another period: not used")
+            return {}
+        return saved.get('services', {})
+
+    def seed(self, name, policy):
+        """ Restores `policy` for service `name`; returns where it came from ('snapshot', 'logger') or None """
+        saved = self._saved.pop(name, None)
+        if saved and saved.get('policy') == policy.name:
+            policy.load_state(saved['state'])
+            if saved.get('decision'):
+                self.decisions[name] = saved['decision']
+            source = 'snapshot'
+        else:
+            tail = logger_tail(name, WINDOW_SIZE, self.period, self.max_age)
+            if tail is None:
+                return None
+            for load in tail:
+                policy.observe(load)
+            source = 'logger'
+        print(f"   [STATE] {name}: seeded from {source}" +
+              (f" ({len(policy.history)}/{WINDOW_SIZE} samples)" if hasattr(policy, 'history') else ''))
+        return source
+
+    def decided(self, name, request):
+        self.decisions[name] = {'request': int(request), 'time': time.time()}
+
+    def tick(self, policies):
+        """ Call once per tick; snapshots every `save_every` ticks """
+        self._ticks += 1
+        if self._ticks % self.save_every == 0:
+            self.save(policies)
+
+    def save(self, policies):
+        """ Written beside the target, then renamed over it: a crash mid-write leaves the previous snapshot """
+        services = {name: {'policy': policy.name, 'state': policy.state(), 'decision': self.decisions.get(name)}
+                    for name, policy in policies.items()}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'controller': self.controller, 'time': time.time(), 'period': self.period, 'services': services}, f)
+        os.replace(tmp, self.path)
+
+if __name__ == "__main__":
+    # Per-save cost of a two-service snapshot (behaviour is covered by tests/test_controller_state.py)
+    import tempfile
+    from policies import AdaptivePolicy, ReactivePolicy
+
+    rng = np.random.default_rng(0)
+    load = (0.4 + 0.2 * np.sin(np.arange(200) / 10) + rng.normal(0, 0.03, 200)).clip(0, 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'orchestrator.json')
+        state = ControllerState('orchestrator', path=path)
+        live = {'web_app': AdaptivePolicy(), 'api': ReactivePolicy()}
+        for x in load:
+            for policy in live.values():
+                policy.observe(x)
+        state.decided('web_app', 3)
+
+        start = time.perf_counter()
+        for _ in range(1000):
+            state.save(live)
+        print(f"Save: {(time.perf_counter() - start):.3f}ms per snapshot ({os.path.getsize(path)} bytes)")
@@ -0,0 +1,127 @@
+import threading
+import time
+import docker
+
+# --- CONFIGURATION ---
+REFRESH_INTERVAL = 2.0  # Seconds between replica discovery passes
+STALE_AFTER = 5.0       # Drop a replica's sample if its stream goes quiet this long
+
+def cpu_percent_from_stats(prev, curr):
+    """ Same formula as `docker stats`: container CPU delta over host CPU delta, times online CPUs """
+    try:
+        cpu_delta = curr['cpu_stats']['cpu_usage']['total_usage'] - prev['cpu_stats']['cpu_usage']['total_usage']
+        system_delta = curr['cpu_stats']['system_cpu_usage'] - prev['cpu_stats']['system_cpu_usage']
+    except (KeyError, TypeError):
+        return None
+    if cpu_delta < 0 or system_delta <= 0:
+        return None
+    online_cpus = curr['cpu_stats'].get('online_cpus') \
+        or len(curr['cpu_stats']['cpu_usage'].get('percpu_usage') or []) or 1
+    return (cpu_delta / system_delta) * online_cpus * 100.0
+
+class ServiceCpuCollector:
+    """
+    Keeps one persistent Docker stats stream open per running task of a Swarm service.
+    Replicas are discovered in the background, so `latest()` never blocks on the daemon.
+    """
+
+    def __init__(self, client, service_name, refresh_interval=REFRESH_INTERVAL, api_calls=None):
+        self.client = client
+        self.api_calls = api_calls  # Optional ApiCallCounter for discovery calls
+        self.service_name = service_name
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._samples = {}   # container_id -> (timestamp, cpu_percent)
+        self._streams = {}   # container_id -> (thread, stop event)
+        self._stop = threading.Event()
+        self._watcher = None
+
+    def start(self):
+        self._watcher = threading.Thread(target=self._watch_replicas, name=f"cpu-watch-{self.service_name}", daemon=True)
+        self._watcher.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        for cid in list(self._streams):
+            self._close_stream(cid)
+
+    def latest(self):
+        """ Non-blocking snapshot: per-replica CPU %, aggregate total and per-replica mean """
+        now = time.time()
+        with self._lock:
+            per_replica = {cid: cpu for cid, (ts, cpu) in self._samples.items() if now - ts <= STALE_AFTER}
+        total = sum(per_replica.values())
+        mean = total / len(per_replica) if per_replica else 0.0
+        return {'timestamp': now, 'replicas': per_replica, 'total': total, 'mean': mean}
+
+    # --- Replica discovery ---
+    def _running_containers(self):
+        label = f"com.docker.swarm.service.name={self.service_name}"
+        if self.api_calls is not None:
+            self.api_calls.hit('containers.list')
+        return {c.id: c for c in self.client.containers.list(filters={'label': label, 'status': 'running'})}
+
+    def _watch_replicas(self):
+        while not self._stop.is_set():
+            try:
+                self.sync(self._running_containers())
+            except Exception as e:
+                print(f"[COLLECTOR] Replica discovery failed for {self.service_name}: {e}")
+            self._stop.wait(self.refresh_interval)
+
+    def sync(self, containers):
+        """ Open streams for new replicas and close streams for replicas that went away """
+        for cid in set(self._streams) - set(containers):
+            self._close_stream(cid)
+        for cid, container in containers.items():
+            thread = self._streams.get(cid, (None, None))[0]
+            if thread is None or not thread.is_alive():
+                self._open_stream(cid, container)
+
+    def _open_stream(self, cid, container):
+        closed = threading.Event()
+        thread = threading.Thread(target=self._consume, args=(cid, container, closed), name=f"cpu-{cid[:12]}", daemon=True)
+        self._streams[cid] = (thread, closed)
+        thread.start()
+
+    def _close_stream(self, cid):
+        # The stream ends on its own once the container stops; the flag only stops us recording it
+        _, closed = self._streams.pop(cid, (None, None))
+        with self._lock:
+            if closed is not None:
+                closed.set()
+            self._samples.pop(cid, None)
+
+    def _consume(self, cid, container, closed):
+        prev = None
+        try:
+            for stats in container.stats(stream=True, decode=True):
+                if closed.is_set() or self._stop.is_set():
+                    break
+                if prev is not None:
+                    cpu = cpu_percent_from_stats(prev, stats)
+                    if cpu is not None:
+                        with self._lock:
+                            if not closed.is_set():
+                                self._samples[cid] = (time.time(), cpu)
+                prev = stats
+        except Exception:
+            # Container went away mid-stream; the watcher reopens it if it is still running
+            pass
+        finally:
+            with self._lock:
+                if not closed.is_set():
+                    self._samples.pop(cid, None)
+
+if __name__ == "__main__":
+    import sys
+    service = sys.argv[1] if len(sys.argv) > 1 else "web_app"
+    collector = ServiceCpuCollector(docker.from_env(), service).start()
+    try:
+        while True:
+            snap = collector.latest()
+            print(f"Replicas: {len(snap['replicas'])} | Total: {snap['total']:6.1f}% | Mean: {snap['mean']:5.1f}%", end='\r')
+            time.sleep(1)
+    except KeyboardInterrupt:
+        collector.stop()
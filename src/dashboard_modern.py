@@ -1,43 +1,277 @@
-from flask import Flask, render_template, jsonify
-import pandas as pd
+from flask import Flask, render_template, jsonify, request, Response
+import argparse
+import json
 import os
+import threading
 import time
+from collections import deque
+from telemetry_ring import RingReader
 
 app = Flask(__name__, template_folder='templates')
 
+# --- CONFIGURATION ---
+SYSTEM_FILE = "system_metrics.csv"
+SYSTEM_RING = "system_metrics.ring"   # Preferred over the CSV when the logger runs with --ring
+TRAFFIC_FILE = "traffic_metrics.csv"
+WINDOW_SECONDS = 60     # History kept in memory and sent in a snapshot
+POLL_INTERVAL = 0.5     # Seconds between checks for appended rows (one reader shared by every client)
+HEARTBEAT = 15.0        # Seconds between SSE keep-alive comments
+DELTA_HISTORY = 120     # Versions a reconnecting stream can catch up on before it gets a fresh snapshot
+TAIL_BLOCK = 8192       # Bytes read per step when seeking back to the last rows of a long file
+BOOT_ID = os.urandom(4).hex()  # Prefixes ETags and SSE ids: the version counter starts over with every process
+
+# JSON key -> CSV column
+SYSTEM_COLUMNS = {'sys_time': 'Time', 'cpu': 'CPU_Percent', 'mem': 'Memory_Percent',
+                  'net': 'Network_RX_MB', 'replicas': 'Replicas'}
+TRAFFIC_COLUMNS = {'latency': 'Avg_Latency_ms', 'tokens_lost': 'Tokens_Lost', 'throughput': 'Throughput_RPS'}
+
+class CsvTail:
+    """
+    Last `window` rows of a growing CSV. Each poll reads only the bytes appended since the
+    previous one; a new file (rewritten header, truncation) starts the window over.
+    """
+
+    def __init__(self, path, columns, window=WINDOW_SECONDS):
+        self.path = path
+        self.columns = columns
+        self.window = window
+        self._reset(None)
+
+    def _reset(self, inode):
+        self.values = {key: deque(maxlen=self.window) for key in self.columns}
+        self._inode = inode
+        self._offset = 0
+        self._index = None  # JSON key -> field position, from the header
+        self._partial = b''
+
+    def _seek_tail(self, f, start, size):
+        """ Offset of the first of the last `window` lines, reading backwards from the end """
+        pos, newlines = size, 0
+        while pos > start and newlines <= self.window:
+            step = min(TAIL_BLOCK, pos - start)
+            pos -= step
+            f.seek(pos)
+            newlines += f.read(step).count(b'\n')
+        if pos == start:
+            return start
+        f.seek(pos)
+        f.readline()  # Drop the partial line we landed in
+        while newlines > self.window + 1:
+            f.readline()
+            newlines -= 1
+        return f.tell()
+
+    def poll(self):
+        """ Returns ({key: [new values]}, reset) for the rows appended since the last poll """
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return {}, False
+        reset = st.st_ino != self._inode or st.st_size < self._offset
+        if reset:
+            self._reset(st.st_ino)
+        if st.st_size == self._offset:
+            return {}, reset
+
+        with open(self.path, 'rb') as f:
+            if self._index is None:
+                header = f.readline()
+                if not header.endswith(b'\n'):
+                    return {}, reset  # Header still being written
+                names = header.decode().strip().split(',')
+                self._index = {key: names.index(col) for key, col in self.columns.items() if col in names}
+                self._offset = self._seek_tail(f, f.tell(), st.st_size)
+            f.seek(self._offset)
+            data = f.read(st.st_size - self._offset)
+        self._offset += len(data)
+
+        lines = (self._partial + data).split(b'\n')
+        self._partial = lines.pop()  # Incomplete last line, finished by a later poll
+        new = {key: [] for key in self._index}
+        for line in lines:
+            fields = line.decode().split(',')
+            try:
+                row = {key: float(fields[i]) for key, i in self._index.items()}
+            except (ValueError, IndexError):
+                continue
+            for key, value in row.items():
+                new[key].append(value)
+                self.values[key].append(value)
+        return (new if any(new.values()) else {}), reset
+
+class RingTail:
+    """ Same interface as CsvTail over the logger's memory-mapped ring (only new records are read) """
+
+    def __init__(self, path, columns, window_seconds=WINDOW_SECONDS):
+        self.path = path
+        self.columns = columns
+        self.window_seconds = window_seconds
+        self.values = {}
+        self._reader = None
+
+    def _open(self):
+        self._reader = RingReader(self.path)
+        self._size = os.path.getsize(self.path)
+        csv_columns = self._reader.meta.get('csv_columns', {})
+        self._fields = {key: csv_columns[col] for key, col in self.columns.items() if col in csv_columns}
+        window = max(1, int(self.window_seconds / self._reader.meta.get('interval', 1.0)))
+        self.values = {key: deque(maxlen=window) for key in self.columns}
+        self._seq = max(0, self._reader.written - window)
+
+    def poll(self):
+        reset = False
+        # A restarted logger recreates the file: remap before touching the old mapping
+        if self._reader is None or os.path.getsize(self.path) != self._size or self._reader.written < self._seq:
+            self._open()
+            reset = True
+        records = self._reader.snapshot(since=self._seq)
+        self._seq += len(records)
+        if not len(records):
+            return {}, reset
+        new = {key: records[field].tolist() for key, field in self._fields.items()}
+        for key, values in new.items():
+            self.values[key].extend(values)
+        return new, reset
+
+class MetricsHub:
+    """
+    One background reader for every client. Each poll that finds new rows bumps `version`
+    and records the delta, so SSE streams and ETag pollers share the same work.
+    """
+
+    def __init__(self, sources, interval=POLL_INTERVAL):
+        self.sources = sources
+        self.interval = interval
+        self.version = 0
+        self._deltas = deque(maxlen=DELTA_HISTORY)  # (version, {key: [values]} or None for a reset)
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def start(self):
+        with self._cond:
+            if self._thread is None:
+                self._poll()
+                self._thread = threading.Thread(target=self._run, name='metrics-hub', daemon=True)
+                self._thread.start()
+        return self
+
+    def _poll(self):
+        delta, reset = {}, False
+        for source in self.sources:
+            try:
+                new, was_reset = source.poll()
+            except Exception as e:
+                print(f"[DASHBOARD] Could not read {source.path}: {e}")
+                continue
+            delta.update(new)
+            reset = reset or was_reset
+        if delta or reset:
+            self.version += 1
+            self._deltas.append((self.version, None if reset else delta))
+            self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._cond:
+                self._poll()
+
+    def snapshot(self):
+        """ (version, {key: [window values]}) in the shape /api/data has always returned """
+        with self._cond:
+            data = {}
+            for source in self.sources:
+                data.update({key: list(values) for key, values in source.values.items() if values})
+            return self.version, data
+
+    def windows(self):
+        """ {key: number of values the window keeps}, so clients trim deltas the same way """
+        with self._cond:
+            return {key: values.maxlen for source in self.sources for key, values in source.values.items()}
+
+    def wait(self, since, timeout):
+        """ Blocks until a version newer than `since`; returns (version, merged delta or None for a snapshot) """
+        with self._cond:
+            self._cond.wait_for(lambda: self.version > since, timeout)
+            if self.version == since:
+                return since, {}
+            deltas = [d for v, d in self._deltas if v > since]
+            if len(deltas) < self.version - since or any(d is None for d in deltas):
+                return self.version, None  # Fell behind the history, or a file started over
+            merged = {}
+            for delta in deltas:
+                for key, values in delta.items():
+                    merged.setdefault(key, []).extend(values)
+            return self.version, merged
+
+def make_hub(system_file=SYSTEM_FILE, system_ring=SYSTEM_RING, traffic_file=TRAFFIC_FILE):
+    system = RingTail(system_ring, SYSTEM_COLUMNS) if os.path.exists(system_ring) else CsvTail(system_file, SYSTEM_COLUMNS)
+    return MetricsHub([system, CsvTail(traffic_file, TRAFFIC_COLUMNS)])
+
+hub = make_hub()
+
+def tag(version):
+    """ ETag / SSE event id for a hub version, unique across restarts """
+    return f"{BOOT_ID}-{version}"
+
+def sse(event, data, version):
+    return f"id: {tag(version)}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
 @app.route('/')
 def index():
     return render_template('modern_dashboard.html')
 
 @app.route('/api/data')
 def get_data():
-    data = {}
-    
-    # 1. Load System Telemetry
-    if os.path.exists("system_metrics.csv"):
-        try:
-            sys_df = pd.read_csv("system_metrics.csv").tail(60)
-            data['sys_time'] = sys_df['Time'].tolist()
-            data['cpu'] = sys_df['CPU_Percent'].tolist()
-            data['mem'] = sys_df['Memory_Percent'].tolist()
-            data['net'] = sys_df['Network_RX_MB'].tolist()
-            data['replicas'] = sys_df['Replicas'].tolist()
-        except:
-            pass
-    
-    # 2. Load Traffic Telemetry
-    if os.path.exists("traffic_metrics.csv"):
-        try:
-            traf_df = pd.read_csv("traffic_metrics.csv").tail(60)
-            data['latency'] = traf_df['Avg_Latency_ms'].tolist()
-            data['tokens_lost'] = traf_df['Tokens_Lost'].tolist()
-            data['throughput'] = traf_df['Throughput_RPS'].tolist()
-        except:
-            pass
-        
-    return jsonify(data)
+    """ Full window; conditional on If-None-Match so an unchanged window costs a 304 and no JSON """
+    hub.start()
+    etag = tag(hub.version)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        version, data = hub.snapshot()
+        etag = tag(version)
+        response = jsonify(data)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/api/stream')
+def stream():
+    """ Server-Sent Events: one snapshot, then only the rows appended since the last event """
+    hub.start()
+
+    def snapshot():
+        version, data = hub.snapshot()
+        return version, sse('snapshot', dict(data, _window=hub.windows()), version)
+
+    def events():
+        version, event = snapshot()
+        yield event
+        while True:
+            new_version, delta = hub.wait(version, HEARTBEAT)
+            if new_version == version:
+                yield ": keep-alive\n\n"
+            elif delta is None:
+                version, event = snapshot()
+                yield event
+            else:
+                version = new_version
+                yield sse('delta', delta, version)
+
+    return Response(events(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Live dashboard for the telemetry and traffic logs")
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--system', default=SYSTEM_FILE)
+    parser.add_argument('--system-ring', default=SYSTEM_RING)
+    parser.add_argument('--traffic', default=TRAFFIC_FILE)
+    parser.add_argument('--no-debug', action='store_true', help="disable the Flask debugger and reloader")
+    args = parser.parse_args()
+    hub = make_hub(args.system, args.system_ring, args.traffic)
+
     # Running on 0.0.0.0 to allow access from other devices if needed
-    print("Dashboard live at http://localhost:5000")
-    app.run(debug=True, port=5000, host='0.0.0.0')
\ No newline at end of file
+    print(f"Dashboard live at http://localhost:{args.port}")
+    app.run(debug=not args.no_debug, port=args.port, host='0.0.0.0', threaded=True)
@@ -1,69 +1,217 @@
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import MinMaxScaler
+import argparse
+import concurrent.futures
+import hashlib
 import glob
 import os
+import json
+import shutil
+import time
 
 # --- CONFIGURATION ---
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 RAW_DIR = os.path.join(BASE_DIR, 'data', 'raw')
-OUTPUT_FILE = os.path.join(BASE_DIR, 'data', 'processed', 'universal_training_data.csv')
+CACHE_DIR = os.path.join(BASE_DIR, 'data', 'cache')
+# Binary .npy so the trainer can memory-map it instead of re-parsing text
+OUTPUT_FILE = os.path.join(BASE_DIR, 'data', 'processed', 'universal_training_data.npy')
+# Cumulative trace offsets, so the trainer never builds a window across two traces
+BOUNDS_FILE = os.path.join(BASE_DIR, 'data', 'processed', 'universal_training_data.bounds.npy')
 
-def process_universal_data():
+# Streaming mode (--stream): one scaled shard per trace plus the persisted scaler
+SHARD_DIR = os.path.join(BASE_DIR, 'data', 'processed', 'shards')
+SCALER_FILE = os.path.join(BASE_DIR, 'data', 'processed', 'scaler.json')
+CHUNK_ROWS = 100_000
+
+def cache_path_for(file):
+    """ One columnar cache file per raw trace, keyed by path + mtime + size """
+    st = os.stat(file)
+    key = hashlib.sha1(f"{os.path.abspath(file)}|{st.st_mtime_ns}|{st.st_size}".encode()).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"{os.path.basename(file)}.{key}.npy")
+
+def read_trace(file, **kwargs):
+    # Bitbrains separates fields with ';\t'. A multi-char sep forces the slow Python engine,
+    # so split on ';' with the C engine and let skipinitialspace eat the tab.
+    return pd.read_csv(file, sep=';', skipinitialspace=True, usecols=lambda c: 'CPU' in c, **kwargs)
+
+def cpu_util_column(df):
+    """ float32 cpu_util for a parsed trace (or chunk of one); None if it has no CPU columns """
+    df.columns = df.columns.str.strip()
+
+    # Auto-detect CPU columns (Usage & Capacity)
+    usage_col = next((c for c in df.columns if 'usage' in c and 'CPU' in c), None)
+    cap_col = next((c for c in df.columns if 'capacity' in c and 'CPU' in c), None)
+    if not (usage_col and cap_col):
+        return None
+
+    # Calculate Utilization %, drop infinity/NaN and clip to 0.0 - 1.0
+    cpu_util = (df[usage_col] / df[cap_col]).replace([np.inf, -np.inf], np.nan).dropna()
+    return cpu_util.clip(0.0, 1.0).to_numpy(dtype=np.float32)
+
+def parse_trace(file):
+    """ Parses one Bitbrains trace into a float32 cpu_util column (None if it has no CPU columns) """
+    return cpu_util_column(read_trace(file))
+
+def iter_trace_chunks(file, chunk_rows=CHUNK_ROWS):
+    """ Yields the cpu_util column of a trace `chunk_rows` rows at a time """
+    for chunk in read_trace(file, chunksize=chunk_rows):
+        cpu_util = cpu_util_column(chunk)
+        if cpu_util is None:
+            raise ValueError("no CPU usage/capacity columns")
+        yield cpu_util
+
+def build_cache(file):
+    """ Worker: parse a raw trace and write its cache file. Returns (cache_path or None, error) """
+    try:
+        cpu_util = parse_trace(file)
+        if cpu_util is None:
+            return None, "no CPU usage/capacity columns"
+        cache_file = cache_path_for(file)
+        # Drop caches left behind by older versions of this file
+        for old in glob.glob(os.path.join(CACHE_DIR, f"{glob.escape(os.path.basename(file))}.*.npy")):
+            os.remove(old)
+        tmp = cache_file + '.tmp.npy'
+        np.save(tmp, cpu_util)
+        os.replace(tmp, cache_file)
+        return cache_file, None
+    except Exception as e:
+        return None, str(e)
+
+def load_traces(files, workers=None):
+    """ Returns {file: cpu_util array}; cached traces are memory-mapped, the rest are parsed in a process pool """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    cached = {f: cache_path_for(f) for f in files}
+    misses = [f for f in files if not os.path.exists(cached[f])]
+
+    if misses:
+        print(f"   Parsing {len(misses)} changed/new trace(s), {len(files) - len(misses)} cached...")
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            for file, (cache_file, err) in zip(misses, pool.map(build_cache, misses)):
+                cached[file] = cache_file
+                if err:
+                    print(f"   Skipping {file}: {err}")
+    else:
+        print(f"   All {len(files)} traces cached.")
+
+    return {f: np.load(c, mmap_mode='r') for f, c in cached.items() if c}
+
+def process_universal_data(workers=None):
     print("--- PHASE 1: UNIVERSAL DATA LOADER ---")
-    
+    start = time.perf_counter()
+
     # 1. Find all CSVs in data/raw
-    all_files = glob.glob(os.path.join(RAW_DIR, "*.csv"))
+    all_files = sorted(glob.glob(os.path.join(RAW_DIR, "*.csv")))
     print(f"Found {len(all_files)} trace files. Merging for Generalization...")
-    
+
     if len(all_files) == 0:
         print("ERROR: No CSV files found in data/raw/. Please add 5-10 Bitbrains files.")
         return
 
-    combined_data = []
-
-    # 2. Loop through every file and extract CPU usage
-    for file in all_files:
-        try:
-            # Bitbrains uses semicolon ';' separators
-            df = pd.read_csv(file, sep=';', engine='python')
-            
-            # Auto-detect CPU columns (Usage & Capacity)
-            usage_col = next((c for c in df.columns if 'usage' in c and 'CPU' in c), None)
-            cap_col = next((c for c in df.columns if 'capacity' in c and 'CPU' in c), None)
-            
-            if usage_col and cap_col:
-                # Calculate Utilization %
-                df['cpu_util'] = df[usage_col] / df[cap_col]
-                
-                # Clean Data (Remove infinity/NaN)
-                df = df.replace([np.inf, -np.inf], np.nan).dropna()
-                
-                # Clip to 0.0 - 1.0 range
-                df['cpu_util'] = df['cpu_util'].clip(0.0, 1.0)
-                
-                # Add to master list
-                combined_data.append(df[['cpu_util']].values)
-                print(f"   Loaded {os.path.basename(file)}: {len(df)} rows")
-        except Exception as e:
-            print(f"   Skipping {file}: {e}")
+    # 2. Extract CPU usage from every file (parallel parse, cached per file)
+    traces = load_traces(all_files, workers)
+    for file, cpu_util in traces.items():
+        print(f"   Loaded {os.path.basename(file)}: {len(cpu_util)} rows")
 
     # 3. Merge and Normalize
-    if not combined_data:
+    if not traces:
         print("ERROR: No valid data extracted.")
         return
 
-    full_dataset = np.vstack(combined_data)
+    full_dataset = np.concatenate(list(traces.values()))
     print(f"Total Universal Dataset: {len(full_dataset):,} rows.")
-    
-    # Normalize for LSTM
-    scaler = MinMaxScaler(feature_range=(0, 1))
-    scaled_data = scaler.fit_transform(full_dataset)
-    
+
+    # Normalize for LSTM (same as MinMaxScaler(feature_range=(0, 1)))
+    lo, hi = full_dataset.min(), full_dataset.max()
+    scaled_data = (full_dataset - lo) / ((hi - lo) or 1.0)
+
     # 4. Save
     os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    pd.DataFrame(scaled_data, columns=['cpu_scaled']).to_csv(OUTPUT_FILE, index=False)
-    print(f"--- SUCCESS: Universal Data saved to {OUTPUT_FILE} ---")
+    np.save(OUTPUT_FILE, scaled_data.astype(np.float32))
+    np.save(BOUNDS_FILE, np.cumsum([0] + [len(t) for t in traces.values()]))
+    elapsed = time.perf_counter() - start
+    print(f"--- SUCCESS: Universal Data saved to {OUTPUT_FILE} ({elapsed:.2f}s) ---")
+    return elapsed
+
+def fit_scaler_streaming(files, chunk_rows=CHUNK_ROWS):
+    """ Pass 1: global min/max and per-trace row counts, one chunk in memory at a time """
+    lo, hi, rows = np.inf, -np.inf, {}
+    for file in files:
+        try:
+            count = 0
+            for cpu_util in iter_trace_chunks(file, chunk_rows):
+                if len(cpu_util):
+                    lo, hi = min(lo, float(cpu_util.min())), max(hi, float(cpu_util.max()))
+                count += len(cpu_util)
+            rows[file] = count
+        except Exception as e:
+            print(f"   Skipping {file}: {e}")
+    return {'min': lo, 'max': hi, 'rows': rows}
+
+def write_shards(scaler, shard_dir=SHARD_DIR, chunk_rows=CHUNK_ROWS):
+    """ Pass 2: scale each trace chunk by chunk straight into its own pre-sized .npy shard """
+    os.makedirs(shard_dir, exist_ok=True)
+    span = (scaler['max'] - scaler['min']) or 1.0
+    shards = []
+    for file, count in scaler['rows'].items():
+        if count == 0:
+            continue
+        shard = os.path.join(shard_dir, os.path.splitext(os.path.basename(file))[0] + '.npy')
+        out = np.lib.format.open_memmap(shard, mode='w+', dtype=np.float32, shape=(count,))
+        pos = 0
+        for cpu_util in iter_trace_chunks(file, chunk_rows):
+            out[pos:pos + len(cpu_util)] = (cpu_util - scaler['min']) / span
+            pos += len(cpu_util)
+            out.flush()
+        del out
+        shards.append((shard, count))
+        print(f"   Sharded {os.path.basename(file)}: {count} rows")
+    return shards
+
+def process_universal_data_streaming(raw_dir=RAW_DIR, shard_dir=SHARD_DIR, scaler_file=SCALER_FILE, chunk_rows=CHUNK_ROWS):
+    """ Out-of-core variant: memory is bounded by `chunk_rows`, not by the size of the traces """
+    print("--- PHASE 1: UNIVERSAL DATA LOADER (STREAMING) ---")
+    all_files = sorted(glob.glob(os.path.join(raw_dir, "*.csv")))
+    print(f"Found {len(all_files)} trace files.")
+    if not all_files:
+        print("ERROR: No CSV files found.")
+        return
+
+    scaler = fit_scaler_streaming(all_files, chunk_rows)
+    if not any(scaler['rows'].values()):
+        print("ERROR: No valid data extracted.")
+        return
+    print(f"Pass 1: {sum(scaler['rows'].values()):,} rows, min={scaler['min']:.4f}, max={scaler['max']:.4f}")
+
+    shutil.rmtree(shard_dir, ignore_errors=True)
+    shards = write_shards(scaler, shard_dir, chunk_rows)
+    os.makedirs(os.path.dirname(scaler_file), exist_ok=True)
+    with open(scaler_file, 'w') as f:
+        json.dump({'min': scaler['min'], 'max': scaler['max'],
+                   'shards': {os.path.basename(shard): count for shard, count in shards}}, f, indent=2)
+    print(f"--- SUCCESS: {len(shards)} shards in {shard_dir}, scaler saved to {scaler_file} ---")
+    return [shard for shard, _ in shards]
+
+def benchmark(workers=None):
+    """ Cold (empty cache) vs warm (everything cached) end-to-end timings """
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
+    cold = process_universal_data(workers)
+    warm = process_universal_data(workers)
+    print(f"\nCold run: {cold:.2f}s | Warm run: {warm:.2f}s | Speed-up: {cold / warm:.1f}x")
 
 if __name__ == '__main__':
-    process_universal_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Merge Bitbrains traces into the universal training set")
+    parser.add_argument('--workers', type=int, default=None, help="parser processes (default: CPU count)")
+    parser.add_argument('--clear-cache', action='store_true', help="re-parse every trace")
+    parser.add_argument('--bench', action='store_true', help="time a cold run against a warm-cache run")
+    parser.add_argument('--stream', action='store_true', help="out-of-core mode: chunked two-pass scaling into per-trace shards")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    if args.stream:
+        process_universal_data_streaming(chunk_rows=args.chunk_rows)
+    elif args.bench:
+        benchmark(args.workers)
+    else:
+        if args.clear_cache:
+            shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        process_universal_data(args.workers)
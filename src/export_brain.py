@@ -0,0 +1,93 @@
+import argparse
+import json
+import os
+import h5py
+import numpy as np
+from numpy_brain import MODEL_PATH, QUANTIZED, npz_path_for
+
+# --- CONFIGURATION ---
+SUPPORTED_LAYERS = ('LSTM', 'Dense')
+SKIPPED_LAYERS = ('InputLayer', 'Dropout')  # No-ops at inference time
+
+def _layer_weights(group):
+    """ Collect every dataset under a layer group, keyed by its leaf name (kernel, recurrent_kernel, bias) """
+    weights = {}
+
+    def collect(name, obj):
+        if isinstance(obj, h5py.Dataset):
+            weights[name.split('/')[-1]] = obj[()]
+
+    group.visititems(collect)
+    return weights
+
+def quantize_weights(arrays, mode):
+    """
+    Weight-only quantization of every kernel: float16 casts, int8 stores symmetric per-output-column
+    codes plus a float32 scale (`<key>_scale`). Biases stay float32; they are a tiny share of the size.
+    """
+    out = {}
+    for key, w in arrays.items():
+        if key.endswith('_bias') or w.dtype.kind not in 'f':
+            out[key] = w
+        elif mode == 'float16':
+            out[key] = w.astype(np.float16)
+        else:
+            scale = (np.abs(w).max(axis=0) / 127.0).astype(np.float32)
+            scale[scale == 0] = 1.0
+            out[key] = np.clip(np.round(w / scale), -127, 127).astype(np.int8)
+            out[f'{key}_scale'] = scale
+    return out
+
+def export_brain(h5_path=MODEL_PATH, npz_path=None, quantize=None):
+    """
+    Pulls the LSTM and Dense weights out of a Keras .h5 file (plain h5py, no TensorFlow)
+    and writes them to a compact .npz the NumPy runtime can load, optionally quantized
+    to 'int8' or 'float16'.
+    """
+    npz_path = npz_path or npz_path_for(h5_path, quantize)
+    arrays = {}
+    kinds = []
+
+    with h5py.File(h5_path, 'r') as f:
+        config = json.loads(f.attrs['model_config'])
+        horizons = np.asarray(f.attrs.get('horizons', [1]), dtype=np.int64)  # Models from before multi-horizon training
+        weights_root = f['model_weights']
+
+        for layer in config['config']['layers']:
+            cls, cfg = layer['class_name'], layer['config']
+            if cls in SKIPPED_LAYERS:
+                continue
+            if cls not in SUPPORTED_LAYERS:
+                raise ValueError(f"Unsupported layer '{cls}' in {h5_path}")
+
+            w = _layer_weights(weights_root[cfg['name']])
+            i = len(kinds)
+            arrays[f'l{i}_kernel'] = w['kernel'].astype(np.float32)
+            arrays[f'l{i}_bias'] = w['bias'].astype(np.float32)
+
+            if cls == 'LSTM':
+                if cfg.get('activation') != 'tanh' or cfg.get('recurrent_activation') != 'sigmoid':
+                    raise ValueError(f"LSTM '{cfg['name']}' uses non-default activations")
+                arrays[f'l{i}_recurrent'] = w['recurrent_kernel'].astype(np.float32)
+                kinds.append('lstm_seq' if cfg.get('return_sequences') else 'lstm')
+            else:
+                if cfg.get('activation') not in (None, 'linear'):
+                    raise ValueError(f"Dense '{cfg['name']}' uses activation '{cfg['activation']}'")
+                kinds.append('dense')
+
+    if quantize:
+        arrays = quantize_weights(arrays, quantize)
+    arrays['layers'] = np.array(kinds)
+    arrays['horizons'] = horizons
+    os.makedirs(os.path.dirname(os.path.abspath(npz_path)), exist_ok=True)
+    np.savez(npz_path, **arrays)
+    return npz_path
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Export a Keras forecaster to the NumPy runtime's .npz format")
+    parser.add_argument('src', nargs='?', default=MODEL_PATH)
+    parser.add_argument('dst', nargs='?', default=None)
+    parser.add_argument('--quantize', choices=QUANTIZED, help="weight-only quantization for edge deployments")
+    args = parser.parse_args()
+    out = export_brain(args.src, args.dst, args.quantize)
+    print(f"Exported {args.src} -> {out} ({os.path.getsize(out) / 1024:.1f} KB)")
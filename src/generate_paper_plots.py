@@ -1,82 +1,136 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+import argparse
+import concurrent.futures
 import os
+import time
+import pandas as pd
+from analysis import load_system, load_traffic, align, downsample, bucket, MAX_POINTS
 
 # Configuration for Journal Quality
-plt.style.use('seaborn-v0_8-paper')
-sns.set_palette("husl")
 OUTPUT_DIR = "paper_assets"
-if not os.path.exists(OUTPUT_DIR):
-    os.makedirs(OUTPUT_DIR)
-
-def generate_plots():
-    print("--- Generating Journal Figures ---")
-    
-    # 1. Load Data
-    try:
-        sys_df = pd.read_csv("system_metrics.csv")
-        traf_df = pd.read_csv("traffic_metrics.csv")
-    except FileNotFoundError:
-        print("ERROR: CSV files not found. Run the experiment first!")
-        return
+DPI = 300
 
-    # Ensure datasets align (roughly) by index or time if needed
-    # For this script, we assume they ran concurrently
-    limit = min(len(sys_df), len(traf_df))
-    sys_df = sys_df.iloc[:limit]
-    traf_df = traf_df.iloc[:limit]
+def _style():
+    # Imported per worker process: matplotlib/seaborn state does not cross process boundaries
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    plt.style.use('seaborn-v0_8-paper')
+    sns.set_palette("husl")
+    return plt
 
-    # --- FIGURE 1: Latency vs CPU Correlation (The Core Problem) ---
+# --- FIGURE 1: Latency vs CPU Correlation (The Core Problem) ---
+def fig1(series, out_dir):
+    plt = _style()
     fig, ax1 = plt.subplots(figsize=(10, 6))
-    
+
     ax1.set_xlabel('Time (seconds)')
     ax1.set_ylabel('CPU Load (%)', color='tab:blue')
-    ax1.plot(sys_df['Time'], sys_df['CPU_Percent'], color='tab:blue', label='CPU Load')
+    ax1.plot(*series['cpu'], color='tab:blue', label='CPU Load')
     ax1.tick_params(axis='y', labelcolor='tab:blue')
-    
+
     ax2 = ax1.twinx()
     ax2.set_ylabel('Latency (ms)', color='tab:red')
-    ax2.plot(traf_df['Time'], traf_df['Avg_Latency_ms'], color='tab:red', linestyle='--', label='Latency')
+    ax2.plot(*series['latency'], color='tab:red', linestyle='--', label='Latency')
     ax2.tick_params(axis='y', labelcolor='tab:red')
-    
+
     plt.title("Fig 1. Correlation between CPU Saturation and Service Latency")
     fig.tight_layout()
-    plt.savefig(f"{OUTPUT_DIR}/Fig1_Latency_CPU.png", dpi=300)
-    print("Saved Fig 1.")
+    plt.savefig(f"{out_dir}/Fig1_Latency_CPU.png", dpi=DPI)
+    return "Fig 1"
 
-    # --- FIGURE 2: Throughput vs Scaling (The Solution) ---
+# --- FIGURE 2: Throughput vs Scaling (The Solution) ---
+def fig2(series, out_dir):
+    plt = _style()
     plt.figure(figsize=(10, 6))
-    plt.plot(traf_df['Time'], traf_df['Throughput_RPS'], label='Throughput (Req/s)', color='green')
-    plt.fill_between(sys_df['Time'], sys_df['Replicas'] * 10, color='cyan', alpha=0.2, label='Active Replicas (Scaled x10)')
+    plt.plot(*series['throughput'], label='Throughput (Req/s)', color='green')
+    replicas = series['replicas']
+    plt.fill_between(replicas['Time'], replicas['Replicas'] * 10, color='cyan', alpha=0.2, label='Active Replicas (Scaled x10)')
     plt.ylabel("Requests Per Second")
     plt.xlabel("Time (s)")
     plt.title("Fig 2. System Throughput Maintenance during Scaling Events")
     plt.legend()
-    plt.savefig(f"{OUTPUT_DIR}/Fig2_Throughput_Scaling.png", dpi=300)
-    print("Saved Fig 2.")
+    plt.savefig(f"{out_dir}/Fig2_Throughput_Scaling.png", dpi=DPI)
+    return "Fig 2"
 
-    # --- FIGURE 3: Tokens Lost Analysis (Reliability) ---
+# --- FIGURE 3: Tokens Lost Analysis (Reliability) ---
+def fig3(series, out_dir):
+    plt = _style()
     plt.figure(figsize=(10, 6))
-    plt.bar(traf_df['Time'], traf_df['Tokens_Lost'], color='orange', label='Failed Requests (Tokens Lost)')
-    plt.plot(sys_df['Time'], sys_df['CPU_Percent'], color='black', alpha=0.3, label='System Load Overlay')
+    lost = series['tokens_lost']
+    width = lost['Time'].diff().median() if len(lost) > 1 else 0.8
+    plt.bar(lost['Time'], lost['Tokens_Lost'], width=width, color='orange', label='Failed Requests (Tokens Lost)')
+    plt.plot(*series['cpu'], color='black', alpha=0.3, label='System Load Overlay')
     plt.xlabel("Time (s)")
     plt.ylabel("Count")
     plt.title("Fig 3. Temporal Distribution of Token Loss during High Load")
     plt.legend()
-    plt.savefig(f"{OUTPUT_DIR}/Fig3_Token_Loss.png", dpi=300)
-    print("Saved Fig 3.")
+    plt.savefig(f"{out_dir}/Fig3_Token_Loss.png", dpi=DPI)
+    return "Fig 3"
 
-    # --- FIGURE 4: Resource Overhead (Network & Memory) ---
+# --- FIGURE 4: Resource Overhead (Network & Memory) ---
+def fig4(series, out_dir):
+    plt = _style()
     fig, ax = plt.subplots(figsize=(10, 6))
-    ax.stackplot(sys_df['Time'], sys_df['Memory_Percent'], sys_df['Network_RX_MB'], 
+    resources = series['resources']
+    ax.stackplot(resources['Time'], resources['Memory_Percent'], resources['Network_RX_MB'],
                  labels=['Memory Usage (%)', 'Network RX (MB)'], colors=['purple', 'gray'])
     plt.legend(loc='upper left')
     plt.title("Fig 4. Resource Overhead Profile (Memory & Network)")
-    plt.savefig(f"{OUTPUT_DIR}/Fig4_Resource_Overhead.png", dpi=300)
-    print("Saved Fig 4.")
+    plt.savefig(f"{out_dir}/Fig4_Resource_Overhead.png", dpi=DPI)
+    return "Fig 4"
+
+FIGURES = [fig1, fig2, fig3, fig4]
+
+def prepare_series(run, max_points=MAX_POINTS):
+    """ Everything the figures plot, downsampled: LTTB for lines, shared buckets for bars and stacks """
+    def line(col):
+        if not max_points:
+            return run['Time'].to_numpy(), run[col].to_numpy()
+        return downsample(run, 'Time', col, max_points)
+
+    def shared(cols, how):
+        return bucket(run, 'Time', cols, max_points, how) if max_points else run[['Time'] + cols]
+
+    return {
+        'cpu': line('CPU_Percent'),
+        'latency': line('Avg_Latency_ms'),
+        'throughput': line('Throughput_RPS'),
+        'replicas': shared(['Replicas'], 'max'),
+        'tokens_lost': shared(['Tokens_Lost'], 'sum'),
+        'resources': shared(['Memory_Percent', 'Network_RX_MB'], 'mean'),
+    }
+
+def generate_plots(run_dir='.', out_dir=OUTPUT_DIR, workers=None, max_points=MAX_POINTS):
+    print("--- Generating Journal Figures ---")
+    os.makedirs(out_dir, exist_ok=True)
+    start = time.perf_counter()
+
+    # 1. Load Data
+    try:
+        sys_df = load_system(run_dir)
+        traf_df = load_traffic(run_dir)
+    except FileNotFoundError:
+        print("ERROR: CSV files not found. Run the experiment first!")
+        return
+
+    # Align on time (per-second aggregation + as-of join), not on row count: the loggers sample at different rates
+    run = align(sys_df, traf_df)
+    series = prepare_series(run, max_points)
+    loaded = time.perf_counter()
+
+    # Independent figures render in parallel processes
+    if workers == 1:
+        for figure in FIGURES:
+            print(f"Saved {figure(series, out_dir)}.")
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(figure, series, out_dir) for figure in FIGURES]
+            for future in futures:
+                print(f"Saved {future.result()}.")
+    rendered = time.perf_counter()
 
-    # --- TABLE 1: Statistical Summary CSV ---
+    # --- TABLE 1: Statistical Summary CSV (full-resolution data) ---
     summary = {
         "Metric": ["Avg Latency", "Max CPU", "Total Tokens Lost", "Avg Throughput", "Max Replicas"],
         "Value": [
@@ -87,8 +141,17 @@ def generate_plots():
             f"{sys_df['Replicas'].max()}"
         ]
     }
-    pd.DataFrame(summary).to_csv(f"{OUTPUT_DIR}/Table1_Performance_Summary.csv", index=False)
+    pd.DataFrame(summary).to_csv(f"{out_dir}/Table1_Performance_Summary.csv", index=False)
     print("Saved Table 1.")
+    print(f"Load + align + downsample: {loaded - start:.2f}s | render: {rendered - loaded:.2f}s | "
+          f"total: {time.perf_counter() - start:.2f}s ({len(sys_df):,} system rows, {len(traf_df):,} traffic rows)")
+    return time.perf_counter() - start
 
 if __name__ == "__main__":
-    generate_plots()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Journal figures for one experiment run")
+    parser.add_argument('--run-dir', default='.', help="directory holding system_metrics.csv/.ring and traffic_metrics.csv")
+    parser.add_argument('--out', default=OUTPUT_DIR)
+    parser.add_argument('--workers', type=int, default=None, help="render processes (1 renders serially)")
+    parser.add_argument('--max-points', type=int, default=MAX_POINTS, help="points per series after downsampling (0 plots raw data)")
+    args = parser.parse_args()
+    generate_plots(args.run_dir, args.out, args.workers, args.max_points)
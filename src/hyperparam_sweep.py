@@ -0,0 +1,245 @@
+import argparse
+import concurrent.futures
+import csv
+import itertools
+import multiprocessing
+import os
+import random
+import shutil
+import time
+import numpy as np
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SWEEP_DIR = os.path.join(BASE_DIR, 'models', 'sweeps')   # One timestamped run directory per sweep
+CACHE_DIR = os.path.join(BASE_DIR, 'data', 'cache')
+# Default search space; every horizon set starts at t+1 so trials are ranked on the same target
+SEARCH_SPACE = {
+    'window': [30, 60, 120],
+    'horizons': [(1,), (1, 5, 15, 30, 60)],
+    'units': [(100, 50), (64, 32), (128, 64)],
+    'batch': [128, 256],
+}
+EPOCHS = 10
+WORKERS = max(1, (os.cpu_count() or 1) // 2)
+TRIAL_THREADS = 2        # TensorFlow intra-op threads per trial; workers x threads should not exceed the cores
+LATENCY_RUNS = 200       # Single-window predictions timed per trial (NumPy runtime, as the agents run it)
+RESULT_COLUMNS = ['trial', 'window', 'horizons', 'units', 'batch', 'epochs', 'val_loss', 'val_t1_mse',
+                  'train_s', 'latency_ms', 'params', 'model']
+
+def parse_space(args):
+    """ Search space from the CLI: ';' separates values, ',' the items of a horizon set, '/' layer widths """
+    space = dict(SEARCH_SPACE)
+    if args.window:
+        space['window'] = [int(w) for w in args.window.split(',')]
+    if args.horizons:
+        space['horizons'] = [tuple(int(h) for h in hs.split(',')) for hs in args.horizons.split(';')]
+    if args.units:
+        space['units'] = [tuple(int(u) for u in us.split('/')) for us in args.units.split(',')]
+    if args.batch:
+        space['batch'] = [int(b) for b in args.batch.split(',')]
+    for horizons in space['horizons']:
+        if horizons[0] != 1:
+            raise SystemExit(f"Horizon set {horizons} must start at 1: trials are ranked on the t+1 forecast")
+    return space
+
+def trials_for(space, samples=None, seed=0):
+    """ Full grid, or `samples` distinct points drawn at random from it """
+    grid = [dict(zip(space, values)) for values in itertools.product(*space.values())]
+    if samples is not None and samples < len(grid):
+        grid = random.Random(seed).sample(grid, samples)
+    return [dict(t, trial=i) for i, t in enumerate(grid)]
+
+def shared_series():
+    """
+    Path of the processed series as a .npy every trial memory-maps (the OS keeps one copy in the
+    page cache), plus its trace bounds. A legacy CSV-only checkout is converted once into the cache.
+    """
+    import lstm_trainer as trainer
+    if os.path.exists(trainer.INPUT_FILE):
+        bounds = np.load(trainer.BOUNDS_FILE) if os.path.exists(trainer.BOUNDS_FILE) else None
+        return trainer.INPUT_FILE, bounds
+    import pandas as pd
+    path = os.path.join(CACHE_DIR, 'sweep_series.npy')
+    if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(trainer.LEGACY_INPUT_FILE):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        np.save(path, pd.read_csv(trainer.LEGACY_INPUT_FILE).values.astype(np.float32).ravel())
+    return path, None
+
+def validation_targets(length, bounds, window, horizon_span, val_fraction=0.2):
+    """
+    Series positions of the t+1 targets every trial (and the incumbent) is scored on: the
+    validation windows of the sweep's largest window and furthest horizon, so a trial's own
+    windows (each target minus its window) all fit inside one trace and every trial forecasts
+    the same points.
+    """
+    from windowing import split_indices, window_starts
+    starts = window_starts(bounds, window, horizon_span) if bounds is not None else np.arange(length - window - horizon_span)
+    _, val_idx = split_indices(starts, val_fraction)
+    return val_idx + window
+
+def _limit_threads(threads):
+    """ Worker initializer: caps BLAS/OpenMP pools before NumPy or TensorFlow start theirs """
+    for var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ[var] = str(threads)
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+def run_trial(trial, series_path, bounds, out_dir, epochs, threads, max_windows=None, seed=0, eval_window=None):
+    """
+    Worker process: trains one configuration on the mapped series and returns its result row.
+    `eval_window` is the sweep's (largest window, furthest horizon): validation uses the targets
+    validation_targets() derives from it, training only windows whose targets all come earlier.
+    """
+    import lstm_trainer as trainer
+    trainer.configure_threads(threads, 1)
+    import tensorflow as tf
+    from export_brain import export_brain
+    from numpy_brain import NumpyBrain, npz_path_for
+    from windowing import span, window_starts
+
+    window, horizons, units, batch = trial['window'], trial['horizons'], trial['units'], trial['batch']
+    series = np.load(series_path, mmap_mode='r')
+    targets = validation_targets(len(series), bounds, *(eval_window or (window, span(horizons))))
+    val_idx = targets - window
+    starts = window_starts(bounds, window, horizons) if bounds is not None else np.arange(len(series) - window - span(horizons))
+    train_idx = starts[starts + window + span(horizons) <= targets[0]]
+    if max_windows and len(train_idx) > max_windows:
+        train_idx = train_idx[np.linspace(0, len(train_idx) - 1, max_windows).astype(np.int64)]  # Evenly strided, all traces kept
+
+    tf.keras.utils.set_random_seed(seed)
+    train = trainer.window_dataset(series, train_idx, batch, shuffle=True, seed=seed, horizons=horizons, window=window)
+    val = trainer.window_dataset(series, val_idx, batch, horizons=horizons, window=window)
+    model = trainer.build_model(horizons, window, units)
+    early_stop = tf.keras.callbacks.EarlyStopping(monitor='val_loss', patience=3, restore_best_weights=True)
+    start = time.perf_counter()
+    history = model.fit(train, epochs=epochs, validation_data=val, callbacks=[early_stop], verbose=0)
+    train_s = time.perf_counter() - start
+
+    forecasts = model.predict(val, verbose=0)
+    t1_mse = float(np.mean((forecasts[:, 0] - series[targets]) ** 2))
+    model_file = os.path.join(out_dir, f"trial_{trial['trial']:03d}.h5")
+    trainer.save_brain(model, model_file, horizons, window)
+
+    # Latency as the agents would see it: one window through the exported NumPy forward pass
+    export_brain(model_file, npz_path_for(model_file))
+    brain = NumpyBrain(npz_path_for(model_file))
+    x = np.ascontiguousarray(series[val_idx[0]:val_idx[0] + window].reshape(1, window, 1), dtype=np.float32)
+    brain.predict(x)
+    start = time.perf_counter()
+    for _ in range(LATENCY_RUNS):
+        brain.predict(x)
+    latency_ms = (time.perf_counter() - start) * 1000 / LATENCY_RUNS
+
+    return {'trial': trial['trial'], 'window': window, 'horizons': ','.join(map(str, horizons)),
+            'units': '/'.join(map(str, units)), 'batch': batch, 'epochs': len(history.history['loss']),
+            'val_loss': min(history.history['val_loss']), 'val_t1_mse': t1_mse, 'train_s': round(train_s, 1),
+            'latency_ms': round(latency_ms, 3), 'params': model.count_params(), 'model': model_file}
+
+def incumbent_t1_mse(series_path, bounds, eval_window):
+    """ t+1 validation MSE of the model the agents load today, on the trials' targets; None if it is not comparable """
+    from numpy_brain import MODEL_PATH, load_brain
+    from policies import WINDOW_SIZE
+    if not os.path.exists(MODEL_PATH):
+        return None
+    brain = load_brain(MODEL_PATH, runtime='numpy')
+    if brain.horizons[0] != 1:
+        return None
+    series = np.load(series_path, mmap_mode='r')
+    targets = validation_targets(len(series), bounds, *eval_window)
+    X = np.stack([series[t - WINDOW_SIZE:t] for t in targets]).reshape(-1, WINDOW_SIZE, 1).astype(np.float32)
+    return float(np.mean((brain.predict(X)[:, 0] - series[targets]) ** 2))
+
+def promote(result, incumbent, force=False):
+    """ Copies the winning trial over models/orchestrator_brain.h5 (atomically) and re-exports its .npz """
+    from export_brain import export_brain
+    from numpy_brain import MODEL_PATH, npz_path_for
+    if incumbent is not None and result['val_t1_mse'] >= incumbent and not force:
+        print(f"Best trial {result['trial']} (t+1 MSE {result['val_t1_mse']:.3e}) does not beat the current model "
+              f"({incumbent:.3e}); {MODEL_PATH} left as is (--force promotes anyway)")
+        return False
+    tmp = os.path.splitext(MODEL_PATH)[0] + '.tmp.h5'
+    shutil.copyfile(result['model'], tmp)
+    os.replace(tmp, MODEL_PATH)
+    export_brain(MODEL_PATH, npz_path_for(MODEL_PATH))
+    print(f"Promoted trial {result['trial']} to {MODEL_PATH}")
+    return True
+
+def run_sweep(space, samples=None, workers=WORKERS, threads=TRIAL_THREADS, epochs=EPOCHS, max_windows=None,
+              seed=0, promote_best=True, force=False):
+    from policies import WINDOW_SIZE
+    from windowing import span
+    trials = trials_for(space, samples, seed)
+    series_path, bounds = shared_series()
+    # One validation set for every trial: the targets the largest window and furthest horizon allow
+    eval_window = (max(t['window'] for t in trials), max(span(t['horizons']) for t in trials))
+    out_dir = os.path.join(SWEEP_DIR, time.strftime('%Y%m%d_%H%M%S'))
+    os.makedirs(out_dir, exist_ok=True)
+    results_file = os.path.join(out_dir, 'results.csv')
+    print(f"--- HYPERPARAMETER SWEEP: {len(trials)} trials, {workers} workers x {threads} threads ---")
+    print(f"Series: {series_path} (memory-mapped by every trial) | Results: {results_file}")
+    print(f"Validation: the same {len(validation_targets(len(np.load(series_path, mmap_mode='r')), bounds, *eval_window)):,} "
+          f"t+1 targets for every trial (window {eval_window[0]} + horizon {eval_window[1]})")
+
+    results = []
+    start = time.perf_counter()
+    # Spawned, one trial per process: each gets fresh TensorFlow thread settings and frees its memory on exit
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                                initializer=_limit_threads, initargs=(threads,),
+                                                max_tasks_per_child=1) as pool, \
+            open(results_file, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS)
+        writer.writeheader()
+        futures = {pool.submit(run_trial, t, series_path, bounds, out_dir, epochs, threads, max_windows, seed, eval_window): t
+                   for t in trials}
+        for future in concurrent.futures.as_completed(futures):
+            trial = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"   Trial {trial['trial']} failed: {e}")
+                continue
+            results.append(result)
+            writer.writerow(result)
+            f.flush()  # Finished trials survive an interrupted sweep
+            print(f"   Trial {result['trial']:>3} done ({len(results)}/{len(trials)}): window {result['window']}, "
+                  f"units {result['units']}, batch {result['batch']}, t+1 MSE {result['val_t1_mse']:.3e}")
+    wall = time.perf_counter() - start
+    if not results:
+        return results
+
+    results.sort(key=lambda r: r['val_t1_mse'])
+    print(f"\n{'Trial':>5} {'Window':>6} {'Horizons':<14} {'Units':<7} {'Batch':>5} {'Epochs':>6} {'Val loss':>10} "
+          f"{'t+1 MSE':>10} {'Train (s)':>9} {'Latency (ms)':>12}")
+    for r in results:
+        print(f"{r['trial']:>5} {r['window']:>6} {r['horizons']:<14} {r['units']:<7} {r['batch']:>5} {r['epochs']:>6} "
+              f"{r['val_loss']:>10.3e} {r['val_t1_mse']:>10.3e} {r['train_s']:>9} {r['latency_ms']:>12}")
+    print(f"Wall time {wall:.0f}s for {sum(r['train_s'] for r in results):.0f}s of training")
+
+    # The agents feed WINDOW_SIZE samples, so only trials trained on that window can replace the live model
+    eligible = [r for r in results if r['window'] == WINDOW_SIZE]
+    if promote_best and eligible:
+        if eligible[0] is not results[0]:
+            print(f"Best overall is trial {results[0]['trial']} (window {results[0]['window']}); "
+                  f"the agents use {WINDOW_SIZE}, so trial {eligible[0]['trial']} is the candidate")
+        promote(eligible[0], incumbent_t1_mse(series_path, bounds, eval_window), force)
+    elif promote_best:
+        print(f"No trial used the agents' window of {WINDOW_SIZE}; nothing promoted")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel grid / random search over window size, horizons, layer widths and batch size")
+    parser.add_argument('--window', help="comma-separated window sizes, e.g. 30,60,120")
+    parser.add_argument('--horizons', help="';'-separated horizon sets, e.g. '1;1,5,15,30,60'")
+    parser.add_argument('--units', help="comma-separated layer widths, e.g. 100/50,64/32")
+    parser.add_argument('--batch', help="comma-separated batch sizes, e.g. 128,256")
+    parser.add_argument('--random', type=int, metavar='N', help="sample N trials from the grid instead of running all of it")
+    parser.add_argument('--workers', type=int, default=WORKERS, help="trials trained at once")
+    parser.add_argument('--threads', type=int, default=TRIAL_THREADS, help="TensorFlow threads per trial")
+    parser.add_argument('--epochs', type=int, default=EPOCHS, help="max epochs per trial (early stopping applies)")
+    parser.add_argument('--max-windows', type=int, help="evenly subsample each trial's training windows (quick screening)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-promote', action='store_true', help="only write the results table")
+    parser.add_argument('--force', action='store_true', help="promote the best trial even if the current model scores better")
+    args = parser.parse_args()
+    run_sweep(parse_space(args), args.random, args.workers, args.threads, args.epochs, args.max_windows,
+              args.seed, promote_best=not args.no_promote, force=args.force)
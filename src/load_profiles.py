@@ -0,0 +1,88 @@
+import glob
+import os
+import numpy as np
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RAW_DIR = os.path.join(BASE_DIR, 'data', 'raw')
+
+# Every profile is a float array of target req/s, one entry per second of the run.
+
+def constant(duration, rps=100.0):
+    return np.full(int(duration), float(rps))
+
+def ramp(duration, points):
+    """ Piecewise-linear through (second, rps) points; flat before the first and after the last """
+    times, rates = zip(*sorted(points))
+    return np.interp(np.arange(int(duration)), times, rates)
+
+def spike(duration, peak=400.0, at=60.0, width=10.0, base=0.0):
+    """ `base` everywhere, `peak` for `width` seconds starting at `at` """
+    rates = np.full(int(duration), float(base))
+    rates[int(at):int(at + width)] = peak
+    return rates
+
+def diurnal(duration, low=20.0, high=300.0, period=600.0, phase=0.0):
+    """ One compressed "day" every `period` seconds: trough at t=phase, peak half a period later """
+    t = np.arange(int(duration)) - phase
+    return low + (high - low) * (1 - np.cos(2 * np.pi * t / period)) / 2
+
+def bitbrains(duration, path=None, low=20.0, high=300.0, step=1.0):
+    """
+    A Bitbrains VM's CPU utilisation replayed as request rate: rescaled so its minimum maps to
+    `low` and its maximum to `high`, one trace sample every `step` seconds (linearly interpolated).
+    """
+    from data_loader_universal import parse_trace
+    path = path or sorted(glob.glob(os.path.join(RAW_DIR, '*.csv')))[0]
+    util = parse_trace(path)
+    if util is None or not len(util):
+        raise ValueError(f"{path} has no CPU usage/capacity columns")
+    span = util.max() - util.min()
+    scaled = low + (util - util.min()) / span * (high - low) if span > 0 else np.full(len(util), float(low))
+    duration = int(duration or len(util) * step)
+    return np.interp(np.arange(duration) / step, np.arange(len(scaled)), scaled)
+
+PROFILES = {'constant': constant, 'ramp': ramp, 'spike': spike, 'diurnal': diurnal, 'bitbrains': bitbrains}
+
+def parse_profile(spec, duration):
+    """
+    Profiles from the command line; '+' adds shapes together:
+      constant:rps=200
+      ramp:0=50,60=400,120=400            (second=rps points)
+      spike:base=50,peak=400,at=60,width=10
+      diurnal:low=20,high=300,period=600
+      bitbrains:data/raw/5.csv,low=20,high=400,step=5
+      diurnal:low=20,high=200+spike:peak=300,at=90,width=15
+    """
+    total = None
+    for part in spec.split('+'):
+        name, _, args = part.partition(':')
+        if name not in PROFILES:
+            raise ValueError(f"unknown profile {name!r}; choose from {', '.join(PROFILES)}")
+        kwargs, points = {}, []
+        for arg in filter(None, args.split(',')):
+            key, eq, value = arg.partition('=')
+            if not eq:
+                kwargs['path'] = key  # Positional trace path for bitbrains
+            elif name == 'ramp':
+                points.append((float(key), float(value)))
+            else:
+                kwargs[key] = float(value)
+        rates = ramp(duration, points) if name == 'ramp' else PROFILES[name](duration, **kwargs)
+        if total is None:
+            total = rates
+        else:
+            n = max(len(total), len(rates))
+            total = np.pad(total, (0, n - len(total))) + np.pad(rates, (0, n - len(rates)))
+    return np.maximum(total, 0.0)
+
+def send_schedule(rates):
+    """
+    Intended send offsets (seconds from start) for a per-second rate profile: send k goes out
+    when the integral of the rate first reaches k, so any profile is followed exactly.
+    """
+    rates = np.asarray(rates, dtype=np.float64)
+    cumulative = np.concatenate([[0.0], np.cumsum(rates)])
+    k = np.arange(int(cumulative[-1]))
+    second = np.searchsorted(cumulative, k, side='right') - 1
+    return second + (k - cumulative[second]) / rates[second]
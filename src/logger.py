@@ -1,59 +1,152 @@
+import argparse
 import docker
 import time
 import csv
 import psutil
 import os
+import numpy as np
+from service_cache import ServiceCache
+from cpu_collector import ServiceCpuCollector
+from control_loop import ControlLoop
+from telemetry_ring import RingWriter, export_csv
 
 SERVICE_NAME = "web_app"
 LOG_FILE = "system_metrics.csv"
+RING_FILE = "system_metrics.ring"
+CONTAINER_RING_FILE = "system_metrics.containers.ring"
+INTERVAL = 1.0              # Seconds between samples
+RING_SECONDS = 6 * 3600     # History the ring keeps; capacity = RING_SECONDS / interval
+CONTAINERS_PER_SAMPLE = 10  # Container ring slots per host sample
+STATUS_EVERY = 1.0          # Seconds between console status lines
 
-def log_metrics():
-    print("--- 🛰️ SYSTEM TELEMETRY STARTED ---")
-    client = docker.from_env()
-    
-    # Write Header (The 7 Attributes)
-    with open(LOG_FILE, 'w', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(["Time", "CPU_Percent", "Memory_Percent", "Network_RX_MB", "Disk_Usage_Percent", "Context_Switches", "Replicas"])
-        
-    start_time = time.time()
-    net_io_start = psutil.net_io_counters()
-    
-    while True:
-        elapsed = int(time.time() - start_time)
-        try:
-            # 1. Container Replicas
-            try:
-                service = client.services.get(SERVICE_NAME)
-                replicas = service.attrs['Spec']['Mode']['Replicated']['Replicas']
-            except:
-                replicas = 0
-            
-            # 2. Host Metrics (CPU, RAM, Disk)
-            cpu = psutil.cpu_percent(interval=None)
-            mem = psutil.virtual_memory().percent
-            disk = psutil.disk_usage('/').percent
-            
-            # 3. Network I/O (Delta)
-            net_io_now = psutil.net_io_counters()
-            net_rx_mb = (net_io_now.bytes_recv - net_io_start.bytes_recv) / 1024 / 1024
-            
-            # 4. Kernel Context Switches (OS Stress)
-            ctx_switches = psutil.cpu_stats().ctx_switches
-            
-            # Save
-            with open(LOG_FILE, 'a', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([elapsed, cpu, mem, round(net_rx_mb, 2), disk, ctx_switches, replicas])
-                
-            print(f"Sec: {elapsed} | CPU: {cpu}% | RAM: {mem}% | Replicas: {replicas}", end='\r')
-            time.sleep(1)
-            
-        except KeyboardInterrupt:
+# One host sample. Cumulative counters are kept for compatibility next to their per-second rates.
+HOST_DTYPE = np.dtype([
+    ('time', '<f8'), ('elapsed', '<f8'),
+    ('cpu_percent', '<f4'), ('memory_percent', '<f4'),
+    ('net_rx_mb', '<f4'), ('net_rx_mb_s', '<f4'),
+    ('disk_usage_percent', '<f4'),
+    ('ctx_switches', '<u8'), ('ctx_switches_s', '<f4'),
+    ('replicas', '<i4'),
+])
+CONTAINER_DTYPE = np.dtype([('time', '<f8'), ('container', 'S12'), ('cpu_percent', '<f4')])
+
+# system_metrics.csv header -> ring field (The 7 Attributes, then the rate columns)
+CSV_COLUMNS = {
+    'Time': 'elapsed', 'CPU_Percent': 'cpu_percent', 'Memory_Percent': 'memory_percent',
+    'Network_RX_MB': 'net_rx_mb', 'Disk_Usage_Percent': 'disk_usage_percent',
+    'Context_Switches': 'ctx_switches', 'Replicas': 'replicas',
+    'Context_Switches_per_s': 'ctx_switches_s', 'Network_RX_MB_per_s': 'net_rx_mb_s',
+}
+
+class HostSampler:
+    """ Host-wide metrics; counters become per-second rates over the time since the previous sample """
+
+    def __init__(self):
+        self.start = time.time()
+        self._net_start = psutil.net_io_counters().bytes_recv
+        self._prev = (time.monotonic(), self._net_start, psutil.cpu_stats().ctx_switches)
+        psutil.cpu_percent(interval=None)  # First call only primes the counter
+
+    def sample(self, replicas):
+        now, mono = time.time(), time.monotonic()
+        net_rx = psutil.net_io_counters().bytes_recv
+        ctx_switches = psutil.cpu_stats().ctx_switches
+        prev_mono, prev_net, prev_ctx = self._prev
+        self._prev = (mono, net_rx, ctx_switches)
+        dt = max(mono - prev_mono, 1e-6)
+        return (now, now - self.start,
+                psutil.cpu_percent(interval=None), psutil.virtual_memory().percent,
+                (net_rx - self._net_start) / 1024 / 1024, (net_rx - prev_net) / 1024 / 1024 / dt,
+                psutil.disk_usage('/').percent,
+                ctx_switches, (ctx_switches - prev_ctx) / dt,
+                replicas)
+
+class CsvSink:
+    """ The classic system_metrics.csv, kept open for the whole run instead of reopened per sample """
+
+    def __init__(self, path, interval):
+        self._file = open(path, 'w', newline='')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(list(CSV_COLUMNS))
+        self._fields = [HOST_DTYPE.names.index(field) for field in CSV_COLUMNS.values()]
+        self._whole_seconds = interval >= 1.0
+
+    def append(self, record):
+        row = [record[i] for i in self._fields]
+        row[0] = int(row[0]) if self._whole_seconds else round(row[0], 3)
+        self._writer.writerow([round(v, 2) if isinstance(v, float) else v for v in row])
+        self._file.flush()  # Dashboard and plots read the file while it is written
+
+    def close(self):
+        self._file.close()
+
+def open_ring(path, interval, seconds=RING_SECONDS, dtype=HOST_DTYPE, slots=1):
+    meta = {'service': SERVICE_NAME, 'interval': interval, 'start_time': time.time()}
+    if dtype is HOST_DTYPE:
+        meta['csv_columns'] = CSV_COLUMNS
+    return RingWriter(path, dtype, int(seconds / interval) * slots, meta=meta)
+
+def sample_loop(sink, sampler, interval, replicas=lambda: 0, containers=None, container_sink=None,
+                ticks=None, status=True):
+    """ Samples on a fixed-rate grid into `sink` (and per-container CPU into `container_sink`) """
+    loop = ControlLoop('logger', period=interval, summary_every=0)
+    last_status = 0.0
+    for tick in loop:
+        if ticks is not None and tick >= ticks:
             break
+        try:
+            record = sampler.sample(replicas())
+            sink.append(record)
+            if container_sink is not None:
+                for cid, cpu in containers().items():
+                    container_sink.append((record[0], cid[:12], cpu))
+
+            if status and record[0] - last_status >= STATUS_EVERY:
+                print(f"Sec: {record[1]:.0f} | CPU: {record[2]}% | RAM: {record[3]}% | Ctx/s: {record[8]:,.0f} | Replicas: {record[9]}", end='\r')
+                last_status = record[0]
         except Exception as e:
             print(f"Error: {e}")
-            time.sleep(1)
+    return loop
+
+def log_metrics(interval=INTERVAL, ring=False, containers=False):
+    print("--- 🛰️ SYSTEM TELEMETRY STARTED ---")
+    client = docker.from_env()
+    cache = ServiceCache(client).start()  # Replica counts from the events stream, not a call per second
+    collector = ServiceCpuCollector(client, SERVICE_NAME, api_calls=cache.api_calls).start() if containers else None
+
+    sink = open_ring(RING_FILE, interval) if ring else CsvSink(LOG_FILE, interval)
+    container_sink = open_ring(CONTAINER_RING_FILE, interval, dtype=CONTAINER_DTYPE, slots=CONTAINERS_PER_SAMPLE) \
+        if containers else None
+    print(f"Sampling every {interval * 1000:g}ms into {RING_FILE if ring else LOG_FILE}"
+          + (f" (+ per-container CPU in {CONTAINER_RING_FILE})" if containers else ""))
+
+    try:
+        sample_loop(sink, HostSampler(), interval,
+                    replicas=lambda: cache.replicas(SERVICE_NAME) or 0,
+                    containers=(lambda: collector.latest()['replicas']) if containers else None,
+                    container_sink=container_sink)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for s in (sink, container_sink):
+            if s is not None:
+                s.close()
+        if collector is not None:
+            collector.stop()
+        cache.stop()
 
 if __name__ == "__main__":
-    log_metrics()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Host (and optional per-container) telemetry logger")
+    parser.add_argument('--interval', type=float, default=INTERVAL, help="seconds between samples, e.g. 0.1")
+    parser.add_argument('--ring', action='store_true', help=f"write the memory-mapped ring {RING_FILE} instead of {LOG_FILE}")
+    parser.add_argument('--containers', action='store_true', help="also record per-container CPU (ring mode)")
+    parser.add_argument('--export', nargs='?', const=LOG_FILE, metavar='CSV',
+                        help=f"export {RING_FILE} to CSV (default {LOG_FILE}) and exit")
+    args = parser.parse_args()
+    if args.containers and not args.ring:
+        parser.error(f"--containers needs --ring (per-container samples only go to {CONTAINER_RING_FILE})")
+
+    if args.export:
+        print(f"Exported {export_csv(RING_FILE, args.export):,} samples to {args.export}")
+    else:
+        log_metrics(args.interval, ring=args.ring, containers=args.containers)
@@ -5,78 +5,257 @@ from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense, Dropout
 from tensorflow.keras.callbacks import EarlyStopping
 import matplotlib.pyplot as plt
+import argparse
+import glob
+import h5py
+import hashlib
+import json
 import os
+import shutil
+import time
+from windowing import span, split_indices, window_starts, iter_window_batches
 
 # --- CONFIGURATION ---
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-# Point to the NEW Universal file
-INPUT_FILE = os.path.join(BASE_DIR, 'data', 'processed', 'universal_training_data.csv')
+# Point to the NEW Universal file (memory-mapped .npy, legacy CSV as fallback)
+INPUT_FILE = os.path.join(BASE_DIR, 'data', 'processed', 'universal_training_data.npy')
+LEGACY_INPUT_FILE = os.path.join(BASE_DIR, 'data', 'processed', 'universal_training_data.csv')
+BOUNDS_FILE = os.path.join(BASE_DIR, 'data', 'processed', 'universal_training_data.bounds.npy')
+SHARD_DIR = os.path.join(BASE_DIR, 'data', 'processed', 'shards')  # Written by data_loader_universal.py --stream
 MODEL_FILE = os.path.join(BASE_DIR, 'models', 'orchestrator_brain.h5')
 GRAPH_FILE = os.path.join(BASE_DIR, 'models', 'training_accuracy.png')
 
 WINDOW_SIZE = 60
-PREDICT_HORIZON = 1
+LSTM_UNITS = (100, 50)  # Width of the two stacked LSTM layers
+PREDICT_HORIZONS = (1, 5, 15, 30, 60)  # Steps ahead, one output each; t+1 floors the max over horizons. (1,) is single-step
 EPOCHS = 20
 BATCH_SIZE = 128  # Increased for speed
+SHUFFLE_BUFFER = 100_000  # Window start indices in the shuffle buffer (8 bytes each); >= train windows is a full shuffle
+INTRA_OP_THREADS = 0      # Threads inside one op (LSTM matmuls); 0 lets TensorFlow use every core
+INTER_OP_THREADS = 0      # Independent ops run side by side; 0 lets TensorFlow pick
+CHECKPOINT_DIR = os.path.join(BASE_DIR, 'models', 'checkpoints')  # Per-epoch backups, one subdirectory per run config; removed once training completes
 
-def create_sequences(data, seq_length):
-    xs, ys = [], []
-    for i in range(len(data) - seq_length - PREDICT_HORIZON):
-        x = data[i:(i + seq_length)]
-        y = data[i + seq_length + PREDICT_HORIZON - 1]
-        xs.append(x)
-        ys.append(y)
-    return np.array(xs), np.array(ys)
+def configure_threads(intra=INTRA_OP_THREADS, inter=INTER_OP_THREADS):
+    """ Only takes effect before TensorFlow runs its first op; afterwards the runtime rejects it """
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(intra)
+        tf.config.threading.set_inter_op_parallelism_threads(inter)
+    except RuntimeError as e:
+        print(f"   Warning: thread counts unchanged ({e})")
 
-def train_brain():
-    print("--- PHASE 2: UNIVERSAL MODEL TRAINING ---")
-    
-    if not os.path.exists(INPUT_FILE):
+def window_dataset(series, starts, batch_size=BATCH_SIZE, shuffle=False, seed=None, horizons=PREDICT_HORIZONS,
+                   window=WINDOW_SIZE):
+    """
+    tf.data pipeline over window start indices: the indices are shuffled and batched, then each
+    batch's windows are gathered from the series in parallel and prefetched while the previous
+    batch trains. Only indices pass through the shuffle buffer, never the windows themselves.
+    The series stays a NumPy array (a view of the memory map when loaded with mmap_mode='r'):
+    batches are gathered from it by index, so processes mapping the same file share its pages
+    instead of each holding a tensor copy.
+    """
+    series = np.asarray(series, dtype=np.float32).reshape(-1)  # No copy for a float32 memory map
+    offsets = np.arange(window)
+    targets = window + np.asarray(horizons, dtype=np.int64) - 1
+
+    def gather_numpy(idx):
+        return series[idx[:, None] + offsets][..., None], series[idx[:, None] + targets]
+
+    def gather(idx):
+        x, y = tf.numpy_function(gather_numpy, [idx], (tf.float32, tf.float32), stateful=False)
+        x.set_shape((None, window, 1))
+        y.set_shape((None, len(targets)))
+        return x, y
+
+    ds = tf.data.Dataset.from_tensor_slices(np.asarray(starts, dtype=np.int64))
+    if shuffle:
+        ds = ds.shuffle(min(SHUFFLE_BUFFER, len(starts)), seed=seed, reshuffle_each_iteration=True)
+    return ds.batch(batch_size).map(gather, num_parallel_calls=tf.data.AUTOTUNE).prefetch(tf.data.AUTOTUNE)
+
+class Throughput(tf.keras.callbacks.Callback):
+    """ Prints training samples/sec for every epoch; validation time is excluded """
+
+    def __init__(self, batch_size=BATCH_SIZE, samples=None):
+        super().__init__()
+        self.batch_size = batch_size
+        self.samples = samples  # Exact samples per epoch when known, else batches * batch_size
+        self.rates = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.start = self.end = time.perf_counter()
+        self.batches = 0
+
+    def on_train_batch_end(self, batch, logs=None):
+        self.batches += 1
+        self.end = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        samples = self.samples or self.batches * self.batch_size
+        self.rates.append(samples / max(self.end - self.start, 1e-9))
+        print(f"   Epoch {epoch + 1}: {self.rates[-1]:,.0f} samples/sec")
+
+class ResumableEarlyStopping(EarlyStopping):
+    """
+    EarlyStopping whose best loss, patience count and best weights are written to `state_dir`
+    after every epoch, and read back when BackupAndRestore resumes from that same epoch, so an
+    interrupted run stops (and restores weights) exactly as an uninterrupted one would.
+    BackupAndRestore must come first in the callback list: a state that does not match the
+    epoch it resumes from (killed between the two saves) is ignored rather than half applied.
+    """
+
+    def __init__(self, state_dir, **kwargs):
+        super().__init__(**kwargs)
+        self.state_file = os.path.join(state_dir, 'early_stopping.json')
+        self.weights_file = os.path.join(state_dir, 'early_stopping_best.npz')
+        self.resume_file = os.path.join(state_dir, 'training_metadata.json')  # BackupAndRestore's epoch counter
+
+    def on_train_begin(self, logs=None):
+        super().on_train_begin(logs)
+        try:
+            with open(self.resume_file) as f:
+                resume_epoch = json.load(f)['epoch']
+            with open(self.state_file) as f:
+                state = json.load(f)
+        except (OSError, ValueError, KeyError):
+            return
+        if state['epoch'] + 1 != resume_epoch:
+            print(f"   Early-stopping state is for epoch {state['epoch'] + 1}, not {resume_epoch}: starting its count over")
+            return
+        self.best, self.wait, self.best_epoch = state['best'], state['wait'], state['best_epoch']
+        if self.restore_best_weights and os.path.exists(self.weights_file):
+            with np.load(self.weights_file) as f:
+                self.best_weights = [f[f'arr_{i}'] for i in range(len(f.files))]
+        print(f"   Early stopping resumed: best {self.monitor} {self.best:.4e} at epoch {self.best_epoch + 1}, "
+              f"{self.wait}/{self.patience} epochs without improvement")
+
+    def on_epoch_end(self, epoch, logs=None):
+        super().on_epoch_end(epoch, logs)
+        if self.best is None:
+            return
+        os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+        if self.restore_best_weights and self.best_epoch == epoch and self.best_weights is not None:
+            tmp = self.weights_file + '.tmp.npz'
+            np.savez(tmp, *self.best_weights)
+            os.replace(tmp, self.weights_file)
+        tmp = self.state_file + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'epoch': epoch, 'best': float(self.best), 'wait': self.wait, 'best_epoch': self.best_epoch}, f)
+        os.replace(tmp, self.state_file)
+
+def checkpoint_dir_for(model_file, horizons, window=WINDOW_SIZE, units=LSTM_UNITS, stream=False):
+    """
+    Backup directory of one run config, with the config beside it: a run with other horizons,
+    window, widths, data source or output path never resumes from another run's weights.
+    """
+    config = {'model_file': os.path.abspath(model_file), 'horizons': list(horizons), 'window': window,
+              'units': list(units), 'stream': stream}
+    key = hashlib.sha1(json.dumps(config, sort_keys=True).encode()).hexdigest()[:12]
+    return os.path.join(CHECKPOINT_DIR, key), config
+
+def load_dataset():
+    """ (rows, 1) float32 series; the .npy is memory-mapped, so windows are views straight into the file """
+    if os.path.exists(INPUT_FILE):
+        return np.load(INPUT_FILE, mmap_mode='r').reshape(-1, 1)
+    return pd.read_csv(LEGACY_INPUT_FILE).values.astype(np.float32)
+
+def in_memory_batches(horizons=PREDICT_HORIZONS):
+    """ Windows over the merged series, restricted to starts that stay inside one trace; returns (train, val, train windows) """
+    if not os.path.exists(INPUT_FILE) and not os.path.exists(LEGACY_INPUT_FILE):
         print(f"ERROR: {INPUT_FILE} not found. Run data_loader_universal.py first.")
-        return
-    
+        return None
+
     print("1. Loading Universal Data...")
-    df = pd.read_csv(INPUT_FILE)
-    dataset = df.values
-    
+    dataset = load_dataset()
+
     # Validation: Ensure we have enough data
     if len(dataset) < 1000:
         print("Error: Dataset too small. Did you load multiple CSVs?")
-        return
+        return None
 
-    print(f"   Dataset Size: {len(dataset):,} rows. Creating Sequences...")
-    X, y = create_sequences(dataset, WINDOW_SIZE)
-    
-    train_size = int(len(X) * 0.8)
-    X_train, X_val = X[:train_size], X[train_size:]
-    y_train, y_val = y[:train_size], y[train_size:]
-    
-    print("2. Building LSTM Architecture...")
+    print(f"   Dataset Size: {len(dataset):,} rows. Building tf.data window pipeline...")
+    # The legacy CSV has no trace offsets, so it keeps the old whole-series windows
+    starts = window_starts(np.load(BOUNDS_FILE), WINDOW_SIZE, horizons) \
+        if os.path.exists(BOUNDS_FILE) and os.path.exists(INPUT_FILE) else max(len(dataset) - WINDOW_SIZE - span(horizons), 0)
+
+    train_idx, val_idx = split_indices(starts, val_fraction=0.2)
+    return (window_dataset(dataset, train_idx, shuffle=True, horizons=horizons),
+            window_dataset(dataset, val_idx, horizons=horizons), len(train_idx))
+
+def streaming_batches(shard_dir=SHARD_DIR, horizons=PREDICT_HORIZONS):
+    """ tf.data streams that read the per-trace shards lazily; memory does not grow with the dataset """
+    shards = sorted(glob.glob(os.path.join(shard_dir, '*.npy')))
+    if not shards:
+        print(f"ERROR: No shards in {shard_dir}. Run data_loader_universal.py --stream first.")
+        return None
+
+    print(f"1. Streaming {len(shards)} trace shards from {shard_dir}...")
+    signature = (tf.TensorSpec(shape=(None, WINDOW_SIZE, 1), dtype=tf.float32),
+                 tf.TensorSpec(shape=(None, len(horizons)), dtype=tf.float32))
+
+    def dataset(subset):
+        gen = lambda: iter_window_batches(shards, WINDOW_SIZE, tuple(horizons), BATCH_SIZE, subset=subset)
+        return tf.data.Dataset.from_generator(gen, output_signature=signature).prefetch(tf.data.AUTOTUNE)
+
+    return dataset('train'), dataset('val'), None
+
+def build_model(horizons=PREDICT_HORIZONS, window=WINDOW_SIZE, units=LSTM_UNITS):
+    """ Shared LSTM trunk with one linear output per forecast horizon, all trained in the same pass """
     model = Sequential([
-        LSTM(units=100, return_sequences=True, input_shape=(X_train.shape[1], 1)),
+        LSTM(units=units[0], return_sequences=True, input_shape=(window, 1)),
         Dropout(0.2),
-        LSTM(units=50, return_sequences=False),
+        LSTM(units=units[1], return_sequences=False),
         Dropout(0.2),
-        Dense(units=1)
+        Dense(units=len(horizons))
     ])
-    
     model.compile(optimizer='adam', loss='mean_squared_error')
+    return model
+
+def save_brain(model, model_file, horizons, window=WINDOW_SIZE):
+    """ Saves the model with the attrs export_brain / load_brain read back """
+    os.makedirs(os.path.dirname(os.path.abspath(model_file)), exist_ok=True)
+    model.save(model_file)
+    with h5py.File(model_file, 'a') as f:
+        f.attrs['horizons'] = np.asarray(horizons, dtype=np.int64)
+        f.attrs['window'] = window
+
+def train_brain(stream=False, resume=True, epochs=EPOCHS, horizons=PREDICT_HORIZONS, model_file=MODEL_FILE):
+    print("--- PHASE 2: UNIVERSAL MODEL TRAINING ---")
+
+    batches = streaming_batches(horizons=horizons) if stream else in_memory_batches(horizons)
+    if batches is None:
+        return
+    train_batches, val_batches, train_samples = batches
+    
+    print(f"2. Building LSTM Architecture (horizons: {', '.join(f't+{h}' for h in horizons)})...")
+    model = build_model(horizons)
     
     print("3. Training...")
-    early_stop = EarlyStopping(monitor='val_loss', patience=3, restore_best_weights=True)
+    checkpoint_dir, config = checkpoint_dir_for(model_file, horizons, stream=stream)
+    config_file = os.path.join(checkpoint_dir, 'run_config.json')
+    if resume and os.path.exists(config_file):
+        with open(config_file) as f:
+            if json.load(f) != config:
+                resume = False  # Only a hash collision gets here
+    if not resume:
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
+    elif os.path.isdir(checkpoint_dir) and os.listdir(checkpoint_dir):
+        print(f"   Resuming from the last epoch checkpoint in {checkpoint_dir}")
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    with open(config_file, 'w') as f:
+        json.dump(config, f, indent=1)
+    # Weights, optimizer state and epoch are backed up after every epoch; a killed run picks up from there
+    backup = tf.keras.callbacks.BackupAndRestore(checkpoint_dir)
+    early_stop = ResumableEarlyStopping(checkpoint_dir, monitor='val_loss', patience=3, restore_best_weights=True)
     
     history = model.fit(
-        X_train, y_train,
-        epochs=EPOCHS,
-        batch_size=BATCH_SIZE,
-        validation_data=(X_val, y_val),
-        callbacks=[early_stop],
+        train_batches,
+        epochs=epochs,
+        validation_data=val_batches,
+        callbacks=[backup, early_stop, Throughput(BATCH_SIZE, train_samples)],
         verbose=1
     )
     
-    print(f"4. Saving Model to {MODEL_FILE}...")
-    os.makedirs(os.path.dirname(MODEL_FILE), exist_ok=True)
-    model.save(MODEL_FILE)
+    print(f"4. Saving Model to {model_file}...")
+    save_brain(model, model_file, horizons)
     
     # Plotting
     plt.figure(figsize=(10,6))
@@ -88,6 +267,18 @@ def train_brain():
     plt.legend()
     plt.savefig(GRAPH_FILE)
     print(f"   Graph saved to {GRAPH_FILE}")
+    return history
 
 if __name__ == '__main__':
-    train_brain()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train the universal LSTM forecaster")
+    parser.add_argument('--stream', action='store_true', help="stream per-trace shards instead of loading the merged series")
+    parser.add_argument('--epochs', type=int, default=EPOCHS)
+    parser.add_argument('--horizons', default=','.join(map(str, PREDICT_HORIZONS)), help="comma-separated steps ahead, e.g. 5,15,30,60 (1 = single-step)")
+    parser.add_argument('--out', default=MODEL_FILE, help="where to save the trained model")
+    parser.add_argument('--intra-threads', type=int, default=INTRA_OP_THREADS, help="threads per op (0 = TensorFlow default)")
+    parser.add_argument('--inter-threads', type=int, default=INTER_OP_THREADS, help="concurrent ops (0 = TensorFlow default)")
+    parser.add_argument('--fresh', action='store_true', help="discard any epoch checkpoint instead of resuming from it")
+    args = parser.parse_args()
+    configure_threads(args.intra_threads, args.inter_threads)
+    train_brain(stream=args.stream, resume=not args.fresh, epochs=args.epochs,
+                horizons=tuple(int(h) for h in args.horizons.split(',')), model_file=args.out)
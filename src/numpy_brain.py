@@ -0,0 +1,115 @@
+import os
+import numpy as np
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(BASE_DIR, 'models', 'orchestrator_brain.h5')
+CACHE_DIR = os.path.join(BASE_DIR, 'data', 'cache')  # Exports made on demand go here, never next to the shipped model
+# 'numpy' (default) runs the exported weights with plain NumPy; 'int8' / 'float16' do the same from a
+# weight-quantized export (4x / 2x smaller, for edge nodes); 'keras' loads full TensorFlow
+RUNTIME = os.environ.get('BRAIN_RUNTIME', 'numpy')
+QUANTIZED = ('int8', 'float16')
+
+def npz_path_for(h5_path, quantize=None):
+    """ orchestrator_brain.npz, or orchestrator_brain.int8.npz / .float16.npz for quantized exports """
+    return os.path.splitext(h5_path)[0] + (f'.{quantize}' if quantize else '') + '.npz'
+
+def _weights(data, key):
+    """ float32 weights; int8 arrays are scaled back per output column, float16 ones widened """
+    if key not in data:
+        return None
+    w = data[key]
+    if w.dtype == np.int8:
+        return w.astype(np.float32) * data[f'{key}_scale']
+    return w.astype(np.float32)
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+class NumpyBrain:
+    """
+    Forward pass of the exported Sequential(LSTM, LSTM, Dense) model.
+    Exposes the same `predict(x, verbose=0)` call the agents already use on the Keras model.
+    Output column k forecasts `horizons[k]` steps ahead.
+    """
+
+    def __init__(self, npz_path):
+        with np.load(npz_path) as data:
+            self.kinds = [str(k) for k in data['layers']]
+            self.horizons = tuple(int(h) for h in data['horizons']) if 'horizons' in data else (1,)
+            self.layers = []
+            for i, kind in enumerate(self.kinds):
+                # Quantized exports are dequantized once here; inference itself stays float32
+                self.layers.append((
+                    kind,
+                    _weights(data, f'l{i}_kernel'),
+                    _weights(data, f'l{i}_recurrent'),
+                    _weights(data, f'l{i}_bias'),
+                ))
+
+    @staticmethod
+    def _lstm(x, kernel, recurrent, bias, return_sequences):
+        # Keras gate order: input, forget, cell, output
+        n, steps, _ = x.shape
+        units = recurrent.shape[0]
+        # Input projection for every timestep in one matmul; only the recurrent part stays in the loop
+        xw = x @ kernel + bias
+        h = np.zeros((n, units), dtype=np.float32)
+        c = np.zeros((n, units), dtype=np.float32)
+        outputs = np.empty((n, steps, units), dtype=np.float32) if return_sequences else None
+
+        for t in range(steps):
+            z = xw[:, t] + h @ recurrent
+            i = _sigmoid(z[:, :units])
+            f = _sigmoid(z[:, units:2 * units])
+            g = np.tanh(z[:, 2 * units:3 * units])
+            o = _sigmoid(z[:, 3 * units:])
+            c = f * c + i * g
+            h = o * np.tanh(c)
+            if return_sequences:
+                outputs[:, t] = h
+        return outputs if return_sequences else h
+
+    def predict(self, x, verbose=0):
+        out = np.asarray(x, dtype=np.float32)
+        for kind, kernel, recurrent, bias in self.layers:
+            if kind == 'dense':
+                out = out @ kernel + bias
+            else:
+                out = self._lstm(out, kernel, recurrent, bias, kind == 'lstm_seq')
+        return out
+
+def model_horizons(model_path):
+    """ Steps ahead of each output column, as saved by lstm_trainer ((1,) for single-step models) """
+    import h5py
+    with h5py.File(model_path, 'r') as f:
+        return tuple(int(h) for h in f.attrs.get('horizons', [1]))
+
+def _fresh(npz_path, model_path):
+    return os.path.exists(npz_path) and (
+        not os.path.exists(model_path) or os.path.getmtime(npz_path) >= os.path.getmtime(model_path))
+
+def brain_path(model_path=MODEL_PATH, quantize=None):
+    """ The .npz load_brain reads: the export beside the .h5 while it is fresh, else its copy under CACHE_DIR """
+    shipped = npz_path_for(model_path, quantize)
+    if _fresh(shipped, model_path) or not os.path.exists(model_path):
+        return shipped
+    return os.path.join(CACHE_DIR, os.path.basename(shipped))
+
+def load_brain(model_path=MODEL_PATH, runtime=None):
+    """ Loads the forecaster with the requested runtime, exporting the .npz on first use; `.horizons` labels its outputs """
+    runtime = runtime or RUNTIME
+    if runtime == 'keras':
+        import tensorflow as tf
+        model = tf.keras.models.load_model(model_path)
+        model.horizons = model_horizons(model_path)
+        return model
+
+    quantize = runtime if runtime in QUANTIZED else None
+    npz_path = brain_path(model_path, quantize)
+    if not _fresh(npz_path, model_path):
+        from export_brain import export_brain  # Needs h5py; not required when a fresh .npz ships alone
+        print(f"Exporting {quantize or 'NumPy'} weights to {npz_path}...")
+        os.makedirs(os.path.dirname(npz_path), exist_ok=True)
+        export_brain(model_path, npz_path, quantize)
+    return NumpyBrain(npz_path)
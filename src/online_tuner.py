@@ -0,0 +1,227 @@
+import concurrent.futures
+import multiprocessing
+import os
+import time
+from collections import deque
+import numpy as np
+from numpy_brain import MODEL_PATH, load_brain, npz_path_for
+from policies import WINDOW_SIZE
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TUNED_MODEL_PATH = os.path.join(BASE_DIR, 'models', 'orchestrator_brain_tuned.h5')
+BUFFER_SAMPLES = 3600    # Replay buffer per service (one sample per tick): the last hour
+MIN_SAMPLES = 600        # A service needs this many samples before it contributes windows
+TUNE_INTERVAL = 600      # Seconds between fine-tuning rounds
+TUNE_EPOCHS = 3
+TUNE_LR = 1e-4           # Well below Adam's 1e-3 default: nudge the offline weights, do not retrain
+VAL_FRACTION = 0.2       # Most recent share of every buffer, held out for the swap decision
+MIN_IMPROVEMENT = 0.02   # Candidate must beat the live weights' validation MSE by 2%
+TUNE_THREADS = 1         # TensorFlow threads in the tuning process; the control loop keeps the other cores
+TUNE_NICE = 10           # Tuning process runs at lower scheduling priority
+ERROR_WINDOW = 300       # Live forecast errors averaged per model generation
+
+class ReplayBuffer:
+    """ Bounded per-service history of observed load in preallocated NumPy rings """
+
+    def __init__(self, capacity=BUFFER_SAMPLES):
+        self.capacity = capacity
+        self._rings = {}   # service -> (array, samples written)
+
+    def append(self, name, value):
+        ring, written = self._rings.get(name) or (np.zeros(self.capacity, dtype=np.float32), 0)
+        ring[written % self.capacity] = value
+        self._rings[name] = (ring, written + 1)
+
+    def drop(self, name):
+        self._rings.pop(name, None)
+
+    def __len__(self):
+        return sum(min(written, self.capacity) for _, written in self._rings.values())
+
+    def series(self, min_samples=MIN_SAMPLES):
+        """ Chronological copy of every service's buffer holding at least `min_samples` samples """
+        out = []
+        for ring, written in self._rings.values():
+            n = min(written, self.capacity)
+            if n >= min_samples:
+                out.append(np.roll(ring, -written)[-n:] if written > self.capacity else ring[:n].copy())
+        return out
+
+def _split(series, horizons, val_fraction=VAL_FRACTION):
+    """ Chronological train/val windows per service; windows never span two services """
+    from windowing import create_sequences
+    train, val = ([], []), ([], [])
+    for s in series:
+        X, y = create_sequences(s, WINDOW_SIZE, horizons)
+        cut = int(len(X) * (1 - val_fraction))
+        for out, lo, hi in ((train, 0, cut), (val, cut, len(X))):
+            out[0].append(X[lo:hi])
+            out[1].append(y[lo:hi])
+    return tuple(np.concatenate(a).astype(np.float32) for a in train + val)
+
+def fine_tune(model_path, out_path, series, epochs=TUNE_EPOCHS):
+    """
+    Worker process: fine-tunes a copy of `model_path` on the replayed series and, only if its
+    validation MSE on the most recent data beats the live weights, atomically replaces
+    `out_path` (and its .npz export). Returns what happened; the live model is never touched.
+    """
+    os.nice(TUNE_NICE)
+    start = time.perf_counter()
+    import lstm_trainer
+    lstm_trainer.configure_threads(TUNE_THREADS, 1)
+    import h5py
+    import tensorflow as tf
+    from export_brain import export_brain
+    from numpy_brain import model_horizons
+
+    horizons = model_horizons(model_path)
+    X_train, y_train, X_val, y_val = _split(series, horizons)
+    model = tf.keras.models.load_model(model_path, compile=False)
+    model.compile(optimizer=tf.keras.optimizers.Adam(TUNE_LR), loss='mean_squared_error')
+    before = float(model.evaluate(X_val, y_val, batch_size=lstm_trainer.BATCH_SIZE, verbose=0))
+    model.fit(X_train, y_train, epochs=epochs, batch_size=lstm_trainer.BATCH_SIZE, shuffle=True, verbose=0)
+    after = float(model.evaluate(X_val, y_val, batch_size=lstm_trainer.BATCH_SIZE, verbose=0))
+
+    swapped = after < before * (1 - MIN_IMPROVEMENT)
+    if swapped:
+        # Written beside the target, then renamed over it: readers see the old file or the new one, never half of one
+        tmp_h5, tmp_npz = os.path.splitext(out_path)[0] + '.tmp.h5', os.path.splitext(out_path)[0] + '.tmp.npz'
+        model.save(tmp_h5)
+        with h5py.File(tmp_h5, 'a') as f:
+            f.attrs['horizons'] = np.asarray(horizons, dtype=np.int64)
+        export_brain(tmp_h5, tmp_npz)
+        os.replace(tmp_h5, out_path)
+        os.replace(tmp_npz, npz_path_for(out_path))  # After the .h5, so load_brain does not see a stale export
+    return {'val_before': before, 'val_after': after, 'swapped': swapped,
+            'windows': len(X_train), 'seconds': time.perf_counter() - start}
+
+class OnlineTuner:
+    """
+    Keeps a replay buffer of live load and fine-tunes a copy of the forecaster in a background
+    process every `interval` seconds. Nothing here waits on training: `poll()` is called once
+    per tick and returns the model to predict with, which changes only when a round passed
+    validation. Live error of the first-horizon forecast is tracked per model generation.
+    """
+
+    def __init__(self, base_path=MODEL_PATH, tuned_path=TUNED_MODEL_PATH, interval=TUNE_INTERVAL,
+                 buffer=BUFFER_SAMPLES, metrics=None):
+        self.base_path, self.tuned_path = base_path, tuned_path
+        self.interval = interval
+        self.buffer = ReplayBuffer(buffer)
+        self.generation = 0
+        self.swaps = []            # One dict per swap: validation and live error before/after
+        self._future = None
+        self._last_start = time.monotonic()
+        self._pool = concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+        self._pending = {}         # service -> deque of first-horizon forecasts awaiting their outcome
+        self._errors = deque(maxlen=ERROR_WINDOW)
+        self.runs = self.swap_count = self.val_mse = self.live_error = None
+        if metrics is not None:
+            self.runs = metrics.counter('forecaster_tune_runs_total', "Background fine-tuning rounds finished")
+            self.swap_count = metrics.counter('forecaster_swaps_total', "Fine-tuned weights swapped into the live model")
+            self.val_mse = {stage: metrics.gauge('forecaster_validation_mse', "Validation MSE of the last tuning round",
+                                                 {'weights': stage}) for stage in ('live', 'candidate')}
+            self.live_error = metrics.gauge('forecaster_live_abs_error', "Mean |error| of live first-horizon forecasts")
+
+    @property
+    def model_path(self):
+        """ Weights the live model was loaded from: the last swapped-in fine-tune, else the offline model """
+        return self.tuned_path if os.path.exists(self.tuned_path) else self.base_path
+
+    def stop(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def observe(self, name, load):
+        """ One observed sample (0-1 load); also scores the forecast made `horizon` ticks ago """
+        self.buffer.append(name, load)
+        pending = self._pending.get(name)
+        if pending and len(pending) == pending.maxlen:
+            self._errors.append(abs(pending[0] - load))
+            if self.live_error is not None:
+                self.live_error.set(self.error())
+
+    def forecasted(self, name, forecasts, horizons):
+        """ Full horizon row the live model produced for `name` this tick """
+        pending = self._pending.setdefault(name, deque(maxlen=horizons[0]))
+        pending.append(float(forecasts[0]))
+
+    def drop(self, name):
+        self.buffer.drop(name)
+        self._pending.pop(name, None)
+
+    def error(self):
+        return float(np.mean(self._errors)) if self._errors else float('nan')
+
+    def poll(self, model):
+        """ Returns the model to use from now on; collects a finished round and starts the next one when due """
+        swap = self.swaps[-1] if self.swaps else None
+        if swap is not None and swap['live_after'] is None and len(self._errors) == self._errors.maxlen:
+            swap['live_after'] = self.error()
+            print(f"\n   [TUNER] Generation {swap['generation']}: live |error| {swap['live_before']:.4f} -> {swap['live_after']:.4f}")
+
+        if self._future is not None and self._future.done():
+            future, self._future = self._future, None
+            model = self._collect(future, model)
+        elif self._future is None and time.monotonic() - self._last_start >= self.interval:
+            series = self.buffer.series()
+            if series:
+                self._future = self._pool.submit(fine_tune, self.model_path, self.tuned_path, series)
+                self._last_start = time.monotonic()
+        return model
+
+    def _collect(self, future, model):
+        try:
+            result = future.result()
+        except Exception as e:
+            print(f"\n   [TUNER] Fine-tuning failed: {e}")
+            return model
+        if self.runs is not None:
+            self.runs.inc()
+            self.val_mse['live'].set(result['val_before'])
+            self.val_mse['candidate'].set(result['val_after'])
+        verdict = 'swapped in' if result['swapped'] else 'kept live weights'
+        print(f"\n   [TUNER] {result['windows']:,} windows in {result['seconds']:.0f}s: "
+              f"val MSE {result['val_before']:.5f} -> {result['val_after']:.5f}, {verdict}")
+        if not result['swapped']:
+            return model
+
+        new_model = load_brain(self.tuned_path)  # Same BRAIN_RUNTIME (NumPy, quantized or Keras) as the offline model
+        self.generation += 1
+        self.swaps.append({'generation': self.generation, 'val_before': result['val_before'], 'val_after': result['val_after'],
+                           'live_before': self.error(), 'live_after': None})
+        self._errors.clear()
+        self._pending.clear()
+        if self.swap_count is not None:
+            self.swap_count.inc()
+        return new_model
+
+if __name__ == "__main__":
+    # Replays a workload the offline model never saw at 100 ticks/s and checks the loop never waits on tuning
+    import tempfile
+    from load_profiles import diurnal, spike
+
+    ticks = 6000
+    rng = np.random.default_rng(0)
+    load = (diurnal(ticks, low=0.1, high=0.6, period=900) + spike(ticks, peak=0.3, at=2500, width=120))
+    load = (load + rng.normal(0, 0.02, ticks)).clip(0, 1).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tuner = OnlineTuner(tuned_path=os.path.join(tmp, 'tuned.h5'), interval=15, buffer=2000)
+        model = load_brain(MODEL_PATH)
+        tick_ms = []
+        for t in range(ticks):
+            start = time.perf_counter()
+            tuner.observe('web_app', load[t])
+            if t >= WINDOW_SIZE:
+                window = load[t - WINDOW_SIZE + 1:t + 1].reshape(1, WINDOW_SIZE, 1)
+                tuner.forecasted('web_app', model.predict(window)[0], model.horizons)
+            model = tuner.poll(model)
+            tick_ms.append((time.perf_counter() - start) * 1000)
+            time.sleep(max(0.0, 0.01 - (time.perf_counter() - start)))
+        tuner.stop()
+        tick_ms = np.array(tick_ms)
+        print(f"\nTicks: {ticks:,} | p50 {np.percentile(tick_ms, 50):.2f}ms | p99 {np.percentile(tick_ms, 99):.2f}ms | "
+              f"max {tick_ms.max():.1f}ms | swaps: {len(tuner.swaps)}")
+        for swap in tuner.swaps:
+            print(swap)
@@ -1,85 +1,175 @@
 import time
+import argparse
 import numpy as np
-import tensorflow as tf
-from collections import deque
 import os
-import subprocess
 import docker
+from cpu_collector import ServiceCpuCollector
+from numpy_brain import load_brain
+from online_tuner import OnlineTuner
+from control_loop import ControlLoop
+from controller_state import ControllerState
+from scaler import AsyncScaler
+from service_cache import ServiceCache
+from standby_pool import StandbyPool
+from policies import AdaptivePolicy, adaptive_threshold, horizon_forecast, scale_decision, target_replicas, WINDOW_SIZE
 
 # --- CONFIGURATION ---
 SERVICE_NAME = "web_app"
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 MODEL_PATH = os.path.join(BASE_DIR, 'models', 'orchestrator_brain.h5')
 
-WINDOW_SIZE = 60
-MAX_REPLICAS = 10
-MIN_REPLICAS = 1
+SERVICE_REFRESH = 30  # Seconds between label-selector re-resolution
+METRICS_PORT = 9101   # Prometheus /metrics for the control loop (0 disables)
+HORIZON_QUANTILE = None  # Collapse multi-horizon forecasts with this quantile; None takes the max
+STANDBY_POOL = 0      # Max warm standby containers per service (0 disables the pool)
 
-def get_cpu_robust(service_name):
-    """ Direct Docker CLI check """
-    try:
-        cmd_id = f"docker ps --filter label=com.docker.swarm.service.name={service_name} --format {{{{.ID}}}}"
-        output = subprocess.check_output(cmd_id, shell=True).decode().strip()
-        if not output: return 0.0
-        container_id = output.split('\n')[0]
-        cmd_stats = f"docker stats {container_id} --no-stream --format {{{{.CPUPerc}}}}"
-        stats_output = subprocess.check_output(cmd_stats, shell=True).decode().strip()
-        return float(stats_output.replace('%', '')) / 100.0
-    except:
-        return 0.0
-
-def start_orchestration():
+def predict_batch(model, policies, cover=1, quantile=HORIZON_QUANTILE, raw=None):
+    """
+    Stacks every full history window into one (N, WINDOW_SIZE, 1) batch and runs a single predict.
+    Multi-horizon outputs are collapsed over the horizons reaching `cover` ticks ahead; pass a
+    dict as `raw` to also get each service's full horizon row.
+    Returns {service_name: prediction} for the services that were ready.
+    """
+    ready = [name for name, policy in policies.items() if policy.ready]
+    if not ready:
+        return {}
+    batch = np.stack([policies[name].history.window() for name in ready]).reshape(len(ready), WINDOW_SIZE, 1)
+    forecasts = model.predict(batch, verbose=0)
+    if raw is not None:
+        raw.update(zip(ready, forecasts))
+    return dict(zip(ready, horizon_forecast(forecasts, getattr(model, 'horizons', (1,)), cover, quantile)))
+
+def resolve_services(cache, services=None, label=None):
+    """ Explicit service names win; otherwise every cached service matching the label selector """
+    if services:
+        return list(services)
+    if label:
+        return cache.names(label)
+    return [SERVICE_NAME]
+
+def start_orchestration(services=None, label=None, metrics_port=METRICS_PORT, quantile=HORIZON_QUANTILE, tune=False,
+                        standby=STANDBY_POOL):
     print("--- PHASE 3: ADAPTIVE AI ORCHESTRATOR ---")
     client = docker.from_env()
-    print(f"Loading Universal Model from {MODEL_PATH}...")
-    model = tf.keras.models.load_model(MODEL_PATH)
-    
-    history = deque(maxlen=WINDOW_SIZE)
-    print("Warming up buffer (Need 60 seconds)...")
-
-    while True:
-        try:
-            # A. OBSERVE
-            current_cpu = get_cpu_robust(SERVICE_NAME)
-            history.append(current_cpu)
-            
-            # NOVELTY: Calculate Volatility (Standard Deviation)
-            # If traffic is unstable (High Std Dev), we lower the threshold to be safer.
-            volatility = np.std(history) if len(history) > 1 else 0.0
-            
-            # Dynamic Threshold Formula
-            # Base = 0.60 (60%). Subtract volatility.
-            # Example: If volatility is 0.1, Threshold becomes 0.40 (40%).
-            dynamic_threshold = 0.60 - (volatility * 2.0)
-            dynamic_threshold = max(0.20, min(dynamic_threshold, 0.80)) # Clamp between 20% and 80%
-            
-            print(f"Load: {current_cpu*100:5.1f}% | Volatility: {volatility:.3f} | Dynamic Thresh: {dynamic_threshold*100:.1f}%", end='\r')
-
-            # B. PREDICT
-            if len(history) == WINDOW_SIZE:
-                input_data = np.array(history).reshape(1, WINDOW_SIZE, 1)
-                prediction = model.predict(input_data, verbose=0)[0][0]
-                
-                # C. ACT (Using DYNAMIC Threshold)
-                service = client.services.get(SERVICE_NAME)
-                current_replicas = service.attrs['Spec']['Mode']['Replicated']['Replicas']
-
-                if prediction > dynamic_threshold and current_replicas < MAX_REPLICAS:
-                    print(f"\n   [ADAPTIVE ALERT] Spike {prediction*100:.1f}% > Thresh {dynamic_threshold*100:.1f}%! Scaling UP...")
-                    service.scale(current_replicas + 1)
-                    history.clear() # Reset buffer
-                    
-                elif prediction < 0.10 and current_replicas > MIN_REPLICAS:
-                    print(f"\n   [INFO] System Idle. Scaling DOWN...")
-                    service.scale(current_replicas - 1)
-            
-            time.sleep(1)
-
-        except KeyboardInterrupt:
-            break
-        except Exception as e:
-            print(f"Error: {e}")
-            time.sleep(1)
+    loop = ControlLoop('orchestrator', metrics_port=metrics_port)
+    # Online fine-tuning runs in a background process; the loop only swaps in weights that validated better
+    tuner = OnlineTuner(MODEL_PATH, metrics=loop.metrics) if tune else None
+    model_path = tuner.model_path if tuner else MODEL_PATH
+    print(f"Loading Universal Model from {model_path}...")
+    model = load_brain(model_path)
+    print(f"Forecast horizons: {', '.join(f't+{h}' for h in model.horizons)}")
+
+    collectors = {}
+    policies = {}
+    pools = {}
+    last_resolve = 0.0
+    # Policies resume from the last snapshot (or the logger's tail) instead of a 60-second warm-up
+    state = ControllerState('orchestrator', loop.period)
+
+    cache = ServiceCache(client, loop.metrics).start()
+    scaler = AsyncScaler(client, loop.metrics, cache=cache)
+    try:
+        for _ in loop:
+            try:
+                # Track the selected services; new ones start warming up, removed ones are dropped
+                if time.time() - last_resolve > SERVICE_REFRESH:
+                    names = resolve_services(cache, services, label)
+                    for name in set(collectors) - set(names):
+                        collectors.pop(name).stop()
+                        policies.pop(name)
+                        if name in pools:
+                            pools.pop(name).stop()
+                        if tuner:
+                            tuner.drop(name)
+                    for name in names:
+                        if name not in collectors:
+                            collectors[name] = ServiceCpuCollector(client, name, api_calls=cache.api_calls).start()
+                            policies[name] = AdaptivePolicy()
+                            if state.seed(name, policies[name]) is None:
+                                print(f"Warming up buffer for {name} (Need {WINDOW_SIZE} seconds)...")
+                            if standby:
+                                pools[name] = StandbyPool(client, name, scaler, max_size=standby, api_calls=cache.api_calls,
+                                                        owner=loop.name).start()
+                    last_resolve = time.time()
+
+                # A. OBSERVE (mean CPU across every replica, from the background streams)
+                with loop.phase('observe'):
+                    for name, collector in collectors.items():
+                        policies[name].observe(collector.latest()['mean'] / 100.0)
+                        if tuner:
+                            tuner.observe(name, policies[name].history.last())
+
+                if len(policies) == 1:
+                    policy = next(iter(policies.values()))
+                    volatility, dynamic_threshold = adaptive_threshold(policy.history)
+                    print(f"Load: {policy.history.last()*100:5.1f}% (EWMA {policy.history.ewma.value*100:5.1f}%) | Volatility: {volatility:.3f} | Dynamic Thresh: {dynamic_threshold*100:.1f}%", end='\r')
+                else:
+                    ready = sum(p.ready for p in policies.values())
+                    print(f"Services: {len(policies)} | Ready: {ready} | Daemon calls: {cache.api_calls.per_minute():.0f}/min", end='\r')
+
+                # B. PREDICT (one batched call for every ready service, looking as far ahead as a replica takes to boot)
+                with loop.phase('predict'):
+                    raw = {} if tuner or pools else None
+                    predictions = predict_batch(model, policies, scaler.cold_start() / loop.period, quantile, raw)
+                    if tuner:
+                        for name, forecasts in raw.items():
+                            tuner.forecasted(name, forecasts, model.horizons)
+                        model = tuner.poll(model)  # Never waits: collects a finished round or starts a due one
+
+                # C. ACT (Using each service's own DYNAMIC Threshold; scale calls never block the tick)
+                with loop.phase('act'):
+                    for name, prediction in predictions.items():
+                        policy = policies[name]
+                        desired = scaler.desired(name)
+                        if desired is None:
+                            continue  # Not in Swarm (yet): hold until its spec can be read
+                        # The forecast is per-replica CPU over the replicas reporting stats right now
+                        serving = len(collectors[name].latest()['replicas']) or desired
+                        target = policy.decide(prediction, serving)
+                        if name in pools:
+                            # Keep as many warm standbys as the furthest horizon says will be needed on top of today's replicas
+                            longest = horizon_forecast(raw[name][None], model.horizons, max(model.horizons))[0]
+                            pools[name].follow(target_replicas(longest, serving, policy.threshold) - serving)
+                        request = scale_decision(target, desired, scaler.converging(name))
+                        if request is None:
+                            continue
+
+                        if request > desired:
+                            print(f"\n   [ADAPTIVE ALERT] {name}: Spike {prediction*100:.1f}% > Thresh {policy.threshold*100:.1f}%! Scaling UP to {request}...")
+                        else:
+                            print(f"\n   [INFO] {name}: System Idle. Scaling DOWN to {request}...")
+                        scaler.scale(name, request)
+                        state.decided(name, request)
+                        if name in pools and request > desired:
+                            pools[name].promote(request - desired, request)  # Serve now; retired once the new tasks run
+
+                state.tick(policies)
+
+            except Exception as e:
+                print(f"Error: {e}")
+
+    except KeyboardInterrupt:
+        state.save(policies)
+        for collector in collectors.values():
+            collector.stop()
+        for pool in pools.values():
+            pool.stop()
+        scaler.stop()
+        cache.stop()
+        if tuner:
+            tuner.stop()
 
 if __name__ == "__main__":
-    start_orchestration()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Adaptive AI orchestrator for one or more Swarm services")
+    parser.add_argument('--services', help="comma-separated service names (default: web_app)")
+    parser.add_argument('--label', help="label selector, e.g. autoscale=true or tier=web")
+    parser.add_argument('--metrics-port', type=int, default=METRICS_PORT, help="Prometheus /metrics port (0 disables)")
+    parser.add_argument('--quantile', type=float, default=HORIZON_QUANTILE,
+                        help="quantile over the cold-start horizons (default: max)")
+    parser.add_argument('--tune', action='store_true', help="fine-tune the forecaster on live load in the background (needs TensorFlow)")
+    parser.add_argument('--standby', type=int, default=STANDBY_POOL,
+                        help="keep up to N paused warm containers per service to promote on a spike (0 disables)")
+    args = parser.parse_args()
+    start_orchestration(services=args.services.split(',') if args.services else None, label=args.label,
+                        metrics_port=args.metrics_port, quantile=args.quantile, tune=args.tune,
+                        standby=args.standby)
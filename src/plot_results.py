@@ -1,6 +1,7 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import os
+from analysis import load_results, downsample
 
 def plot_comparison():
     file_reactive = 'results_reactive.csv'
@@ -10,13 +11,10 @@ def plot_comparison():
         print("ERROR: Missing CSV files.")
         return
 
-    # Load data (Header-safe)
+    # Load data (with or without a header row; columns by name from here on)
     try:
-        df_no_ai = pd.read_csv(file_reactive)
-        if 'Time_Sec' not in df_no_ai.columns: df_no_ai = pd.read_csv(file_reactive, header=None)
-            
-        df_ai = pd.read_csv(file_proactive)
-        if 'Time_Sec' not in df_ai.columns: df_ai = pd.read_csv(file_proactive, header=None)
+        df_no_ai = load_results(file_reactive)
+        df_ai = load_results(file_proactive)
     except Exception as e:
         print(f"Error: {e}")
         return
@@ -25,8 +23,8 @@ def plot_comparison():
 
     # CPU Load Comparison
     plt.subplot(2, 1, 1)
-    plt.plot(df_no_ai.iloc[:, 0], df_no_ai.iloc[:, 1], 'r--', label='Reactive (Standard)')
-    plt.plot(df_ai.iloc[:, 0], df_ai.iloc[:, 1], 'g-', label='Proactive (Adaptive AI)')
+    plt.plot(*downsample(df_no_ai, 'Time_Sec', 'CPU_Load'), 'r--', label='Reactive (Standard)')
+    plt.plot(*downsample(df_ai, 'Time_Sec', 'CPU_Load'), 'g-', label='Proactive (Adaptive AI)')
     plt.title('Impact of Adaptive AI on System Load')
     plt.ylabel('CPU Load (%)')
     plt.legend()
@@ -34,8 +32,8 @@ def plot_comparison():
 
     # Scaling Action Comparison
     plt.subplot(2, 1, 2)
-    plt.plot(df_no_ai.iloc[:, 0], df_no_ai.iloc[:, 2], 'r--', label='Replicas (Reactive)')
-    plt.plot(df_ai.iloc[:, 0], df_ai.iloc[:, 2], 'g-', linewidth=2, label='Replicas (Adaptive AI)')
+    plt.plot(*downsample(df_no_ai, 'Time_Sec', 'Replicas'), 'r--', label='Replicas (Reactive)')
+    plt.plot(*downsample(df_ai, 'Time_Sec', 'Replicas'), 'g-', linewidth=2, label='Replicas (Adaptive AI)')
     plt.ylabel('Container Count')
     plt.xlabel('Time (Seconds)')
     plt.legend()
@@ -46,4 +44,4 @@ def plot_comparison():
     print("Graph saved as final_comparison_graph.png")
 
 if __name__ == "__main__":
-    plot_comparison()
\ No newline at end of file
+    plot_comparison()
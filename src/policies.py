@@ -0,0 +1,150 @@
+import math
+import numpy as np
+from rolling_stats import BreachCounter, RollingStats
+
+# --- CONFIGURATION ---
+# Shared by the live agents and the offline simulator. CPU is always a 0.0 - 1.0 fraction here.
+WINDOW_SIZE = 60
+MAX_REPLICAS = 10
+MIN_REPLICAS = 1
+
+def adaptive_threshold(history):
+    """ Returns (volatility, dynamic_threshold) for one service's RollingStats window """
+    # NOVELTY: Calculate Volatility (Standard Deviation, kept incrementally: O(1) per tick)
+    # If traffic is unstable (High Std Dev), we lower the threshold to be safer.
+    volatility = history.std() if len(history) > 1 else 0.0
+
+    # Dynamic Threshold Formula
+    # Base = 0.60 (60%). Subtract volatility.
+    # Example: If volatility is 0.1, Threshold becomes 0.40 (40%).
+    dynamic_threshold = 0.60 - (volatility * 2.0)
+    dynamic_threshold = max(0.20, min(dynamic_threshold, 0.80)) # Clamp between 20% and 80%
+    return volatility, dynamic_threshold
+
+def target_replicas(per_replica_load, current_replicas, target_utilization, minimum=MIN_REPLICAS, maximum=MAX_REPLICAS):
+    """
+    Capacity model: per-replica load x replicas is the total load; the target is the replica
+    count that brings each replica back to `target_utilization`, clamped to the bounds.
+    """
+    total_load = per_replica_load * current_replicas
+    target = math.ceil(total_load / max(target_utilization, 1e-6))
+    return int(min(max(target, minimum, MIN_REPLICAS), maximum, MAX_REPLICAS))
+
+def scale_decision(target, desired, converging):
+    """
+    Replica count to request, or None to hold. Scale-ups may jump past an operation that is
+    still converging; scale-downs wait for it so load has settled on the new replicas first.
+    Holds when either count is unknown (a service Swarm does not report yet).
+    """
+    if target is None or desired is None:
+        return None
+    if target > desired:
+        return target
+    if target < desired and not converging:
+        return target
+    return None
+
+def horizon_forecast(forecasts, horizons, cover, quantile=None):
+    """
+    Collapses multi-horizon forecasts, shape (N, len(horizons)), to one value per row: the max
+    (or `quantile`) over every horizon up to the first one reaching `cover` steps ahead, the
+    replica cold-start time, so a scale-up started now is serving before that load arrives.
+    """
+    forecasts = np.asarray(forecasts, dtype=np.float32).reshape(len(forecasts), -1)
+    reaching = np.nonzero(np.asarray(horizons) >= cover)[0]
+    window = forecasts[:, :(reaching[0] if len(reaching) else len(horizons) - 1) + 1]
+    return window.max(axis=1) if quantile is None else np.quantile(window, quantile, axis=1)
+
+class ReactivePolicy:
+    """ Standard industry logic: scale only after the load has been high for `lag` consecutive ticks """
+    name = 'reactive'
+    uses_model = False
+
+    def __init__(self, up_threshold=0.80, down_threshold=0.20, lag=5):
+        self.up_threshold = up_threshold
+        self.down_threshold = down_threshold
+        self.lag = lag
+        self.breaches = BreachCounter(up_threshold)  # To simulate "Reaction Lag"
+        self.cpu = 0.0
+        self.ready = True
+
+    def observe(self, cpu):
+        self.cpu = cpu
+        # LOGIC: Only scale if load is high for `lag` consecutive seconds
+        self.breaches.update(cpu)
+
+    def state(self):
+        """ JSON-able snapshot for a warm restart """
+        return {'cpu': self.cpu, 'breaches': self.breaches.count}
+
+    def load_state(self, state):
+        self.cpu, self.breaches.count = state['cpu'], state['breaches']
+
+    def decide(self, prediction, current_replicas):
+        """ Target replica count (current_replicas to hold), sized from the observed load """
+        if self.breaches.count >= self.lag and current_replicas < MAX_REPLICAS:
+            self.breaches.reset()
+            return target_replicas(self.cpu, current_replicas, self.up_threshold, minimum=current_replicas + 1)
+        if self.cpu < self.down_threshold and current_replicas > MIN_REPLICAS:
+            return target_replicas(self.cpu, current_replicas, self.up_threshold, maximum=current_replicas - 1)
+        return current_replicas
+
+class StaticAIPolicy:
+    """ LSTM forecast against a fixed threshold. No adaptation: one replica per step, buffer reset on scale-up. """
+    name = 'static_ai'
+    uses_model = True
+
+    def __init__(self, threshold=0.50, idle_threshold=0.20):
+        self.threshold = threshold
+        self.idle_threshold = idle_threshold
+        self.history = RollingStats(WINDOW_SIZE)
+
+    @property
+    def ready(self):
+        return self.history.full
+
+    def observe(self, cpu):
+        self.history.append(cpu)
+
+    def state(self):
+        """ JSON-able snapshot for a warm restart: the window oldest first and the EWMA """
+        return {'window': self.history.window(np.float64).tolist(), 'ewma': self.history.ewma.value}
+
+    def load_state(self, state):
+        self.history.clear()
+        self.history.extend(state['window'][-self.history.size:])
+        self.history.ewma.value = state['ewma']
+
+    def decide(self, prediction, current_replicas):
+        """ Target replica count (current_replicas to hold) """
+        # RIGID LOGIC: Only scale if > 50%.
+        if prediction > self.threshold and current_replicas < MAX_REPLICAS:
+            self.history.clear()
+            return current_replicas + 1
+        if prediction < self.idle_threshold and current_replicas > MIN_REPLICAS:
+            return current_replicas - 1
+        return current_replicas
+
+class AdaptivePolicy(StaticAIPolicy):
+    """
+    LSTM forecast against a threshold that drops as the load gets more volatile.
+    Jumps straight to the replica count the forecast needs and keeps its history rolling.
+    """
+    name = 'adaptive'
+
+    def __init__(self, idle_threshold=0.10):
+        super().__init__(threshold=None, idle_threshold=idle_threshold)
+
+    def current_threshold(self):
+        return adaptive_threshold(self.history)[1]
+
+    def decide(self, prediction, current_replicas):
+        """ Target replica count (current_replicas to hold) """
+        self.threshold = self.current_threshold()
+        if prediction > self.threshold and current_replicas < MAX_REPLICAS:
+            return target_replicas(prediction, current_replicas, self.threshold, minimum=current_replicas + 1)
+        if prediction < self.idle_threshold and current_replicas > MIN_REPLICAS:
+            return target_replicas(prediction, current_replicas, self.threshold, maximum=current_replicas - 1)
+        return current_replicas
+
+POLICIES = {p.name: p for p in (ReactivePolicy, StaticAIPolicy, AdaptivePolicy)}
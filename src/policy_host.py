@@ -0,0 +1,160 @@
+import argparse
+import csv
+import time
+import docker
+from cpu_collector import ServiceCpuCollector
+from control_loop import ControlLoop
+from numpy_brain import load_brain
+from orchestrator import HORIZON_QUANTILE, MODEL_PATH, predict_batch
+from policies import POLICIES, scale_decision
+from scaler import AsyncScaler
+from service_cache import ServiceCache
+
+# --- CONFIGURATION ---
+SERVICE_NAME = "web_app"
+ACTIVE = 'adaptive'                  # The one policy whose decisions are applied
+SHADOWS = ('reactive', 'static_ai')  # Decide on the same telemetry; only logged
+DECISION_LOG = "decisions.csv"
+METRICS_PORT = 9104  # Prometheus /metrics for the control loop (0 disables)
+LOG_COLUMNS = ['Time', 'Tick', 'Policy', 'Role', 'CPU', 'Replicas', 'Desired', 'Prediction', 'Threshold',
+               'Target', 'Request', 'Acted']
+
+class PolicyHost:
+    """
+    Several policies on one telemetry feed. Every tick each policy observes the same load sample
+    and decides against the same cluster state; the model-based ones share one model and one
+    batched predict. Only the active policy's request is returned for scaling, the shadows'
+    are just logged, so every row of the decision log compares policies on identical input.
+    Shadow policies keep their own internal state (breach counters, buffer resets) as if their
+    decisions had been applied.
+    """
+
+    def __init__(self, active, shadows, model=None, quantile=HORIZON_QUANTILE, log_file=DECISION_LOG, metrics=None):
+        self.active = active
+        self.policies = {name: POLICIES[name]() for name in ([active] if active else []) + list(shadows)}
+        self.model = model
+        self.quantile = quantile
+        self.tick_count = 0
+        self._file = open(log_file, 'w', newline='') if log_file else None
+        self._writer = csv.writer(self._file) if self._file else None
+        if self._writer:
+            self._writer.writerow(LOG_COLUMNS)
+        self.requests = None
+        if metrics is not None:
+            self.requests = {(name, direction): metrics.counter(
+                'policy_scale_requests_total', "Scale requests each hosted policy made (active or shadow)",
+                {'policy': name, 'role': self.role(name), 'direction': direction})
+                for name in self.policies for direction in ('up', 'down')}
+
+    def role(self, name):
+        return 'active' if name == self.active else 'shadow'
+
+    def close(self):
+        if self._file:
+            self._file.close()
+
+    def observe(self, cpu):
+        for policy in self.policies.values():
+            policy.observe(cpu)
+
+    def predict(self, cover=1):
+        """ {policy: forecast} for every ready model-based policy, from a single predict call """
+        model_policies = {name: p for name, p in self.policies.items() if p.uses_model}
+        if not model_policies or self.model is None:
+            return {}
+        raw = {}
+        collapsed = predict_batch(self.model, model_policies, cover, self.quantile, raw)
+        # The adaptive policy covers the cold start with the horizon max; the static one keeps its t+1 forecast
+        return {name: collapsed[name] if name == 'adaptive' else float(raw[name][0]) for name in collapsed}
+
+    def decide(self, cpu, serving, desired, converging, predictions):
+        """
+        Every policy's decision on the same state; returns the active policy's request (or None).
+        While `desired` is unknown (the service is not in Swarm yet) every policy holds.
+        """
+        now = time.time()
+        active_request = None
+        for name, policy in self.policies.items():
+            prediction = predictions.get(name)
+            if desired is None or (policy.uses_model and prediction is None):
+                target = request = None  # Service not in Swarm yet, or still filling its window
+            else:
+                target = policy.decide(prediction, serving)
+                request = scale_decision(target, desired, converging)
+            acted = name == self.active and request is not None
+            if acted:
+                active_request = request
+            if request is not None and self.requests is not None:
+                self.requests[(name, 'up' if request > desired else 'down')].inc()
+            if self._writer:
+                threshold = getattr(policy, 'threshold', None) or getattr(policy, 'up_threshold', None)
+                self._writer.writerow([round(now, 3), self.tick_count, name, self.role(name), round(cpu, 4), serving, desired,
+                                       '' if prediction is None else round(float(prediction), 4),
+                                       '' if threshold is None else round(threshold, 4),
+                                       '' if target is None else target, '' if request is None else request, int(acted)])
+        if self._file:
+            self._file.flush()
+        self.tick_count += 1
+        return active_request
+
+def start_host(active=ACTIVE, shadows=SHADOWS, service=SERVICE_NAME, quantile=HORIZON_QUANTILE,
+               metrics_port=METRICS_PORT, log_file=DECISION_LOG):
+    roles = f"active: {active or 'none'} | shadow: {', '.join(shadows) or 'none'}"
+    print(f"--- POLICY HOST ({roles}) ---")
+    client = docker.from_env()
+    loop = ControlLoop('policy_host', metrics_port=metrics_port)
+    needs_model = any(POLICIES[name].uses_model for name in [active, *shadows] if name)
+    model = load_brain(MODEL_PATH) if needs_model else None
+    host = PolicyHost(active, shadows, model, quantile, log_file, loop.metrics)
+    print(f"Logging every policy's decision to {log_file}")
+
+    # One observer for every policy: one stats stream per replica, replica counts from the events cache
+    cache = ServiceCache(client, loop.metrics).start()
+    collector = ServiceCpuCollector(client, service, api_calls=cache.api_calls).start()
+    scaler = AsyncScaler(client, loop.metrics, cache=cache)
+    try:
+        for _ in loop:
+            try:
+                with loop.phase('observe'):
+                    snapshot = collector.latest()
+                    cpu = snapshot['mean'] / 100.0
+                    serving = len(snapshot['replicas']) or scaler.desired(service)
+                    host.observe(cpu)
+
+                with loop.phase('predict'):
+                    predictions = host.predict(scaler.cold_start() / loop.period)
+
+                with loop.phase('act'):
+                    desired = scaler.desired(service)
+                    request = host.decide(cpu, serving, desired, scaler.converging(service), predictions)
+                    if request is not None:
+                        print(f"\n   [{active.upper()}] {service}: scaling {'UP' if request > desired else 'DOWN'} to {request}")
+                        scaler.scale(service, request)
+
+                ready = sum(p.ready for p in host.policies.values())
+                print(f"Load: {cpu * 100:5.1f}% | Replicas: {serving} | Policies ready: {ready}/{len(host.policies)}", end='\r')
+            except Exception as e:
+                print(f"Error: {e}")
+
+    except KeyboardInterrupt:
+        collector.stop()
+        scaler.stop()
+        cache.stop()
+        host.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs one active policy and any number of shadow policies on a single telemetry feed")
+    parser.add_argument('--active', default=ACTIVE, help=f"policy that scales: {', '.join(POLICIES)}, or 'none' (all shadow)")
+    parser.add_argument('--shadow', default=','.join(SHADOWS), help="comma-separated policies that only log their decisions")
+    parser.add_argument('--service', default=SERVICE_NAME)
+    parser.add_argument('--quantile', type=float, default=HORIZON_QUANTILE, help="quantile over the cold-start horizons (default: max)")
+    parser.add_argument('--metrics-port', type=int, default=METRICS_PORT, help="Prometheus /metrics port (0 disables)")
+    parser.add_argument('--log', default=DECISION_LOG, help="decision log CSV")
+    args = parser.parse_args()
+
+    active = None if args.active == 'none' else args.active
+    shadows = [name for name in args.shadow.split(',') if name and name != active]
+    for name in ([active] if active else []) + shadows:
+        if name not in POLICIES:
+            raise SystemExit(f"Unknown policy {name!r}; choose from {', '.join(POLICIES)}")
+    start_host(active, shadows, args.service, args.quantile, args.metrics_port, args.log)
@@ -1,64 +1,71 @@
-import time
+import argparse
 import docker
-import subprocess
+from cpu_collector import ServiceCpuCollector
+from control_loop import ControlLoop
+from scaler import AsyncScaler
+from service_cache import ServiceCache
+from standby_pool import StandbyPool
+from policies import ReactivePolicy, scale_decision
 
 SERVICE_NAME = "web_app"
 UP_THRESHOLD = 80.0    # Scale UP if CPU > 80%
 DOWN_THRESHOLD = 20.0  # Scale DOWN if CPU < 20%
-MAX_REPLICAS = 10
-MIN_REPLICAS = 1
+LAG_SECONDS = 5
+METRICS_PORT = 9102  # Prometheus /metrics for the control loop (0 disables)
+STANDBY_POOL = 0     # Warm standby containers promoted on scale-up (0 disables the pool)
 
-def get_cpu_robust(service_name):
-    """ Direct Docker CLI check """
-    try:
-        cmd_id = f"docker ps --filter label=com.docker.swarm.service.name={service_name} --format {{{{.ID}}}}"
-        output = subprocess.check_output(cmd_id, shell=True).decode().strip()
-        if not output: return 0.0
-        container_id = output.split('\n')[0]
-        cmd_stats = f"docker stats {container_id} --no-stream --format {{{{.CPUPerc}}}}"
-        stats_output = subprocess.check_output(cmd_stats, shell=True).decode().strip()
-        return float(stats_output.replace('%', ''))
-    except:
-        return 0.0
-
-def start_reactive():
+def start_reactive(standby=STANDBY_POOL):
     print("--- REACTIVE AUTOSCALER (Standard Industry Logic) ---")
     client = docker.from_env()
-    high_load_counter = 0  # To simulate "Reaction Lag"
+    policy = ReactivePolicy(UP_THRESHOLD / 100.0, DOWN_THRESHOLD / 100.0, lag=LAG_SECONDS)
     
-    while True:
-        try:
-            cpu = get_cpu_robust(SERVICE_NAME)
-            service = client.services.get(SERVICE_NAME)
-            current_replicas = service.attrs['Spec']['Mode']['Replicated']['Replicas']
-            
-            print(f"Reactive Monitor | Load: {cpu:.1f}% | Replicas: {current_replicas} | Lag: {high_load_counter}/5s", end='\r')
-            
-            # LOGIC: Only scale if load is high for 5 consecutive seconds (Lag)
-            if cpu > UP_THRESHOLD:
-                high_load_counter += 1
-            else:
-                high_load_counter = 0
-            
-            # ACT
-            if high_load_counter >= 5 and current_replicas < MAX_REPLICAS:
-                print(f"\n[REACTIVE] Threshold breached for 5s! Scaling UP to {current_replicas + 1}...")
-                service.scale(current_replicas + 1)
-                high_load_counter = 0 # Reset
-                time.sleep(5) # Cooldown
-                
-            elif cpu < DOWN_THRESHOLD and current_replicas > MIN_REPLICAS:
-                print(f"\n[REACTIVE] Load low. Scaling DOWN to {current_replicas - 1}...")
-                service.scale(current_replicas - 1)
-                time.sleep(5)
+    loop = ControlLoop('reactive', metrics_port=METRICS_PORT)
+    cache = ServiceCache(client, loop.metrics).start()
+    collector = ServiceCpuCollector(client, SERVICE_NAME, api_calls=cache.api_calls).start()
+    scaler = AsyncScaler(client, loop.metrics, cache=cache)
+    # No forecast to follow here: the pool just stays at its fixed size
+    pool = StandbyPool(client, SERVICE_NAME, scaler, min_size=standby, max_size=standby, api_calls=cache.api_calls,
+                       owner=loop.name).start() if standby else None
+    try:
+        for _ in loop:
+            try:
+                with loop.phase('observe'):
+                    snapshot = collector.latest()
+                    cpu = snapshot['mean']
+                    current_replicas = len(snapshot['replicas']) or scaler.desired(SERVICE_NAME)
+
+                # LOGIC: Only scale if load is high for 5 consecutive seconds (Lag)
+                policy.observe(cpu / 100.0)
+                print(f"Reactive Monitor | Load: {cpu:.1f}% | Replicas: {current_replicas} | Lag: {policy.breaches.count}/{LAG_SECONDS}s | Daemon calls: {cache.api_calls.per_minute():.0f}/min", end='\r')
+
+                # ACT (no cooldown sleep: scale-downs simply wait until the last operation has converged)
+                with loop.phase('act'):
+                    desired = scaler.desired(SERVICE_NAME)
+                    if desired is None:
+                        continue  # Not in Swarm (yet): hold until its spec can be read
+                    request = scale_decision(policy.decide(None, current_replicas), desired, scaler.converging(SERVICE_NAME))
+                    if request is not None and request > desired:
+                        print(f"\n[REACTIVE] Threshold breached for {LAG_SECONDS}s! Scaling UP to {request}...")
+                        scaler.scale(SERVICE_NAME, request)
+                        if pool:
+                            pool.promote(request - desired, request)
+                    elif request is not None:
+                        print(f"\n[REACTIVE] Load low. Scaling DOWN to {request}...")
+                        scaler.scale(SERVICE_NAME, request)
+
+            except Exception as e:
+                print(e)
 
-            time.sleep(1)
-            
-        except KeyboardInterrupt:
-            break
-        except Exception as e:
-            print(e)
-            time.sleep(1)
+    except KeyboardInterrupt:
+        collector.stop()
+        if pool:
+            pool.stop()
+        scaler.stop()
+        cache.stop()
 
 if __name__ == "__main__":
-    start_reactive()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Threshold autoscaler (the reactive baseline)")
+    parser.add_argument('--standby', type=int, default=STANDBY_POOL,
+                        help="keep N paused warm containers to promote on scale-up (0 disables)")
+    args = parser.parse_args()
+    start_reactive(standby=args.standby)
\ No newline at end of file
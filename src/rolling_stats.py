@@ -0,0 +1,147 @@
+import math
+from collections import deque
+import numpy as np
+
+# --- CONFIGURATION ---
+RESYNC_EVERY = 100_000  # Appends between exact recomputations of the running sums (bounds float drift)
+
+class RollingWindow:
+    """
+    The last `size` samples in a preallocated NumPy ring, with O(1) windowed mean and variance
+    (Welford's update, extended to remove the sample that falls out) and amortised O(1) min/max
+    from monotonic deques. Variance is the population variance, matching np.var / np.std.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.values = np.zeros(size, dtype=np.float64)
+        self.written = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._min = deque()  # (sample number, value), values increasing
+        self._max = deque()  # (sample number, value), values decreasing
+
+    def __len__(self):
+        return min(self.written, self.size)
+
+    @property
+    def full(self):
+        return self.written >= self.size
+
+    def append(self, x):
+        x = float(x)
+        pos = self.written % self.size
+        if self.written < self.size:
+            n = self.written + 1
+            delta = x - self._mean
+            self._mean += delta / n
+            self._m2 += delta * (x - self._mean)
+        else:
+            old = self.values[pos]
+            mean = self._mean
+            self._mean += (x - old) / self.size
+            self._m2 += (x - old) * (x - self._mean + old - mean)
+        self.values[pos] = x
+
+        # Monotonic deques: drop samples that left the window, then everything the new one dominates
+        oldest = self.written - self.size + 1
+        for dq, worse in ((self._min, lambda v: v >= x), (self._max, lambda v: v <= x)):
+            while dq and dq[0][0] < oldest:
+                dq.popleft()
+            while dq and worse(dq[-1][1]):
+                dq.pop()
+            dq.append((self.written, x))
+
+        self.written += 1
+        if self.written % RESYNC_EVERY == 0:
+            window = self.window(np.float64)
+            self._mean, self._m2 = float(window.mean()), float(((window - window.mean()) ** 2).sum())
+
+    def extend(self, xs):
+        for x in xs:
+            self.append(x)
+
+    def clear(self):
+        self.written = 0
+        self._mean = self._m2 = 0.0
+        self._min.clear()
+        self._max.clear()
+
+    def last(self):
+        return self.values[(self.written - 1) % self.size] if self.written else float('nan')
+
+    def mean(self):
+        return self._mean if self.written else float('nan')
+
+    def var(self):
+        return max(self._m2, 0.0) / len(self) if self.written else float('nan')
+
+    def std(self):
+        return math.sqrt(self.var())
+
+    def min(self):
+        return self._min[0][1] if self._min else float('nan')
+
+    def max(self):
+        return self._max[0][1] if self._max else float('nan')
+
+    def window(self, dtype=np.float32):
+        """ Samples oldest first, as a new array (model input) """
+        n, pos = len(self), self.written % self.size
+        if self.written <= self.size:
+            return self.values[:n].astype(dtype)
+        return np.concatenate((self.values[pos:], self.values[:pos])).astype(dtype)
+
+class Ewma:
+    """ Exponentially weighted moving average; the first sample seeds it """
+
+    def __init__(self, alpha):
+        self.alpha = alpha
+        self.value = float('nan')
+
+    def update(self, x):
+        self.value = float(x) if math.isnan(self.value) else self.value + self.alpha * (float(x) - self.value)
+        return self.value
+
+class BreachCounter:
+    """ Consecutive samples above (or, with above=False, below) a threshold """
+
+    def __init__(self, threshold, above=True):
+        self.threshold = threshold
+        self.above = above
+        self.count = 0
+
+    def update(self, x):
+        breached = x > self.threshold if self.above else x < self.threshold
+        self.count = self.count + 1 if breached else 0
+        return self.count
+
+    def reset(self):
+        self.count = 0
+
+class RollingStats(RollingWindow):
+    """ A RollingWindow that also keeps an EWMA of every sample; what the policies keep per service """
+
+    def __init__(self, size, alpha=0.2):
+        super().__init__(size)
+        self.ewma = Ewma(alpha)
+
+    def append(self, x):
+        super().append(x)
+        self.ewma.update(x)
+
+if __name__ == "__main__":
+    # Per-tick cost against the deque + np.std it replaces; correctness is in tests/test_rolling_stats.py
+    import time
+    stream = 1e6 + np.random.default_rng(0).normal(0, 1, 100_000)
+    history, stats = deque(maxlen=60), RollingStats(60)
+    start = time.perf_counter()
+    for x in stream:
+        history.append(x)
+        np.std(history)
+    deque_us = (time.perf_counter() - start) * 10
+    start = time.perf_counter()
+    for x in stream:
+        stats.append(x)
+        stats.std()
+    print(f"Per sample: deque + np.std {deque_us:.1f}us | RollingStats {(time.perf_counter() - start) * 10:.1f}us")
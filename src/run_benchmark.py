@@ -0,0 +1,274 @@
+import argparse
+import csv
+import json
+import os
+import re
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+import numpy as np
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+RUNS_DIR = os.path.join(BASE_DIR, 'runs')   # One timestamped directory per benchmark run
+SERVICE_NAME = 'web_app'
+BALANCER_NAME = 'web_lb'    # Publishes TARGET_PORT and spreads requests over web_app's tasks and promoted standbys
+NETWORK = 'pco_net'         # Attachable overlay shared by web_app, the balancer and standby containers
+IMAGE = 'pco-target:latest'
+TARGET_PORT = 8080
+LIGHT_MS, HEAVY_MS = 2.0, 50.0   # Per-request CPU cost of the target
+# Fixed scenario: a compressed day with a burst on top; identical for every agent
+SCENARIO = 'diurnal:low=20,high=120,period=300+spike:peak=150,at=150,width=20'
+DURATION = 300      # Seconds of traffic
+WARMUP = 65         # Seconds the logger and agent run before traffic starts (the agents' 60-sample window)
+AGENTS = {          # name -> (script, Prometheus /metrics port)
+    'reactive': ('reactive_agent.py', 9102),
+    'static_ai': ('static_ai_agent.py', 9103),
+    'orchestrator': ('orchestrator.py', 9101),
+    'policy_host': ('policy_host.py', 9104),   # Adaptive active, the others shadowed; decisions.csv in the run dir
+    'none': (None, None),   # Fixed single replica: the no-autoscaling baseline
+}
+SETTLE_TIMEOUT = 120  # Seconds to wait for the service to come back to one running replica between agents
+SUMMARY_COLUMNS = ['agent', 'requests', 'p50_ms', 'p99_ms', 'tokens_lost', 'lost_pct', 'replica_seconds',
+                   'peak_replicas', 'tick_mean_ms', 'tick_p99_ms', 'overruns']
+
+# --- Target service ---
+def wait_healthy(timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f'http://localhost:{TARGET_PORT}/health', timeout=1).read()
+            return True
+        except OSError:
+            time.sleep(0.5)
+    return False
+
+def ensure_network(client):
+    """ The attachable overlay: standalone standby containers can only join an overlay created attachable """
+    for network in client.networks.list(names=[NETWORK]):
+        if network.name == NETWORK:
+            return network
+    return client.networks.create(NETWORK, driver='overlay', attachable=True)
+
+def ensure_service(client, light_ms=LIGHT_MS, heavy_ms=HEAVY_MS, balanced=False):
+    """
+    Builds the target image if needed and (re)creates the web_app Swarm service at one replica,
+    publishing TARGET_PORT through the routing mesh. With `balanced` (agents run with --standby)
+    web_app instead runs in dnsrr endpoint mode on the attachable overlay behind the web_lb
+    balancer, so its name resolves to each task and to every standby container attached under
+    that alias; the routing mesh (and its VIP) would only ever reach the service's own tasks.
+    The balancer is an extra hop, so only compare runs made with the same routing.
+    """
+    import docker
+    try:
+        client.images.get(IMAGE)
+    except docker.errors.ImageNotFound:
+        print(f"Building {IMAGE} from Dockerfile.target...")
+        client.images.build(path=BASE_DIR, dockerfile='Dockerfile.target', tag=IMAGE, rm=True)
+    for service in client.services.list():
+        if service.name in (SERVICE_NAME, BALANCER_NAME):
+            service.remove()
+            time.sleep(2)  # Let the routing mesh release the published port
+    env = [f'TARGET_LIGHT_MS={light_ms:g}', f'TARGET_HEAVY_MS={heavy_ms:g}']
+    if not balanced:
+        client.services.create(IMAGE, name=SERVICE_NAME, env=env,
+                               endpoint_spec=docker.types.EndpointSpec(ports={TARGET_PORT: TARGET_PORT}),
+                               mode=docker.types.ServiceMode('replicated', replicas=1))
+        return settle_service(client)
+    ensure_network(client)
+    client.services.create(IMAGE, name=SERVICE_NAME, env=env,
+                           networks=[NETWORK], endpoint_spec=docker.types.EndpointSpec(mode='dnsrr'),
+                           mode=docker.types.ServiceMode('replicated', replicas=1))
+    client.services.create(IMAGE, ['python', 'balancer.py'], name=BALANCER_NAME, networks=[NETWORK],
+                           env=[f'BALANCER_UPSTREAM={SERVICE_NAME}', f'BALANCER_UPSTREAM_PORT={TARGET_PORT}'],
+                           endpoint_spec=docker.types.EndpointSpec(ports={TARGET_PORT: TARGET_PORT}),
+                           healthcheck=docker.types.Healthcheck(test=['NONE']),  # Its /health is web_app's, proxied
+                           mode=docker.types.ServiceMode('replicated', replicas=1))
+    return settle_service(client)
+
+def settle_service(client, replicas=1):
+    """ Scales back to `replicas` and waits until exactly that many tasks run, so every agent starts alike """
+    client.services.get(SERVICE_NAME).scale(replicas)
+    deadline = time.time() + SETTLE_TIMEOUT
+    while time.time() < deadline:
+        tasks = client.api.tasks(filters={'service': SERVICE_NAME, 'desired-state': 'running'})
+        if sum(t['Status']['State'] == 'running' for t in tasks) == replicas and wait_healthy(1):
+            return True
+        time.sleep(1)
+    print(f"   Warning: {SERVICE_NAME} did not settle at {replicas} replica(s)")
+    return False
+
+# --- Processes ---
+def launch(name, args, run_dir):
+    """ Starts a repo script with its output in <run_dir>/<name>.log; relative output files land in run_dir """
+    log = open(os.path.join(run_dir, f'{name}.log'), 'w')
+    env = dict(os.environ, PYTHONUNBUFFERED='1', TF_CPP_MIN_LOG_LEVEL='2')
+    proc = subprocess.Popen([sys.executable, *args], cwd=run_dir, stdout=log, stderr=subprocess.STDOUT, env=env)
+    proc.log = log
+    return proc
+
+def stop(proc, timeout=15):
+    """ Ctrl-C first, so the agents and the logger run their shutdown paths (state save, flush) """
+    if proc is None:
+        return
+    if proc.poll() is None:
+        proc.send_signal(signal.SIGINT)
+        try:
+            proc.wait(timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+    proc.log.close()
+
+def scrape(port, path):
+    try:
+        text = urllib.request.urlopen(f'http://localhost:{port}/metrics', timeout=2).read().decode()
+    except OSError:
+        return None
+    with open(path, 'w') as f:
+        f.write(text)
+    return text
+
+# --- Summary ---
+def tick_overhead(metrics_text):
+    """ (mean ms, p99 bucket bound ms, overruns) of controller_tick_duration_seconds from a /metrics scrape """
+    if not metrics_text:
+        return None, None, None
+    values = {}
+    for line in metrics_text.splitlines():
+        match = re.match(r'(\w+)(?:\{(.*)\})? (\S+)$', line)
+        if match:
+            le = re.search(r'le="([^"]+)"', match.group(2) or '')
+            values[(match.group(1), le.group(1) if le else None)] = float(match.group(3))
+    count = values.get(('controller_tick_duration_seconds_count', None), 0)
+    if not count:
+        return None, None, None
+    mean_ms = values[('controller_tick_duration_seconds_sum', None)] / count * 1000
+    buckets = sorted((float(le), n) for (name, le), n in values.items()
+                     if name == 'controller_tick_duration_seconds_bucket' and le != '+Inf')
+    p99_ms = next((le * 1000 for le, n in buckets if n >= 0.99 * count), float('inf'))
+    return mean_ms, p99_ms, values.get(('controller_overruns_total', None), 0)
+
+def replica_usage(run_dir, since, until):
+    """ (replica-seconds, peak replicas) from the logger's system_metrics.csv between two elapsed offsets """
+    path = os.path.join(run_dir, 'system_metrics.csv')
+    if not os.path.exists(path):
+        return None, None
+    with open(path) as f:
+        rows = [(float(r['Time']), int(float(r['Replicas']))) for r in csv.DictReader(f)]
+    rows = [(t, n) for t, n in rows if since <= t < until]
+    if len(rows) < 2:
+        return None, None
+    times, replicas = np.array(rows).T
+    interval = float(np.median(np.diff(times))) or 1.0
+    return float(replicas.sum() * interval), int(replicas.max())
+
+def summarize(agent, run_dir, logger_start, traffic_start, traffic_end, metrics_text, local, duration):
+    with open(os.path.join(run_dir, 'traffic_summary.json')) as f:
+        traffic = json.load(f)
+    if local:
+        replica_seconds, peak = float(duration), 1
+    else:
+        replica_seconds, peak = replica_usage(run_dir, traffic_start - logger_start, traffic_end - logger_start)
+    tick_mean, tick_p99, overruns = tick_overhead(metrics_text)
+    requests = traffic['requests']
+    return {'agent': agent, 'requests': requests, 'p50_ms': traffic['p50_ms'], 'p99_ms': traffic['p99_ms'],
+            'tokens_lost': traffic['lost'], 'lost_pct': 100.0 * traffic['lost'] / requests if requests else 0.0,
+            'replica_seconds': replica_seconds, 'peak_replicas': peak,
+            'tick_mean_ms': tick_mean, 'tick_p99_ms': tick_p99, 'overruns': overruns}
+
+def fmt(value, spec):
+    return format('-', re.match(r'[<>^]?\d*', spec).group()) if value is None else format(value, spec)
+
+def print_table(rows):
+    print(f"\n{'Agent':<13} {'Requests':>9} {'p50 (ms)':>9} {'p99 (ms)':>9} {'Lost':>7} {'Lost %':>7} "
+          f"{'Replica-s':>10} {'Peak':>5} {'Tick mean (ms)':>15} {'Tick p99 (ms)':>14} {'Overruns':>9}")
+    for r in rows:
+        print(f"{r['agent']:<13} {r['requests']:>9,} {r['p50_ms']:>9.1f} {r['p99_ms']:>9.1f} {r['tokens_lost']:>7,} "
+              f"{r['lost_pct']:>7.2f} {fmt(r['replica_seconds'], '>10,.0f')} {fmt(r['peak_replicas'], '>5')} "
+              f"{fmt(r['tick_mean_ms'], '>15.2f')} {fmt(r['tick_p99_ms'], '>14g')} {fmt(r['overruns'], '>9.0f')}")
+
+# --- Runner ---
+def run_agent(agent, out_dir, scenario, duration, warmup, client=None, agent_args=()):
+    """ One scenario under one agent: target at one replica, logger + agent warm up, traffic, then collect """
+    run_dir = os.path.join(out_dir, agent)
+    os.makedirs(run_dir, exist_ok=True)
+    script, metrics_port = AGENTS[agent]
+    local = client is None
+    target = logger = controller = None
+    print(f"\n--- {agent}: {scenario} for {duration}s ---")
+    try:
+        if local:
+            target = launch('target', [os.path.join(SRC_DIR, 'target_service.py'), '--port', str(TARGET_PORT),
+                                       '--light-ms', str(LIGHT_MS), '--heavy-ms', str(HEAVY_MS)], run_dir)
+            if not wait_healthy():
+                raise RuntimeError(f"target service did not come up; see {run_dir}/target.log")
+        else:
+            settle_service(client)
+            logger = launch('logger', [os.path.join(SRC_DIR, 'logger.py')], run_dir)
+            if script:
+                controller = launch(agent, [os.path.join(SRC_DIR, script), *agent_args], run_dir)
+        logger_start = time.time()
+        warmup = warmup if controller else min(warmup, 5)  # Nothing to warm up without an agent
+        print(f"Warming up for {warmup}s...")
+        time.sleep(warmup)
+
+        traffic_start = time.time()
+        traffic = launch('traffic', [os.path.join(SRC_DIR, 'traffic_bot.py'), '--profile', scenario,
+                                     '--duration', str(duration), '--summary', 'traffic_summary.json'], run_dir)
+        traffic.wait()
+        traffic.log.close()
+        traffic_end = time.time()
+        metrics_text = scrape(metrics_port, os.path.join(run_dir, 'agent_metrics.prom')) if controller else None
+    finally:
+        for proc in (controller, logger, target):
+            stop(proc)
+    return summarize(agent, run_dir, logger_start, traffic_start, traffic_end, metrics_text, local, duration)
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs the target service, logger, traffic bot and an agent for a fixed scenario "
+                                                 "and summarises p99 latency, tokens lost, replica-seconds and tick overhead")
+    parser.add_argument('--agents', default='reactive,orchestrator',
+                        help=f"comma-separated, run one after another: {', '.join(AGENTS)}")
+    parser.add_argument('--scenario', default=SCENARIO, help="traffic_bot load profile (see load_profiles.py)")
+    parser.add_argument('--duration', type=int, default=DURATION, help="seconds of traffic per agent")
+    parser.add_argument('--warmup', type=int, default=WARMUP, help="seconds the agent observes before traffic starts")
+    parser.add_argument('--local', action='store_true',
+                        help="no Docker: one local target process and no agent (checks the harness and the generator)")
+    parser.add_argument('--agent-args', default='', help="extra arguments for every agent, e.g. '--standby 2'")
+    args = parser.parse_args()
+
+    agents = ['none'] if args.local else args.agents.split(',')
+    for agent in agents:
+        if agent not in AGENTS:
+            raise SystemExit(f"Unknown agent {agent!r}; choose from {', '.join(AGENTS)}")
+    # Standbys are standalone containers the routing mesh never reaches: only then route through web_lb
+    balanced = any(a.split('=')[0] == '--standby' for a in args.agent_args.split())
+    out_dir = os.path.join(RUNS_DIR, time.strftime('%Y%m%d_%H%M%S'))
+    os.makedirs(out_dir)
+    with open(os.path.join(out_dir, 'scenario.json'), 'w') as f:
+        json.dump({'agents': agents, 'scenario': args.scenario, 'duration': args.duration, 'warmup': args.warmup,
+                   'light_ms': LIGHT_MS, 'heavy_ms': HEAVY_MS, 'local': args.local,
+                   'routing': 'balancer' if balanced else 'mesh'}, f, indent=1)
+
+    client = None
+    if not args.local:
+        import docker
+        client = docker.from_env()
+        ensure_service(client, balanced=balanced)
+
+    rows = []
+    for agent in agents:
+        rows.append(run_agent(agent, out_dir, args.scenario, args.duration, args.warmup, client, args.agent_args.split()))
+        with open(os.path.join(out_dir, 'summary.csv'), 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+    print_table(rows)
+    print(f"\nRun directory: {out_dir}")
+
+if __name__ == "__main__":
+    main()
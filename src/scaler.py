@@ -0,0 +1,143 @@
+import concurrent.futures
+import threading
+import time
+from collections import deque
+
+# --- CONFIGURATION ---
+WATCH_INTERVAL = 0.5  # Seconds between task-state polls while a scale operation converges
+SCALE_TIMEOUT = 300   # Give up tracking an operation after this long
+READY_BUCKETS = (1, 2, 5, 10, 15, 20, 30, 45, 60, 90, 120, 300)
+COLD_START = 30.0        # Assumed scale-up-to-ready seconds until one has been measured
+COLD_START_SAMPLES = 20  # Recent scale-ups the cold-start estimate is taken from
+
+class AsyncScaler:
+    """
+    Issues Swarm scale calls from a worker pool so the control loop never waits on the daemon,
+    then watches task states until the service has as many running tasks as requested.
+    Scale-up-to-ready latency is recorded in `metrics` when a registry is given. With a
+    ServiceCache, replica counts come from memory and the cache is refreshed after each call.
+    """
+
+    def __init__(self, client, metrics=None, workers=4, cache=None):
+        self.client = client
+        self.cache = cache
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix='scale')
+        self._lock = threading.Lock()
+        self._desired = {}   # service -> last requested (or observed) replica count
+        self._pending = {}   # service -> (target, direction, issued_at)
+        self._running = {}   # service -> running task count from the last watch pass
+        self._cold_starts = deque(maxlen=COLD_START_SAMPLES)
+        self._stop = threading.Event()
+        self.ready_latency = self.failures = None
+        if metrics is not None:
+            self.ready_latency = metrics.histogram('controller_scale_up_ready_seconds',
+                                                   "Scale-up request to all requested tasks running", buckets=READY_BUCKETS)
+            self.failures = metrics.counter('controller_scale_failures_total', "Scale calls that raised")
+        threading.Thread(target=self._watch, name='scale-watch', daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        self._pool.shutdown(wait=False)
+
+    def desired(self, service_name):
+        """
+        Replica count we last asked for. Outside a pending operation the cache (when given) is
+        the source of truth, so scaling done by hand is picked up; otherwise the spec is read once.
+        None while the service is not in Swarm; that is never remembered, so it is looked up again.
+        """
+        with self._lock:
+            if service_name in self._pending or (self.cache is None and service_name in self._desired):
+                return self._desired[service_name]
+        if self.cache is not None:
+            replicas = self.cache.replicas(service_name)
+        else:
+            replicas = self.client.services.get(service_name).attrs['Spec']['Mode']['Replicated']['Replicas']
+        with self._lock:
+            if service_name in self._pending:
+                return self._desired[service_name]
+            if replicas is not None:
+                self._desired[service_name] = replicas
+            return replicas
+
+    def cold_start(self):
+        """ Measured scale-up-to-ready seconds (90th percentile of recent scale-ups), COLD_START before any """
+        with self._lock:
+            samples = sorted(self._cold_starts)
+        return samples[int(0.9 * (len(samples) - 1))] if samples else COLD_START
+
+    def converging(self, service_name):
+        with self._lock:
+            return service_name in self._pending
+
+    def running(self, service_name):
+        with self._lock:
+            return self._running.get(service_name)
+
+    def scale(self, service_name, target):
+        """ Queues a scale to `target` and returns immediately """
+        current = self.desired(service_name)
+        if current is None or target == current:
+            return None
+        direction = 'up' if target > current else 'down'
+        with self._lock:
+            self._desired[service_name] = target
+            # Jumping further in the same direction keeps the original start time for the latency metric
+            _, prev_direction, issued_at = self._pending.get(service_name, (None, None, time.monotonic()))
+            if prev_direction != direction:
+                issued_at = time.monotonic()
+            self._pending[service_name] = (target, direction, issued_at)
+        return self._pool.submit(self._do_scale, service_name, target)
+
+    def _do_scale(self, service_name, target):
+        try:
+            self._count('services.get')
+            service = self.client.services.get(service_name)
+            self._count('services.update')
+            service.scale(target)
+            if self.cache is not None:
+                self.cache.refresh(service_name)
+        except Exception as e:
+            print(f"\n   [SCALER] Scaling {service_name} to {target} failed: {e}")
+            if self.failures is not None:
+                self.failures.inc()
+            with self._lock:
+                self._pending.pop(service_name, None)
+                self._desired.pop(service_name, None)  # Re-read the spec next time
+            raise
+
+    def _count(self, call):
+        if self.cache is not None:
+            self.cache.api_calls.hit(call)
+
+    def _running_tasks(self, service_name):
+        self._count('tasks')
+        tasks = self.client.api.tasks(filters={'service': service_name, 'desired-state': 'running'})
+        return sum(1 for t in tasks if t.get('Status', {}).get('State') == 'running')
+
+    def _watch(self):
+        while not self._stop.wait(WATCH_INTERVAL):
+            with self._lock:
+                pending = dict(self._pending)
+            for service_name, (target, direction, issued_at) in pending.items():
+                try:
+                    running = self._running_tasks(service_name)
+                except Exception:
+                    continue
+                elapsed = time.monotonic() - issued_at
+                with self._lock:
+                    self._running[service_name] = running
+                    # A newer request replaced this one while we were polling
+                    if self._pending.get(service_name, (None,))[0] != target:
+                        continue
+                    done = running >= target if direction == 'up' else running <= target
+                    if done or elapsed > SCALE_TIMEOUT:
+                        self._pending.pop(service_name)
+                if done:
+                    print(f"\n   [SCALER] {service_name}: {running} replicas running {elapsed:.1f}s after scale-{direction}")
+                    if direction == 'up':
+                        with self._lock:
+                            self._cold_starts.append(elapsed)
+                        if self.ready_latency is not None:
+                            self.ready_latency.observe(elapsed)
+                elif elapsed > SCALE_TIMEOUT:
+                    print(f"\n   [SCALER] {service_name}: gave up waiting for {target} replicas ({running} running)")
@@ -0,0 +1,186 @@
+import threading
+import time
+from collections import deque
+
+# --- CONFIGURATION ---
+POLL_INTERVAL = 5.0   # Seconds between full polls while the event stream is down (first retry)
+MAX_BACKOFF = 60.0    # Polling interval doubles on every failed reconnect up to this
+RATE_WINDOW = 60.0    # Seconds covered by ApiCallCounter.per_minute()
+SERVICE_LABEL = 'com.docker.swarm.service.name'
+
+class ApiCallCounter:
+    """ Counts Docker daemon API calls by kind; exported as docker_api_calls_total when a registry is given """
+
+    def __init__(self, metrics=None):
+        self._lock = threading.Lock()
+        self._recent = deque()  # monotonic timestamps inside RATE_WINDOW
+        self._metrics = metrics
+        self.total = 0
+
+    def hit(self, call):
+        now = time.monotonic()
+        with self._lock:
+            self.total += 1
+            self._recent.append(now)
+            while self._recent and now - self._recent[0] > RATE_WINDOW:
+                self._recent.popleft()
+        if self._metrics is not None:
+            self._metrics.counter('docker_api_calls_total', "Docker daemon API calls", {'call': call}).inc()
+
+    def per_minute(self):
+        now = time.monotonic()
+        with self._lock:
+            while self._recent and now - self._recent[0] > RATE_WINDOW:
+                self._recent.popleft()
+            return len(self._recent) * 60.0 / RATE_WINDOW
+
+class ServiceCache:
+    """
+    In-memory view of Swarm services: desired replicas, running tasks and labels.
+    Populated with one list call, then kept current from the Docker events stream
+    (service create/update/remove, container start/die of service tasks). If the stream
+    drops, every tracked service is polled with exponential backoff until it reconnects.
+    """
+
+    def __init__(self, client, metrics=None):
+        self.client = client
+        self.api_calls = ApiCallCounter(metrics)
+        self.mode = 'starting'  # 'events' or 'polling'
+        self._lock = threading.Lock()
+        self._services = {}  # name -> {'replicas', 'running', 'labels', 'updated'}
+        self._misses = {}    # name -> monotonic time of the last failed lookup
+        self._stop = threading.Event()
+        self._stream = None
+
+    def start(self):
+        try:
+            self._poll_all()
+        except Exception as e:
+            print(f"[SERVICE CACHE] Initial poll failed: {e}")
+            self.mode = 'polling'
+        threading.Thread(target=self._run, name='service-cache', daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._stream is not None:
+            self._stream.close()
+
+    # --- Reads (memory only, unless the service has never been seen) ---
+    def replicas(self, name):
+        """ Desired replica count from the service spec """
+        state = self._get(name)
+        return state['replicas'] if state else None
+
+    def running(self, name):
+        """ Tasks currently in the running state """
+        state = self._get(name)
+        return state['running'] if state else None
+
+    def names(self, label=None):
+        """ Known service names, optionally filtered by a key or key=value label selector """
+        key, _, value = (label or '').partition('=')
+        with self._lock:
+            return sorted(n for n, s in self._services.items()
+                          if not label or (key in s['labels'] and (not value or s['labels'][key] == value)))
+
+    def _get(self, name):
+        with self._lock:
+            state = self._services.get(name)
+        if state is None:
+            # Unknown services are looked up at most once per POLL_INTERVAL
+            if time.monotonic() - self._misses.get(name, -POLL_INTERVAL) < POLL_INTERVAL:
+                return None
+            try:
+                self.refresh(name)
+            except Exception:
+                self._misses[name] = time.monotonic()
+                return None
+            with self._lock:
+                state = self._services.get(name)
+        return state
+
+    # --- Updates ---
+    def refresh(self, name):
+        """ Re-reads one service from the daemon (after our own scale calls, or on an event) """
+        self.api_calls.hit('services.get')
+        service = self.client.services.get(name)
+        self._store(service.name, service.attrs)
+        self.refresh_running(service.name)
+
+    def refresh_running(self, name):
+        self.api_calls.hit('tasks')
+        tasks = self.client.api.tasks(filters={'service': name, 'desired-state': 'running'})
+        running = sum(1 for t in tasks if t.get('Status', {}).get('State') == 'running')
+        with self._lock:
+            if name in self._services:
+                self._services[name]['running'] = running
+                self._services[name]['updated'] = time.time()
+
+    def _store(self, name, attrs):
+        spec = attrs.get('Spec', {})
+        replicas = spec.get('Mode', {}).get('Replicated', {}).get('Replicas')
+        with self._lock:
+            previous = self._services.get(name, {})
+            self._services[name] = {'replicas': replicas, 'running': previous.get('running'),
+                                    'labels': spec.get('Labels') or {}, 'updated': time.time()}
+
+    def _poll_all(self):
+        self.api_calls.hit('services.list')
+        services = self.client.services.list()
+        for service in services:
+            self._store(service.name, service.attrs)
+        self.api_calls.hit('tasks')
+        running = {}
+        for task in self.client.api.tasks(filters={'desired-state': 'running'}):
+            if task.get('Status', {}).get('State') == 'running':
+                running[task['ServiceID']] = running.get(task['ServiceID'], 0) + 1
+        with self._lock:
+            for service in services:
+                self._services[service.name]['running'] = running.get(service.id, 0)
+            for name in set(self._services) - {s.name for s in services}:
+                del self._services[name]
+
+    def _handle(self, event):
+        attributes = event.get('Actor', {}).get('Attributes', {})
+        if event.get('Type') == 'service':
+            name = attributes.get('name')
+            if event.get('Action') == 'remove':
+                with self._lock:
+                    self._services.pop(name, None)
+            elif name:
+                self.refresh(name)
+        elif event.get('Type') == 'container' and event.get('Action') in ('start', 'die'):
+            name = attributes.get(SERVICE_LABEL)
+            if name:
+                self.refresh_running(name)
+
+    def _run(self):
+        backoff = POLL_INTERVAL
+        while not self._stop.is_set():
+            try:
+                self.api_calls.hit('events')
+                self._stream = self.client.events(decode=True, filters={'type': ['service', 'container']})
+                if self.mode == 'polling':
+                    self._poll_all()  # Catch up on whatever happened while the stream was down
+                self.mode = 'events'
+                backoff = POLL_INTERVAL
+                for event in self._stream:
+                    try:
+                        self._handle(event)
+                    except Exception as e:  # e.g. the service was removed before we could read it
+                        print(f"\n[SERVICE CACHE] Could not apply {event.get('Type')} event: {e}")
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                print(f"\n[SERVICE CACHE] Event stream lost ({e}); polling every {backoff:.0f}s")
+            if self._stop.is_set():
+                break
+            self.mode = 'polling'
+            if self._stop.wait(backoff):
+                break
+            try:
+                self._poll_all()
+            except Exception as e:
+                print(f"\n[SERVICE CACHE] Poll failed: {e}")
+            backoff = min(backoff * 2, MAX_BACKOFF)
@@ -0,0 +1,198 @@
+import argparse
+import concurrent.futures
+import glob
+import os
+import time
+from collections import deque
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from policies import MAX_REPLICAS, POLICIES, WINDOW_SIZE, horizon_forecast, scale_decision
+
+# --- CONFIGURATION ---
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RAW_DIR = os.path.join(BASE_DIR, 'data', 'raw')
+MODEL_PATH = os.path.join(BASE_DIR, 'models', 'orchestrator_brain.h5')
+
+TICK_SECONDS = 1.0     # One trace sample == one control-loop tick
+BOOT_DELAY = 30        # Ticks before a new replica serves traffic
+CAPACITY = 1.0         # Load one replica absorbs at 100% CPU
+LOAD_SCALE = 4.0       # Trace utilisation 1.0 == this many replicas' worth of load
+SLA_UTIL = 1.0         # A tick violates the SLA when load exceeds this share of ready capacity
+PREDICT_CHUNK = 4096   # Windows per batched predict call
+LEAD_CAP = 120         # Lead/lag ticks are clipped here: capacity provisioned longer ago just counts as early
+
+_model = None  # One model per worker process
+
+def load_trace(path):
+    """ CPU utilisation (0.0 - 1.0) from a Bitbrains trace or a recorded system_metrics.csv run """
+    with open(path) as f:
+        header = f.readline()
+    if 'CPU_Percent' in header:
+        return (pd.read_csv(path)['CPU_Percent'].to_numpy(dtype=np.float32) / 100.0).clip(0.0, 1.0)
+    from data_loader_universal import parse_trace
+    util = parse_trace(path)
+    if util is None:
+        raise ValueError(f"{path} has no CPU usage/capacity columns")
+    return util
+
+def forecast_trace(model, util):
+    """
+    Forecast for every tick of the trace in a handful of batched predict calls, one column per
+    model horizon. The model sees the replica-independent utilisation series, so forecasts do
+    not depend on the policy's actions and are shared by every policy. forecast[t] uses samples t-59..t.
+    """
+    forecast = np.full((len(util), len(getattr(model, 'horizons', (1,)))), np.nan, dtype=np.float32)
+    if len(util) < WINDOW_SIZE:
+        return forecast
+    windows = sliding_window_view(util.astype(np.float32), WINDOW_SIZE)
+    for start in range(0, len(windows), PREDICT_CHUNK):
+        batch = np.ascontiguousarray(windows[start:start + PREDICT_CHUNK])[..., None]
+        forecast[WINDOW_SIZE - 1 + start:WINDOW_SIZE - 1 + start + len(batch)] = model.predict(batch, verbose=0)
+    return forecast
+
+def scale_up_leads(demand, provisioned, per_replica, first=WINDOW_SIZE):
+    """
+    For every rise in the replicas the load needs: ticks between the scale-up that provisioned
+    them and the rise. Positive when requested ahead of the load (>= boot delay means already
+    serving), negative when late. Rises before tick `first` (policies still warming up) and
+    rises that were provisioned from the start are left out.
+    """
+    need = np.minimum(np.ceil(demand / per_replica), MAX_REPLICAS).astype(int)
+    leads = []
+    for t in np.nonzero(need[1:] > need[:-1])[0] + 1:
+        if t < first:
+            continue
+        if provisioned[t] >= need[t]:
+            short = np.nonzero(provisioned[:t + 1] < need[t])[0]
+            if len(short):
+                leads.append(min(t - short[-1] - 1, LEAD_CAP))
+        else:
+            late = np.nonzero(provisioned[t:t + LEAD_CAP] >= need[t])[0]
+            leads.append(-late[0] if len(late) else -LEAD_CAP)
+    return np.array(leads, dtype=np.int64)
+
+def simulate(policy, util, forecast, boot_delay=BOOT_DELAY, capacity=CAPACITY, load_scale=LOAD_SCALE,
+             sla_util=SLA_UTIL, initial_replicas=1):
+    """ Replays one trace through one policy against a simulated service """
+    demand = util * load_scale
+    ready, booting = initial_replicas, deque()  # booting holds the tick each pending replica becomes ready
+    violations = replica_ticks = events = 0
+    provisioned = np.empty(len(demand), dtype=np.int64)  # Ready + booting replicas, after the previous tick's decision
+
+    for t in range(len(demand)):
+        while booting and booting[0] <= t:
+            booting.popleft()
+            ready += 1
+
+        cpu = min(1.0, demand[t] / (ready * capacity))
+        violations += demand[t] > sla_util * ready * capacity
+        provisioned[t] = ready + len(booting)
+        replica_ticks += provisioned[t]
+
+        policy.observe(cpu)
+        if not policy.ready:
+            continue
+
+        # As in the live agents: decide on the replicas serving (those carrying the load the CPU is
+        # averaged over) and compare the target with the desired count, booting replicas included
+        serving, desired = ready, ready + len(booting)
+        prediction = forecast[t] * load_scale / (serving * capacity) if policy.uses_model else None
+        if prediction is not None and np.isnan(prediction):
+            continue
+
+        request = scale_decision(policy.decide(prediction, serving), desired, converging=bool(booting))
+        if request is None:
+            continue
+        events += 1
+        if request > desired:
+            booting.extend([t + boot_delay] * (request - desired))
+        else:
+            for _ in range(desired - request):
+                if booting:
+                    booting.pop()  # Cancel the newest pending replica first
+                else:
+                    ready -= 1
+
+    leads = scale_up_leads(demand, provisioned, sla_util * capacity)
+    return {
+        'sla_violation_s': violations * TICK_SECONDS,
+        'replica_s': replica_ticks * TICK_SECONDS,
+        'scale_events': events,
+        'rises': len(leads),
+        'lead_s': leads.sum() * TICK_SECONDS,            # Divide by rises for the mean lead
+        'rises_covered': int((leads >= boot_delay).sum()),  # Replicas already serving when the load rose
+    }
+
+def run_trace(path, policy_names, boot_delay, capacity, load_scale, sla_util, model_path=MODEL_PATH, quantile=None):
+    """
+    Worker: one forecast pass for the trace, then every policy replayed against it. As in
+    policy_host, the adaptive policy gets the multi-horizon forecasts collapsed over the horizons
+    reaching the boot delay and the static one the t+1 column.
+    """
+    global _model
+    if _model is None and any(POLICIES[p].uses_model for p in policy_names):
+        from numpy_brain import load_brain
+        _model = load_brain(model_path)
+
+    util = load_trace(path)
+    start = time.perf_counter()
+    raw = collapsed = None
+    if _model is not None:
+        raw = forecast_trace(_model, util)
+        collapsed = horizon_forecast(raw, _model.horizons, boot_delay, quantile)
+
+    rows = []
+    for name in policy_names:
+        forecast = collapsed if name == 'adaptive' or raw is None else raw[:, 0]
+        result = simulate(POLICIES[name](), util, forecast, boot_delay, capacity, load_scale, sla_util)
+        rows.append(dict(policy=name, trace=os.path.basename(path), ticks=len(util), **result))
+    wall = time.perf_counter() - start
+    for row in rows:
+        row['wall_s'] = wall
+    return rows
+
+def run(traces, policy_names, boot_delay=BOOT_DELAY, capacity=CAPACITY, load_scale=LOAD_SCALE,
+        sla_util=SLA_UTIL, workers=None, model_path=MODEL_PATH, quantile=None):
+    """ Every trace in its own process; returns one row per (trace, policy) """
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_trace, t, policy_names, boot_delay, capacity, load_scale, sla_util, model_path, quantile)
+                   for t in traces]
+        return pd.DataFrame([row for f in futures for row in f.result()])
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline trace-replay comparison of scaling policies")
+    parser.add_argument('traces', nargs='*', help="Bitbrains traces or system_metrics.csv runs (default: data/raw/*.csv)")
+    parser.add_argument('--policies', default=','.join(POLICIES), help="comma-separated subset of " + ', '.join(POLICIES))
+    parser.add_argument('--boot-delay', type=int, default=BOOT_DELAY, help="ticks before a new replica is ready")
+    parser.add_argument('--capacity', type=float, default=CAPACITY, help="load one replica absorbs")
+    parser.add_argument('--load-scale', type=float, default=LOAD_SCALE, help="replicas' worth of load at 100%% trace utilisation")
+    parser.add_argument('--sla-util', type=float, default=SLA_UTIL)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--model', default=MODEL_PATH, help="forecaster .h5 (single- or multi-horizon)")
+    parser.add_argument('--quantile', type=float, default=None, help="quantile over the boot-delay horizons (default: max)")
+    parser.add_argument('--out', help="write per-trace results to this CSV")
+    args = parser.parse_args()
+
+    traces = args.traces or sorted(glob.glob(os.path.join(RAW_DIR, '*.csv')))
+    policy_names = args.policies.split(',')
+    print(f"--- TRACE-REPLAY SIMULATOR: {len(traces)} traces x {len(policy_names)} policies ---")
+
+    start = time.perf_counter()
+    results = run(traces, policy_names, args.boot_delay, args.capacity, args.load_scale, args.sla_util, args.workers,
+                  args.model, args.quantile)
+    wall = time.perf_counter() - start
+
+    if args.out:
+        results.to_csv(args.out, index=False)
+        print(f"Per-trace results saved to {args.out}")
+
+    summary = results.groupby('policy', sort=False)[['sla_violation_s', 'replica_s', 'scale_events', 'rises', 'lead_s', 'rises_covered']].sum()
+    summary['mean_lead_s'] = (summary.pop('lead_s') / summary['rises']).round(1)
+    summary['covered_pct'] = (100 * summary.pop('rises_covered') / summary['rises']).round(1)
+    print(summary.to_string())
+    simulated = results.groupby('trace')['ticks'].first().sum() * TICK_SECONDS * len(policy_names)
+    print(f"\nSimulated {simulated:,.0f}s of policy time in {wall:.1f}s wall ({simulated / wall:,.0f}x real time)")
+
+if __name__ == "__main__":
+    main()
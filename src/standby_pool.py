@@ -0,0 +1,197 @@
+import os
+import socket
+import threading
+import time
+from collections import deque
+
+# --- CONFIGURATION ---
+POOL_LABEL = 'pco.standby'  # Label on standby containers; the value is the service they back
+OWNER_LABEL = 'pco.standby.owner'  # The controller that created them; only its own leftovers are removed
+MIN_POOL = 1                # Warm containers kept even while the forecast stays low
+MAX_POOL = 4
+WARMUP = 5.0                # Seconds a new container runs (or until its healthcheck passes) before it is paused
+SHRINK_AFTER = 120          # Consecutive low-forecast ticks before the pool gives back one container
+REFILL_INTERVAL = 1.0       # Seconds between background sizing / hand-off passes
+HANDOFF_TIMEOUT = 300       # Retire a promoted container after this long even if its replacement never ran
+
+class StandbyPool:
+    """
+    Pre-created, paused containers of one Swarm service's image, attached to the service's
+    network under the service name. promote() unpauses them, which takes milliseconds instead of
+    a task's full create-and-boot, so capacity arrives as soon as a spike is predicted. The
+    service is still scaled as usual; each promoted container is retired once the service has
+    as many running tasks as that scale-up asked for. Creating, warming, pausing and retiring
+    containers all happen on a background thread, so the control loop never waits on them.
+
+    Standalone containers never join the Swarm ingress routing mesh or a service VIP, so the
+    service must sit on an attachable overlay network in dnsrr endpoint mode behind a balancer
+    that resolves the service name per refresh and probes /health (balancer.py): the name then
+    resolves to the tasks and to these containers alike, and a paused standby gets no traffic
+    until it is unpaused. run_benchmark.ensure_service sets the service up that way.
+
+    Standbys carry an owner label (host plus `owner`); on start only that owner's leftovers are
+    removed, so a controller passes its stable name to clean up after its own restart without
+    touching the standbys another controller keeps for the same service. The default owner is
+    the process id, which never matches a previous run.
+    """
+
+    def __init__(self, client, service_name, scaler, min_size=MIN_POOL, max_size=MAX_POOL,
+                 warmup=WARMUP, api_calls=None, owner=None):
+        self.client = client
+        self.service_name = service_name
+        self.owner = f"{socket.gethostname()}-{owner or os.getpid()}"
+        self.scaler = scaler
+        self.min_size, self.max_size = min_size, max_size
+        self.warmup = warmup
+        self.api_calls = api_calls
+        self.target = min_size
+        self.promotions = 0
+        self._lock = threading.Lock()
+        self._standby = deque()  # Paused containers, oldest first
+        self._promoted = []      # (container, replicas the service must reach, promoted_at)
+        self._low_ticks = 0
+        self._spec = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"standby-{service_name}", daemon=True)
+
+    def start(self):
+        self._remove_leftovers()
+        self._thread.start()
+        return self
+
+    def stop(self, remove=True):
+        self._stop.set()
+        self._thread.join(timeout=5)
+        if remove:
+            with self._lock:
+                containers = list(self._standby) + [c for c, _, _ in self._promoted]
+                self._standby.clear()
+                self._promoted.clear()
+            for container in containers:
+                self._remove(container)
+
+    def size(self):
+        with self._lock:
+            return len(self._standby)
+
+    def follow(self, extra_replicas):
+        """
+        Sizes the pool from the forecast: `extra_replicas` is how many more replicas the longest
+        forecast horizon needs than are running now. Growth is immediate; shrinking waits until
+        the forecast has stayed below the pool for SHRINK_AFTER ticks, then drops one at a time.
+        """
+        wanted = min(max(int(extra_replicas), self.min_size), self.max_size)
+        with self._lock:
+            if wanted >= self.target:
+                self.target, self._low_ticks = wanted, 0
+            else:
+                self._low_ticks += 1
+                if self._low_ticks >= SHRINK_AFTER:
+                    self.target, self._low_ticks = self.target - 1, 0
+
+    def promote(self, count, target_replicas):
+        """
+        Puts up to `count` warm containers into service right away; returns how many. Call it
+        right after scaling the service to `target_replicas`: these containers retire once that
+        scale-up has converged.
+        """
+        with self._lock:
+            taken = [self._standby.popleft() for _ in range(min(count, len(self._standby)))]
+        promoted = 0  # One short unpause call per container; no create or boot on this path
+        for container in taken:
+            try:
+                self._count('containers.unpause')
+                container.unpause()
+            except Exception as e:
+                print(f"\n   [STANDBY] Could not promote {container.name}: {e}")
+                self._remove(container)
+                continue
+            promoted += 1
+            with self._lock:
+                self._promoted.append((container, target_replicas, time.monotonic()))
+                self.promotions += 1
+        return promoted
+
+    # --- Background work ---
+    def _count(self, call):
+        if self.api_calls is not None:
+            self.api_calls.hit(call)
+
+    def _service_spec(self):
+        if self._spec is None:
+            self._count('services.get')
+            spec = self.client.services.get(self.service_name).attrs['Spec']['TaskTemplate']
+            container = spec['ContainerSpec']
+            self._spec = {'image': container['Image'].split('@')[0], 'env': container.get('Env') or [],
+                          'networks': [n['Target'] for n in spec.get('Networks') or []]}
+            if not self._spec['networks']:
+                print(f"\n   [STANDBY] {self.service_name} has no overlay network: promoted standbys will get no traffic")
+        return self._spec
+
+    def _create(self):
+        """ One warm standby: started, given WARMUP seconds (or a passing healthcheck) to boot, then paused """
+        spec = self._service_spec()
+        self._count('containers.run')
+        container = self.client.containers.run(spec['image'], detach=True, environment=spec['env'],
+                                               labels={POOL_LABEL: self.service_name, OWNER_LABEL: self.owner})
+        for network in spec['networks']:
+            self._count('networks.connect')
+            self.client.networks.get(network).connect(container, aliases=[self.service_name])
+        deadline = time.monotonic() + self.warmup
+        while time.monotonic() < deadline and not self._stop.is_set():
+            self._count('containers.get')
+            container.reload()
+            if container.attrs.get('State', {}).get('Health', {}).get('Status') == 'healthy':
+                break
+            time.sleep(min(0.5, self.warmup))
+        self._count('containers.pause')
+        container.pause()
+        return container
+
+    def _remove(self, container):
+        try:
+            self._count('containers.remove')
+            container.remove(force=True)
+        except Exception as e:
+            print(f"\n   [STANDBY] Could not remove {getattr(container, 'name', container)}: {e}")
+
+    def _remove_leftovers(self):
+        """ Standbys of this owner's previous run would otherwise keep memory forever """
+        try:
+            self._count('containers.list')
+            labels = [f"{POOL_LABEL}={self.service_name}", f"{OWNER_LABEL}={self.owner}"]
+            for container in self.client.containers.list(all=True, filters={'label': labels}):
+                self._remove(container)
+        except Exception as e:
+            print(f"\n   [STANDBY] Could not list old standbys: {e}")
+
+    def _handoff(self):
+        """ Retires promoted containers whose replacement tasks are running """
+        settled = not self.scaler.converging(self.service_name)
+        running = self.scaler.running(self.service_name)
+        desired = self.scaler.desired(self.service_name)  # None while Swarm does not report the service: not settled
+        now = time.monotonic()
+        with self._lock:
+            # Replacement running, a later scale-down superseded the scale-up, or we gave up waiting
+            done = [p for p in self._promoted
+                    if (settled and running is not None and running >= p[1]) or (desired is not None and desired < p[1])
+                    or now - p[2] > HANDOFF_TIMEOUT]
+            self._promoted = [p for p in self._promoted if p not in done]
+        for container, _, _ in done:
+            self._remove(container)
+
+    def _run(self):
+        while not self._stop.wait(REFILL_INTERVAL):
+            try:
+                self._handoff()
+                with self._lock:
+                    missing = self.target - len(self._standby)
+                    extra = [self._standby.pop() for _ in range(max(-missing, 0))]  # Newest first
+                for container in extra:
+                    self._remove(container)
+                if missing > 0:
+                    container = self._create()  # One per pass, so a big target does not stall hand-offs
+                    with self._lock:
+                        self._standby.append(container)
+            except Exception as e:
+                print(f"\n   [STANDBY] {self.service_name}: {e}")
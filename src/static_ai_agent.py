@@ -1,61 +1,68 @@
-import time
-import numpy as np
-import tensorflow as tf
-from collections import deque
 import docker
+from cpu_collector import ServiceCpuCollector
+from numpy_brain import load_brain
+from control_loop import ControlLoop
+from controller_state import ControllerState
+from scaler import AsyncScaler
+from service_cache import ServiceCache
+from policies import StaticAIPolicy, scale_decision, WINDOW_SIZE
 import os
-import subprocess
 
 # Config
 SERVICE_NAME = "web_app"
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 MODEL_PATH = os.path.join(BASE_DIR, 'models', 'orchestrator_brain.h5')
-WINDOW_SIZE = 60
 FIXED_THRESHOLD = 0.50  # Dumb, fixed threshold
-
-# (Insert get_cpu_robust function here or import it)
-def get_cpu_robust(service_name):
-    try:
-        cmd_id = f"docker ps --filter label=com.docker.swarm.service.name={service_name} --format {{{{.ID}}}}"
-        output = subprocess.check_output(cmd_id, shell=True).decode().strip()
-        if not output: return 0.0
-        container_id = output.split('\n')[0]
-        cmd_stats = f"docker stats {container_id} --no-stream --format {{{{.CPUPerc}}}}"
-        stats_output = subprocess.check_output(cmd_stats, shell=True).decode().strip()
-        return float(stats_output.replace('%', '')) / 100.0
-    except:
-        return 0.0
+METRICS_PORT = 9103  # Prometheus /metrics for the control loop (0 disables)
 
 def start_static_ai():
     print("--- STATIC AI AGENT (Competitor) ---")
     client = docker.from_env()
-    model = tf.keras.models.load_model(MODEL_PATH)
-    history = deque(maxlen=WINDOW_SIZE)
+    model = load_brain(MODEL_PATH)
+    policy = StaticAIPolicy(threshold=FIXED_THRESHOLD)
     
-    print("Warming up buffer...")
-    while True:
-        try:
-            current_cpu = get_cpu_robust(SERVICE_NAME)
-            history.append(current_cpu)
-            
-            if len(history) == WINDOW_SIZE:
-                input_data = np.array(history).reshape(1, WINDOW_SIZE, 1)
-                prediction = model.predict(input_data, verbose=0)[0][0]
-                
-                service = client.services.get(SERVICE_NAME)
-                current_replicas = service.attrs['Spec']['Mode']['Replicated']['Replicas']
-                
-                # RIGID LOGIC: Only scale if > 50%. No adaptation.
-                if prediction > FIXED_THRESHOLD and current_replicas < 10:
-                    print(f"[STATIC] Pred {prediction:.2f} > 0.50. Scaling UP.")
-                    service.scale(current_replicas + 1)
-                    history.clear()
-                elif prediction < 0.20 and current_replicas > 1:
-                    service.scale(current_replicas - 1)
-            
-            time.sleep(1)
-        except Exception as e:
-            print(e)
+    loop = ControlLoop('static_ai', metrics_port=METRICS_PORT)
+    state = ControllerState('static_ai', loop.period)
+    if state.seed(SERVICE_NAME, policy) is None:
+        print("Warming up buffer...")
+    cache = ServiceCache(client, loop.metrics).start()
+    collector = ServiceCpuCollector(client, SERVICE_NAME, api_calls=cache.api_calls).start()
+    scaler = AsyncScaler(client, loop.metrics, cache=cache)
+    try:
+        for _ in loop:
+            try:
+                with loop.phase('observe'):
+                    snapshot = collector.latest()
+                    current_cpu = snapshot['mean'] / 100.0
+                    policy.observe(current_cpu)
+
+                if policy.ready:
+                    with loop.phase('predict'):
+                        input_data = policy.history.window().reshape(1, WINDOW_SIZE, 1)
+                        prediction = model.predict(input_data, verbose=0)[0][0]
+
+                    with loop.phase('act'):
+                        desired = scaler.desired(SERVICE_NAME)
+                        if desired is not None:  # Not in Swarm (yet): hold until its spec can be read
+                            # RIGID LOGIC: Only scale if > 50%. No adaptation.
+                            # Per-replica forecast over the replicas reporting stats, as in the orchestrator and policy_host
+                            serving = len(snapshot['replicas']) or desired
+                            request = scale_decision(policy.decide(prediction, serving), desired, scaler.converging(SERVICE_NAME))
+                            if request is not None and request > desired:
+                                print(f"[STATIC] Pred {prediction:.2f} > {FIXED_THRESHOLD:.2f}. Scaling UP.")
+                            if request is not None:
+                                scaler.scale(SERVICE_NAME, request)
+                                state.decided(SERVICE_NAME, request)
+
+                state.tick({SERVICE_NAME: policy})
+            except Exception as e:
+                print(e)
+
+    except KeyboardInterrupt:
+        state.save({SERVICE_NAME: policy})
+        collector.stop()
+        scaler.stop()
+        cache.stop()
 
 if __name__ == "__main__":
     start_static_ai()
\ No newline at end of file
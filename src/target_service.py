@@ -0,0 +1,66 @@
+import argparse
+import json
+import os
+import socket
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- CONFIGURATION ---
+# The stand-in for the web_app service the experiments scale. Env vars override these inside the container.
+PORT = int(os.environ.get('TARGET_PORT', 8080))
+LIGHT_MS = float(os.environ.get('TARGET_LIGHT_MS', 2.0))    # CPU milliseconds burned per plain request
+HEAVY_MS = float(os.environ.get('TARGET_HEAVY_MS', 50.0))   # CPU milliseconds per ?type=heavy request
+
+def burn(cpu_ms):
+    """ Spins until this thread has used `cpu_ms` of CPU; waiting for the GIL or a core does not count """
+    end = time.thread_time() + cpu_ms / 1000.0
+    x = 0
+    while time.thread_time() < end:
+        for _ in range(1000):
+            x += 1
+    return x
+
+class TargetHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, as traffic_bot's connection pool expects
+    light_ms, heavy_ms = LIGHT_MS, HEAVY_MS
+
+    def do_GET(self):
+        path, _, query = self.path.partition('?')
+        if path == '/health':
+            body = b'ok'
+        else:
+            heavy = 'type=heavy' in query.split('&')
+            burn(self.heavy_ms if heavy else self.light_ms)
+            body = json.dumps({'type': 'heavy' if heavy else 'light', 'host': socket.gethostname()}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def serve(port=PORT, light_ms=LIGHT_MS, heavy_ms=HEAVY_MS, host='0.0.0.0'):
+    """
+    Threaded HTTP server whose requests cost a fixed amount of CPU. One process holds one GIL,
+    so a replica saturates about one core: more load means queueing until the service is scaled out.
+    """
+    handler = type('Handler', (TargetHandler,), {'light_ms': light_ms, 'heavy_ms': heavy_ms})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    print(f"Target service on :{port} (light {light_ms:g}ms, heavy {heavy_ms:g}ms CPU per request)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stand-in web_app: HTTP target with a configurable CPU cost per request")
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--light-ms', type=float, default=LIGHT_MS, help="CPU ms per plain request")
+    parser.add_argument('--heavy-ms', type=float, default=HEAVY_MS, help="CPU ms per ?type=heavy request")
+    args = parser.parse_args()
+    serve(args.port, args.light_ms, args.heavy_ms)
@@ -0,0 +1,141 @@
+import argparse
+import csv
+import json
+import os
+import numpy as np
+
+# --- CONFIGURATION ---
+MAGIC = b'PCORING1'
+HEADER_SIZE = 4096   # Fixed header: layout below, then the JSON schema, zero padded
+VERSION = 1
+# Header layout (little endian): magic 8s | version u4 | header_size u4 | capacity u8 | record_size u4 | schema_len u4 | written u8
+HEADER_DTYPE = np.dtype([('magic', 'S8'), ('version', '<u4'), ('header_size', '<u4'), ('capacity', '<u8'),
+                         ('record_size', '<u4'), ('schema_len', '<u4'), ('written', '<u8')])
+
+def _dtype_from_descr(descr):
+    return np.dtype([tuple(field) for field in descr])
+
+class RingWriter:
+    """
+    Fixed-size, memory-mapped ring of structured records. One writer appends; any number of
+    readers map the same file. The record is stored before the `written` counter is bumped,
+    so a reader never sees a slot that has not been filled yet.
+    """
+
+    def __init__(self, path, dtype, capacity, meta=None):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.capacity = int(capacity)
+        schema = json.dumps({'fields': self.dtype.descr, 'meta': meta or {}}).encode()
+        if HEADER_DTYPE.itemsize + len(schema) > HEADER_SIZE:
+            raise ValueError("schema does not fit in the ring header")
+
+        size = HEADER_SIZE + self.capacity * self.dtype.itemsize
+        with open(path, 'wb') as f:
+            f.truncate(size)
+        self._mm = np.memmap(path, dtype=np.uint8, mode='r+', shape=(size,))
+        self._header = self._mm[:HEADER_DTYPE.itemsize].view(HEADER_DTYPE)
+        self._header[0] = (MAGIC, VERSION, HEADER_SIZE, self.capacity, self.dtype.itemsize, len(schema), 0)
+        self._mm[HEADER_DTYPE.itemsize:HEADER_DTYPE.itemsize + len(schema)] = np.frombuffer(schema, np.uint8)
+        self.records = self._mm[HEADER_SIZE:].view(self.dtype)
+        self.written = 0
+
+    def append(self, record):
+        self.records[self.written % self.capacity] = record
+        self.written += 1
+        self._header['written'] = self.written
+
+    def flush(self):
+        self._mm.flush()
+
+    def close(self):
+        self.flush()
+        del self.records, self._header, self._mm
+
+class RingReader:
+    """ Read-only, zero-copy view of a ring written by RingWriter (possibly while it is being written) """
+
+    def __init__(self, path):
+        self.path = path
+        self._mm = np.memmap(path, dtype=np.uint8, mode='r')
+        self._header = self._mm[:HEADER_DTYPE.itemsize].view(HEADER_DTYPE)
+        header = self._header[0]
+        if header['magic'] != MAGIC:
+            raise ValueError(f"{path} is not a telemetry ring")
+        self.capacity = int(header['capacity'])
+        start = HEADER_DTYPE.itemsize
+        schema = json.loads(bytes(self._mm[start:start + int(header['schema_len'])]))
+        self.dtype = _dtype_from_descr(schema['fields'])
+        self.meta = schema['meta']
+        self.records = self._mm[int(header['header_size']):].view(self.dtype)[:self.capacity]
+
+    @property
+    def written(self):
+        """ Records appended since the ring was created (monotonic; slot = written % capacity) """
+        return int(self._header['written'][0])
+
+    def __len__(self):
+        return min(self.written, self.capacity)
+
+    def segments(self, n=None, since=None):
+        """
+        Up to two views, oldest first, covering the last `n` records (or every record whose
+        sequence number is >= `since`). Views alias the live file: copy them if the writer
+        may wrap around before you are done.
+        """
+        end = self.written
+        first = max(end - len(self) if since is None else since, end - self.capacity)
+        if n is not None:
+            first = max(first, end - n)
+        if first >= end:
+            return [self.records[:0]]
+        lo, hi = first % self.capacity, end % self.capacity or self.capacity
+        if lo < hi:
+            return [self.records[lo:hi]]
+        return [self.records[lo:], self.records[:hi]]
+
+    def tail(self, n=None, since=None):
+        """ Last `n` records as one array: a view when contiguous, a copy when the range wraps """
+        parts = self.segments(n, since)
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
+
+    def snapshot(self, n=None, since=None):
+        """ Private copy of the last `n` records, trimmed of any the writer overwrote while copying """
+        end = self.written
+        data = self.tail(n, since).copy()
+        # Records appended meanwhile (plus one that may be mid-write) replaced the oldest slots
+        overwritten = max(0, self.written + 1 - end - (self.capacity - len(data)))
+        return data[overwritten:]
+
+def export_csv(ring_path, out_path, columns=None):
+    """
+    Writes every record in the ring to CSV. `columns` maps CSV header -> ring field; the default
+    is the mapping the writer stored in meta['csv_columns'], else every field under its own name.
+    """
+    reader = RingReader(ring_path)
+    data = reader.snapshot()
+    columns = columns or reader.meta.get('csv_columns') or {name: name for name in reader.dtype.names}
+    with open(out_path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(list(columns))
+        values = [data[field] for field in columns.values()]
+        for row in zip(*values):
+            writer.writerow([v.decode() if isinstance(v, bytes) else v for v in row])
+    return len(data)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or export a telemetry ring buffer")
+    parser.add_argument('command', choices=['info', 'export'])
+    parser.add_argument('ring')
+    parser.add_argument('out', nargs='?', help="CSV path for export (default: <ring>.csv)")
+    args = parser.parse_args()
+
+    if args.command == 'info':
+        reader = RingReader(args.ring)
+        print(f"{args.ring}: {len(reader):,}/{reader.capacity:,} records ({reader.written:,} written), "
+              f"{reader.dtype.itemsize} B/record")
+        print(f"Fields: {', '.join(reader.dtype.names)}")
+        print(f"Meta: {reader.meta}")
+    else:
+        out = args.out or os.path.splitext(args.ring)[0] + '.csv'
+        print(f"Exported {export_csv(args.ring, out):,} records to {out}")
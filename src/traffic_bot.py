@@ -4,11 +4,31 @@ import csv
 import random
 import argparse
 import concurrent.futures
+import asyncio
+import math
+import multiprocessing
+import aiohttp
+import json
+from latency_histogram import LatencyHistogram
+from load_profiles import parse_profile, constant, send_schedule
 
 # Configuration
 URL = "http://localhost:8080"
 LOG_FILE = "traffic_metrics.csv"
 THREADS = 10  # Utilizing your i9 processor
+TIMEOUT = 5.0           # Seconds before a request counts as lost (recorded as 5000ms / 503)
+LOST_AFTER_MS = 2000    # "Token Lost": Status != 200 OR Latency > 2000ms
+HEAVY_FRACTION = 0.2    # Share of requests sent as ?type=heavy
+CONNECTIONS = 100       # Keep-alive connection pool size (open-loop mode)
+MAX_IN_FLIGHT = 10_000  # Open loop stops issuing (and counts the send as lost) beyond this
+PERCENTILES = (50, 95, 99, 99.9)
+CSV_HEADER = ["Time", "Avg_Latency_ms", "Throughput_RPS", "Tokens_Lost", "Success_Rate"]
+PERCENTILE_HEADER = ["P50_ms", "P95_ms", "P99_ms", "P999_ms", "Target_RPS"]
+WORKER_STARTUP = 3.0    # Seconds for worker processes to spawn before the shared start time
+LAG_BUDGET_MS = 10.0    # --find-max: p99 send lateness the generator may show and still count as keeping up
+STEP_SECONDS = 5        # --find-max: seconds per probed rate
+START_RATE = 250.0      # --find-max: first probed rate (doubles until the generator falls behind)
+SEARCH_STEPS = 4        # --find-max: bisection steps between the last good and first bad rate
 
 def send_request(session, request_id):
     """Sends a single request and returns metrics."""
@@ -73,5 +93,243 @@ def start_traffic(duration=120):
         # Dynamic Sleep to prevent self-DDoS (keeping it realistic)
         time.sleep(0.5)
 
+class IntervalStats:
+    """ Sends and completions in one logging interval; merges across intervals and worker processes """
+
+    def __init__(self):
+        self.hist = LatencyHistogram()
+        self.lag = LatencyHistogram()  # How late each send went out versus its schedule (generator health)
+        self.lost = 0
+        self.sent = 0
+        self.dropped = 0
+
+    def record(self, latency_ms, status):
+        self.hist.record(latency_ms)
+        if status != 200 or latency_ms > LOST_AFTER_MS:
+            self.lost += 1
+
+    def merge(self, other):
+        self.hist.merge(other.hist)
+        self.lag.merge(other.lag)
+        self.lost += other.lost
+        self.sent += other.sent
+        self.dropped += other.dropped
+        return self
+
+    def row(self, elapsed, seconds, target):
+        n = self.hist.total
+        success_rate = (n - self.lost) / n * 100 if n else 100.0
+        return ([elapsed, round(self.hist.mean_ms(), 2), round(n / seconds, 1), self.lost, round(success_rate, 1)]
+                + [round(p, 2) for p in self.hist.percentiles(PERCENTILES)] + [round(target, 1)])
+
+async def _fire(session, intended, stats, in_flight):
+    """
+    One request. Latency is measured from the *intended* send time, so time spent waiting behind
+    a slow server or a full connection pool is charged to the request (no coordinated omission).
+    """
+    loop = asyncio.get_running_loop()
+    stats[0].lag.record((loop.time() - intended) * 1000)
+    stats[0].sent += 1
+    try:
+        params = {'type': 'heavy'} if random.random() < HEAVY_FRACTION else None
+        async with session.get(URL, params=params) as resp:
+            await resp.read()
+            status = resp.status
+        latency = (loop.time() - intended) * 1000  # A real 503 keeps its measured latency
+    except Exception:
+        status = 503
+        # Refused / reset / timed out: same penalty the closed loop has always logged
+        latency = max((loop.time() - intended) * 1000, TIMEOUT * 1000)
+    stats[0].record(latency, status)
+    in_flight[0] -= 1
+
+async def open_loop(offsets, duration, report, connections=CONNECTIONS, start_at=None, interval=1.0):
+    """
+    Sends one request at every offset (seconds from the start) regardless of how fast responses
+    come back, and calls report(index, IntervalStats) at the end of every interval. `start_at`
+    (epoch seconds) lines the intervals of several worker processes up on the same clock.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time() + max(0.0, (start_at or time.time()) - time.time())
+    offsets = offsets.tolist()
+    intervals = math.ceil(duration / interval)
+    connector = aiohttp.TCPConnector(limit=connections, keepalive_timeout=30)
+    stats, in_flight, tasks = [IntervalStats()], [0], set()
+
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=TIMEOUT)) as session:
+        await asyncio.sleep(max(0.0, start - loop.time()))
+        sent = logged = 0
+        while logged < intervals:
+            now = loop.time()
+            # Every send whose scheduled time has passed goes out now, tagged with that time
+            while sent < len(offsets) and start + offsets[sent] <= now:
+                intended = start + offsets[sent]
+                sent += 1
+                if in_flight[0] >= MAX_IN_FLIGHT:
+                    stats[0].dropped += 1
+                    stats[0].record(TIMEOUT * 1000, 503)
+                    continue
+                in_flight[0] += 1
+                task = asyncio.create_task(_fire(session, intended, stats, in_flight))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            while logged < intervals and now >= start + (logged + 1) * interval:
+                current, stats[0] = stats[0], IntervalStats()
+                report(logged, current)
+                logged += 1
+            next_send = start + offsets[sent] if sent < len(offsets) else math.inf
+            await asyncio.sleep(max(0.0, min(next_send, start + (logged + 1) * interval) - loop.time()))
+
+        if tasks:
+            await asyncio.wait(tasks, timeout=TIMEOUT)
+    report(intervals, stats[0])  # Stragglers that finished after the last interval
+
+class IntervalLog:
+    """ Merges interval stats from every worker into one time-aligned traffic_metrics.csv """
+
+    def __init__(self, path, workers, rates, interval=1.0, status=True):
+        self.workers = workers
+        self.rates = rates
+        self.interval = interval
+        self.intervals = math.ceil(len(rates) / interval)
+        self.status = status
+        self.overall = IntervalStats()
+        self._pending = {}  # interval index -> [merged stats, workers reported]
+        self._next = 0
+        self._file = open(path, 'w', newline='') if path else None
+        if self._file:
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(CSV_HEADER + PERCENTILE_HEADER)
+
+    def add(self, index, stats):
+        self.overall.merge(stats)
+        if index >= self.intervals:
+            return
+        entry = self._pending.setdefault(index, [IntervalStats(), 0])
+        entry[0].merge(stats)
+        entry[1] += 1
+        # Rows go out in order, once every worker has reported the interval
+        while self._next in self._pending and self._pending[self._next][1] == self.workers:
+            self._write(self._next, self._pending.pop(self._next)[0])
+            self._next += 1
+
+    def close(self):
+        for index in sorted(self._pending):  # A worker died or stopped early: write what we have
+            self._write(index, self._pending.pop(index)[0])
+        if self._file:
+            self._file.close()
+
+    def _write(self, index, stats):
+        second = int(index * self.interval)
+        row = stats.row(int((index + 1) * self.interval), self.interval, self.rates[min(second, len(self.rates) - 1)])
+        if self._file:
+            self._writer.writerow(row)
+            self._file.flush()
+        if self.status:
+            print(f"Sec: {row[0]} | Target: {row[-1]:.0f}/s | RPS: {row[2]} | p50: {row[5]:.0f}ms "
+                  f"| p99: {row[7]:.0f}ms | Lost: {row[3]}", end='\r')
+
+def _worker(offsets, duration, connections, start_at, interval, queue):
+    try:
+        asyncio.run(open_loop(offsets, duration, lambda index, stats: queue.put((index, stats)),
+                              connections, start_at, interval))
+    finally:
+        queue.put(None)
+
+def run(rates, workers=1, connections=CONNECTIONS, log_file=LOG_FILE, interval=1.0, status=True):
+    """
+    Follows a per-second rate profile. With several workers, each process takes every
+    `workers`-th send of one shared schedule, so together they follow it exactly.
+    """
+    offsets = send_schedule(rates)
+    log = IntervalLog(log_file, workers, rates, interval, status)
+    try:
+        if workers == 1:
+            asyncio.run(open_loop(offsets, len(rates), log.add, connections, interval=interval))
+        else:
+            ctx = multiprocessing.get_context('spawn')
+            queue = ctx.Queue()
+            start_at = time.time() + WORKER_STARTUP
+            procs = [ctx.Process(target=_worker, args=(offsets[w::workers], len(rates), max(1, connections // workers),
+                                                       start_at, interval, queue), daemon=True)
+                     for w in range(workers)]
+            for proc in procs:
+                proc.start()
+            finished = 0
+            while finished < workers:
+                item = queue.get()
+                if item is None:
+                    finished += 1
+                else:
+                    log.add(*item)
+            for proc in procs:
+                proc.join()
+    finally:
+        log.close()
+    return log.overall
+
+def print_summary(overall):
+    summary = ' | '.join(f"p{q:g}: {p:.1f}ms" for q, p in zip(PERCENTILES, overall.hist.percentiles(PERCENTILES)))
+    print(f"\n{overall.hist.total:,} requests | {summary} | lost: {overall.lost:,} "
+          f"| send lag p99: {overall.lag.percentile(99):.1f}ms")
+
+def write_summary(overall, path):
+    """ Whole-run totals and percentiles as JSON (run_benchmark.py reads this) """
+    percentiles = overall.hist.percentiles(PERCENTILES)
+    with open(path, 'w') as f:
+        json.dump({'requests': overall.hist.total, 'lost': overall.lost, 'sent': overall.sent, 'dropped': overall.dropped,
+                   'mean_ms': overall.hist.mean_ms(), 'send_lag_p99_ms': overall.lag.percentile(99),
+                   **{f'p{q:g}_ms': p for q, p in zip(PERCENTILES, percentiles)}}, f, indent=1)
+
+def start_open_loop(rates, workers=1, connections=CONNECTIONS, summary_file=None):
+    print(f"--- 🚀 OPEN-LOOP TRAFFIC BOT STARTED ({len(rates)}s, {rates.min():.0f}-{rates.max():.0f} req/s, "
+          f"{workers} worker(s), {connections} keep-alive connections) ---")
+    overall = run(rates, workers, connections)
+    print_summary(overall)
+    if summary_file:
+        write_summary(overall, summary_file)
+
+def find_max_rate(workers=1, connections=CONNECTIONS, step_seconds=STEP_SECONDS):
+    """ Highest constant rate at which the generator itself still sends on schedule (send lag p99 within budget) """
+    print(f"--- GENERATOR CAPACITY ({workers} worker(s), {step_seconds}s per step, lag budget {LAG_BUDGET_MS:g}ms) ---")
+
+    def keeps_up(rate):
+        overall = run(constant(step_seconds, rate), workers, connections, log_file=None, status=False)
+        achieved = (overall.sent - overall.dropped) / step_seconds
+        lag = overall.lag.percentile(99)
+        ok = lag <= LAG_BUDGET_MS and achieved >= 0.95 * rate
+        print(f"{rate:>10,.0f} req/s target | {achieved:>10,.0f} sent/s | send lag p99 {lag:8.1f}ms | {'ok' if ok else 'BEHIND'}")
+        return ok
+
+    good, bad = 0.0, START_RATE
+    while keeps_up(bad):
+        good, bad = bad, bad * 2
+    for _ in range(SEARCH_STEPS):
+        mid = (good + bad) / 2
+        if keeps_up(mid):
+            good = mid
+        else:
+            bad = mid
+    print(f"Maximum sustainable rate: ~{good:,.0f} req/s")
+    return good
+
 if __name__ == "__main__":
-    start_traffic(duration=300) # Runs for 5 minutes
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="HTTP load generator for the orchestrated service")
+    parser.add_argument('--duration', type=int, default=300, help="seconds to run")  # Runs for 5 minutes
+    parser.add_argument('--rate', type=float, help="open-loop target arrival rate (req/s); omit for the classic closed loop")
+    parser.add_argument('--profile', help="open-loop load profile, e.g. diurnal:low=20,high=300,period=600 "
+                                          "or bitbrains:data/raw/5.csv,low=20,high=400 (see load_profiles.py)")
+    parser.add_argument('--workers', type=int, default=1, help="generator processes (open loop)")
+    parser.add_argument('--connections', type=int, default=CONNECTIONS, help="keep-alive pool size, split across workers")
+    parser.add_argument('--find-max', action='store_true', help="report the highest rate this host can generate")
+    parser.add_argument('--summary', help="also write whole-run percentiles and tokens lost to this JSON file (open loop)")
+    args = parser.parse_args()
+
+    if args.find_max:
+        find_max_rate(args.workers, args.connections)
+    elif args.profile or args.rate:
+        rates = parse_profile(args.profile, args.duration) if args.profile else constant(args.duration, args.rate)
+        start_open_loop(rates, args.workers, args.connections, args.summary)
+    else:
+        start_traffic(duration=args.duration)
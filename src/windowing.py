@@ -0,0 +1,87 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+def span(horizon):
+    """ Furthest step ahead for an int horizon or a sequence of horizons """
+    return int(np.max(horizon))
+
+def create_sequences(data, seq_length, horizon=1):
+    """
+    Sliding windows without copying.
+    X[i] == data[i:i + seq_length] and y[i] == data[i + seq_length + horizon - 1],
+    both returned as read-only views over `data`.
+    A sequence of horizons gives y[i, k] == data[i + seq_length + horizon[k] - 1, 0] instead
+    (a small copy), with windows limited by the furthest horizon.
+    """
+    data = np.asarray(data)
+    if data.ndim == 1:
+        data = data[:, None]
+    n = max(len(data) - seq_length - span(horizon), 0)
+
+    # sliding_window_view puts the window axis last: (rows, features, seq) -> (rows, seq, features)
+    X = sliding_window_view(data, seq_length, axis=0).swapaxes(1, 2)[:n]
+    if not np.isscalar(horizon):
+        targets = seq_length + np.asarray(horizon) - 1
+        return X, data[np.arange(n)[:, None] + targets, 0]
+    y = data[seq_length + horizon - 1:seq_length + horizon - 1 + n].view()
+    y.flags.writeable = False
+    return X, y
+
+def split_indices(indices, val_fraction=0.2):
+    """ Chronological train/val split as index arrays, so no window data is copied """
+    indices = np.arange(indices) if np.isscalar(indices) else np.asarray(indices)
+    train_size = int(len(indices) * (1 - val_fraction))
+    return indices[:train_size], indices[train_size:]
+
+def window_starts(bounds, seq_length, horizon=1):
+    """
+    Start indices of every window that stays inside one trace.
+    `bounds` holds the cumulative trace offsets [0, len_0, len_0 + len_1, ..., total].
+    """
+    horizon = span(horizon)
+    starts = [np.arange(lo, hi - seq_length - horizon) for lo, hi in zip(bounds[:-1], bounds[1:])
+              if hi - lo > seq_length + horizon]
+    return np.concatenate(starts) if starts else np.arange(0)
+
+def read_rows(path, start, stop):
+    """ Reads rows [start, stop) of a 1-D .npy with a plain file read, so nothing stays mapped afterwards """
+    header = np.load(path, mmap_mode='r')
+    dtype, offset = header.dtype, header.offset
+    del header
+    return np.fromfile(path, dtype=dtype, count=stop - start, offset=offset + start * dtype.itemsize)
+
+def shard_length(path):
+    return len(np.load(path, mmap_mode='r'))
+
+def iter_window_batches(shard_paths, seq_length, horizon=1, batch_size=128, subset='train',
+                        val_fraction=0.2, shuffle_block=64, seed=None):
+    """
+    Streams (X, y) batches from per-trace .npy shards with bounded memory.
+    Each shard is read in blocks of `shuffle_block` batches; windows never span two shards.
+    The last `val_fraction` of every shard's windows is the validation subset.
+    Training blocks and the windows inside them are visited in random order.
+    """
+    rng = np.random.default_rng(seed)
+    shuffle = subset == 'train'
+    block = batch_size * shuffle_block
+    paths = list(shard_paths)
+    if shuffle:
+        rng.shuffle(paths)
+
+    for path in paths:
+        n = shard_length(path) - seq_length - span(horizon)
+        if n <= 0:
+            continue
+        train_end = int(n * (1 - val_fraction))
+        lo, hi = (0, train_end) if subset == 'train' else (train_end, n)
+
+        block_starts = np.arange(lo, hi, block)
+        if shuffle:
+            rng.shuffle(block_starts)
+        for b_lo in block_starts:
+            b_hi = min(b_lo + block, hi)
+            X, y = create_sequences(read_rows(path, b_lo, b_hi + seq_length + span(horizon)), seq_length, horizon)
+            order = rng.permutation(len(X)) if shuffle else np.arange(len(X))
+            for i in range(0, len(order), batch_size):
+                idx = order[i:i + batch_size]
+                yield X[idx], y[idx]
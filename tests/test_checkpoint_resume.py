@@ -0,0 +1,64 @@
+import json
+import numpy as np
+import pytest
+tf = pytest.importorskip('tensorflow')
+import lstm_trainer as trainer
+
+class Interrupt(Exception):
+    pass
+
+class KillAfter(tf.keras.callbacks.Callback):
+    """ Stands in for a killed process: raises once `epochs` epochs have been backed up """
+
+    def __init__(self, epochs):
+        super().__init__()
+        self.epochs = epochs
+
+    def on_epoch_end(self, epoch, logs=None):
+        if epoch + 1 == self.epochs:
+            raise Interrupt()
+
+class ScriptedLoss(tf.keras.callbacks.Callback):
+    """ Replaces val_loss with a fixed sequence, so early stopping's decisions are known in advance """
+
+    def __init__(self, losses):
+        super().__init__()
+        self.losses = losses
+
+    def on_epoch_end(self, epoch, logs=None):
+        logs['val_loss'] = self.losses[epoch]
+
+VAL_LOSSES = [5.0, 4.0, 3.0, 3.5, 3.6, 3.7, 3.8, 3.9]  # Best at epoch 3; patience 3 stops after epoch 6
+
+def fit(checkpoint_dir, callbacks):
+    tf.keras.utils.set_random_seed(0)
+    x = np.random.default_rng(0).random((64, 10, 1), dtype=np.float32)
+    model = trainer.build_model((1,), window=10, units=(4, 2))
+    backup = tf.keras.callbacks.BackupAndRestore(str(checkpoint_dir))
+    early_stop = trainer.ResumableEarlyStopping(str(checkpoint_dir), monitor='val_loss', patience=3,
+                                                restore_best_weights=True)
+    history = model.fit(x, x[:, -1], epochs=len(VAL_LOSSES), batch_size=32, verbose=0,
+                        callbacks=[ScriptedLoss(VAL_LOSSES), backup, early_stop, *callbacks])
+    return model, early_stop, history
+
+def test_interrupted_run_stops_like_an_uninterrupted_one(tmp_path):
+    _, straight, _ = fit(tmp_path / 'straight', [])
+
+    with pytest.raises(Interrupt):
+        fit(tmp_path / 'resumed', [KillAfter(4)])
+    state = json.loads((tmp_path / 'resumed' / 'early_stopping.json').read_text())
+    assert state == {'epoch': 3, 'best': 3.0, 'wait': 1, 'best_epoch': 2}
+    _, resumed, history = fit(tmp_path / 'resumed', [])
+
+    assert len(history.history['loss']) == 2  # Epochs 5 and 6 only
+    assert (resumed.stopped_epoch, resumed.best, resumed.best_epoch) == (straight.stopped_epoch, 3.0, 2)
+    for a, b in zip(resumed.best_weights, straight.best_weights):
+        np.testing.assert_allclose(a, b, rtol=1e-5, atol=1e-6)
+
+def test_checkpoint_dir_is_keyed_by_run_config():
+    base, _ = trainer.checkpoint_dir_for('models/a.h5', (1, 5))
+    assert trainer.checkpoint_dir_for('models/a.h5', (1, 5))[0] == base
+    assert trainer.checkpoint_dir_for('models/a.h5', (1,))[0] != base
+    assert trainer.checkpoint_dir_for('models/b.h5', (1, 5))[0] != base
+    assert trainer.checkpoint_dir_for('models/a.h5', (1, 5), window=30)[0] != base
+    assert trainer.checkpoint_dir_for('models/a.h5', (1, 5), stream=True)[0] != base
@@ -0,0 +1,71 @@
+import time
+import numpy as np
+import pytest
+from controller_state import ControllerState, logger_tail
+from logger import HOST_DTYPE, RING_FILE, SERVICE_NAME as LOGGED_SERVICE, open_ring
+from policies import AdaptivePolicy, ReactivePolicy
+
+@pytest.fixture
+def load():
+    rng = np.random.default_rng(0)
+    return (0.4 + 0.2 * np.sin(np.arange(200) / 10) + rng.normal(0, 0.03, 200)).clip(0, 1)
+
+@pytest.fixture
+def snapshot(tmp_path, load):
+    """ Policies fed `load`, saved with one decision; returns (path, live policies) """
+    path = str(tmp_path / 'state' / 'orchestrator.json')
+    state = ControllerState('orchestrator', path=path)
+    live = {'web_app': AdaptivePolicy(), 'api': ReactivePolicy()}
+    for x in load:
+        for policy in live.values():
+            policy.observe(x)
+    state.decided('web_app', 3)
+    state.save(live)
+    return path, live
+
+def write_host_ring(load, seconds=70):
+    """ logger.py's host ring at 0.1s sampling, its seconds aligned with the controller's 1s bins """
+    ring = open_ring(RING_FILE, 0.1, seconds=60, dtype=HOST_DTYPE)
+    start = np.floor(time.time()) - seconds
+    for i, x in enumerate(np.repeat(load[-seconds:], 10)):
+        ring.append((start + i * 0.1 + 0.05, 0, x * 100, 0, 0, 0, 0, 0, 0, 1))
+    ring.close()
+
+def test_snapshot_round_trip(snapshot):
+    path, live = snapshot
+    restarted = ControllerState('orchestrator', path=path)
+    seeded = {'web_app': AdaptivePolicy(), 'api': ReactivePolicy()}
+    assert restarted.seed('web_app', seeded['web_app']) == 'snapshot' and seeded['web_app'].ready
+    assert restarted.seed('api', seeded['api']) == 'snapshot'
+    a, b = live['web_app'].history, seeded['web_app'].history
+    assert np.array_equal(a.window(), b.window()) and a.ewma.value == b.ewma.value
+    assert np.isclose(a.std(), b.std()) and a.min() == b.min() and a.max() == b.max()
+    assert seeded['api'].breaches.count == live['api'].breaches.count
+    assert restarted.decisions['web_app']['request'] == 3
+    assert np.isclose(live['web_app'].current_threshold(), seeded['web_app'].current_threshold())
+
+def test_snapshot_for_another_policy_is_not_restored(snapshot):
+    path, _ = snapshot
+    policy = ReactivePolicy()
+    assert ControllerState('orchestrator', path=path).seed('web_app', policy) is None  # Saved by AdaptivePolicy
+    assert policy.breaches.count == 0
+
+def test_stale_snapshot_is_ignored(snapshot, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # No logger files here either
+    path, _ = snapshot
+    stale = ControllerState('orchestrator', path=path, max_age=-1)
+    policy = AdaptivePolicy()
+    assert stale.seed('web_app', policy) is None and not policy.ready
+
+def test_logger_tail_seeds_without_a_snapshot(tmp_path, monkeypatch, load):
+    monkeypatch.chdir(tmp_path)
+    write_host_ring(load)
+    fallback = AdaptivePolicy()
+    assert ControllerState('orchestrator', path=str(tmp_path / 'none.json')).seed(LOGGED_SERVICE, fallback) == 'logger'
+    assert fallback.ready and np.allclose(fallback.history.window()[-10:], load[-10:], atol=1e-5)
+
+def test_logger_tail_ignores_old_or_other_services(tmp_path, monkeypatch, load):
+    monkeypatch.chdir(tmp_path)
+    write_host_ring(load)
+    assert logger_tail('api') is None
+    assert logger_tail(LOGGED_SERVICE, max_age=-1) is None
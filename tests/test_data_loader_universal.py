@@ -0,0 +1,82 @@
+import json
+import os
+import subprocess
+import sys
+import numpy as np
+import pytest
+import data_loader_universal as loader
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+HEADER = "Timestamp [ms];\tCPU cores;\tCPU capacity provisioned [MHZ];\tCPU usage [MHZ];\tMemory usage [KB]\n"
+CHUNK_ROWS = 10_000
+
+def write_trace(path, rows, seed):
+    """ A Bitbrains-style trace; some rows have zero capacity, which the loader drops """
+    rng = np.random.default_rng(seed)
+    capacity = rng.choice([0.0, 2600.0, 5200.0], rows, p=[0.01, 0.66, 0.33])
+    usage = capacity * rng.uniform(0, 1.2, rows)  # Some rows above capacity: clipped to 1
+    with open(path, 'w') as f:
+        f.write(HEADER)
+        for i in range(0, rows, 50_000):
+            block = slice(i, i + 50_000)
+            f.writelines(f"{1376314846 + 300 * (i + j)};\t2;\t{c:.1f};\t{u:.3f};\t0.0\n"
+                         for j, (c, u) in enumerate(zip(capacity[block], usage[block])))
+
+@pytest.fixture
+def raw_dir(tmp_path):
+    raw = tmp_path / 'raw'
+    raw.mkdir()
+    for n, rows in enumerate([35_000, 3, 52_017]):  # Several chunks, a tiny trace, a ragged last chunk
+        write_trace(raw / f'{n + 10}.csv', rows, n)
+    return raw
+
+def test_streaming_matches_one_shot(raw_dir, tmp_path, monkeypatch):
+    shard_dir, scaler_file = tmp_path / 'shards', tmp_path / 'scaler.json'
+    loader.process_universal_data_streaming(str(raw_dir), str(shard_dir), str(scaler_file), CHUNK_ROWS)
+
+    monkeypatch.setattr(loader, 'RAW_DIR', str(raw_dir))
+    monkeypatch.setattr(loader, 'CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(loader, 'OUTPUT_FILE', str(tmp_path / 'one_shot.npy'))
+    monkeypatch.setattr(loader, 'BOUNDS_FILE', str(tmp_path / 'one_shot.bounds.npy'))
+    loader.process_universal_data(workers=1)
+    one_shot = np.load(loader.OUTPUT_FILE)
+    bounds = np.load(loader.BOUNDS_FILE)
+    raw = np.concatenate([loader.parse_trace(str(f)) for f in sorted(raw_dir.glob('*.csv'))])
+
+    with open(scaler_file) as f:
+        scaler = json.load(f)
+    assert scaler['min'] == float(raw.min()) and scaler['max'] == float(raw.max())
+    counts = list(scaler['shards'].values())
+    assert list(scaler['shards']) == ['10.npy', '11.npy', '12.npy']
+    assert np.array_equal(np.cumsum([0] + counts), bounds)
+    streamed = np.concatenate([np.load(shard_dir / name) for name in scaler['shards']])
+    assert streamed.dtype == np.float32 and len(streamed) == len(one_shot)
+    np.testing.assert_allclose(streamed, one_shot, rtol=0, atol=1e-6)
+
+PEAK_RSS = """
+import resource, sys
+import data_loader_universal as loader
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+loader.process_universal_data_streaming(sys.argv[1], sys.argv[2], sys.argv[3], int(sys.argv[4]))
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before)
+"""
+
+def peak_rss_growth_mb(raw, out):
+    """ Peak RSS growth of one streaming run in a fresh process (ru_maxrss is a high-water mark) """
+    result = subprocess.run([sys.executable, '-c', PEAK_RSS, str(raw), str(out / 'shards'), str(out / 'scaler.json'),
+                             str(CHUNK_ROWS)], cwd=SRC_DIR, capture_output=True, text=True, check=True)
+    return int(result.stdout.split()[-1]) / 1024
+
+def test_streaming_peak_memory_does_not_grow_with_the_trace(tmp_path):
+    """
+    A trace 20 chunks long and one 8x that: peak RSS growth may differ only by the shard's own
+    float32 pages (4 bytes a row), well under the ~25 bytes a row that parsing the whole CSV at once adds.
+    """
+    growth = {}
+    for rows in (200_000, 1_600_000):
+        raw = tmp_path / f'raw_{rows}'
+        raw.mkdir()
+        write_trace(raw / '1.csv', rows, 0)
+        growth[rows] = peak_rss_growth_mb(raw, tmp_path / f'out_{rows}')
+    extra_rows = 1_600_000 - 200_000
+    assert growth[1_600_000] - growth[200_000] < extra_rows * 8 / 2**20, growth
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from orchestrator import predict_batch
+from policies import AdaptivePolicy, WINDOW_SIZE
+
+class FakeModel:
+    """ Records every predict call; forecasts are the last sample of each window """
+    horizons = (1,)
+
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, batch, verbose=0):
+        self.batches.append(batch.shape)
+        return batch[:, -1, :]
+
+class HoldingPolicy(AdaptivePolicy):
+    """ Computes the real decision but always holds, so every service keeps a steady state """
+
+    def decide(self, prediction, current_replicas):
+        super().decide(prediction, current_replicas)
+        return current_replicas
+
+def full_policies(n, rng):
+    """ N services with full windows of random CPU load """
+    policies = {f"svc_{i}": HoldingPolicy() for i in range(n)}
+    for policy in policies.values():
+        policy.history.extend(rng.random(WINDOW_SIZE))
+    return policies
+
+def tick(model, policies, rng):
+    """ One orchestrator tick: every service observes, one batched predict, every ready service decides """
+    for policy in policies.values():
+        policy.observe(rng.random())
+    predictions = predict_batch(model, policies)
+    for name, prediction in predictions.items():
+        policies[name].decide(prediction, 2)
+    return predictions
+
+@pytest.mark.parametrize('services', [1, 10, 100, 300])
+def test_one_predict_per_tick(services):
+    rng = np.random.default_rng(0)
+    model, policies = FakeModel(), full_policies(services, rng)
+    for _ in range(5):
+        predictions = tick(model, policies, rng)
+    assert model.batches == [(services, WINDOW_SIZE, 1)] * 5
+    assert all(predictions[name] == np.float32(p.history.last()) for name, p in policies.items())
+
+def test_services_still_filling_their_window_are_left_out():
+    rng = np.random.default_rng(0)
+    policies = full_policies(3, rng)
+    policies['svc_1'].history.clear()
+    model = FakeModel()
+    assert set(tick(model, policies, rng)) == {'svc_0', 'svc_2'}
+    assert model.batches == [(2, WINDOW_SIZE, 1)]
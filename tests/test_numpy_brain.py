@@ -0,0 +1,42 @@
+import os
+import shutil
+import numpy as np
+import pytest
+import numpy_brain
+
+# Max |forecast - Keras forecast| on the [0, 1]-scaled load; measured ~2e-7, ~3e-5 and ~2e-4
+TOLERANCE = {'numpy': 1e-5, 'float16': 1e-3, 'int8': 1e-2}
+
+@pytest.fixture
+def model_copy(tmp_path, monkeypatch):
+    """ The shipped .h5 alone in tmp_path, so every runtime exports on load """
+    monkeypatch.setattr(numpy_brain, 'CACHE_DIR', str(tmp_path / 'cache'))
+    path = tmp_path / 'brain.h5'
+    shutil.copy(numpy_brain.MODEL_PATH, path)
+    return str(path)
+
+def test_runtimes_match_keras(model_copy):
+    pytest.importorskip('tensorflow')
+    keras = numpy_brain.load_brain(model_copy, 'keras')
+    x = np.random.default_rng(0).uniform(0, 1, (256,) + keras.input_shape[1:]).astype(np.float32)
+    reference = keras.predict(x, verbose=0)
+    for runtime, tolerance in TOLERANCE.items():
+        brain = numpy_brain.load_brain(model_copy, runtime)
+        assert brain.horizons == keras.horizons
+        np.testing.assert_allclose(brain.predict(x), reference, rtol=0, atol=tolerance, err_msg=runtime)
+
+def test_exports_go_to_the_cache_not_beside_the_model(model_copy, tmp_path):
+    pytest.importorskip('h5py')
+    for runtime in ('numpy', 'float16', 'int8'):
+        numpy_brain.load_brain(model_copy, runtime)
+    assert sorted(os.listdir(tmp_path)) == ['brain.h5', 'cache']
+    assert sorted(os.listdir(tmp_path / 'cache')) == ['brain.float16.npz', 'brain.int8.npz', 'brain.npz']
+
+def test_a_fresh_export_beside_the_model_is_used(model_copy, tmp_path):
+    pytest.importorskip('h5py')
+    from export_brain import export_brain
+    shipped = numpy_brain.npz_path_for(model_copy)
+    export_brain(model_copy, shipped)
+    assert numpy_brain.brain_path(model_copy) == shipped
+    os.utime(model_copy, (os.path.getmtime(shipped) + 10,) * 2)  # Retrained since: the shipped export is stale
+    assert numpy_brain.brain_path(model_copy) == str(tmp_path / 'cache' / 'brain.npz')
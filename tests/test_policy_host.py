@@ -0,0 +1,85 @@
+import csv
+import numpy as np
+import pytest
+from policies import WINDOW_SIZE
+from policy_host import LOG_COLUMNS, PolicyHost
+
+class StubModel:
+    """ Records every predict call; forecasts are the last sample of each window """
+    horizons = (1,)
+
+    def __init__(self):
+        self.batches = []
+
+    def predict(self, batch, verbose=0):
+        self.batches.append(batch.copy())
+        return batch[:, -1, :]
+
+@pytest.fixture
+def log_file(tmp_path):
+    return str(tmp_path / 'decisions.csv')
+
+def make_host(log_file, active='adaptive', shadows=('reactive', 'static_ai'), load=0.9):
+    """ A host whose policies have all seen a full window of `load` """
+    host = PolicyHost(active, shadows, StubModel(), log_file=log_file)
+    for _ in range(WINDOW_SIZE):
+        host.observe(load)
+    return host
+
+def tick(host, cpu, serving=2, desired=2, converging=False):
+    host.observe(cpu)
+    return host.decide(cpu, serving, desired, converging, host.predict())
+
+def read_log(host, log_file):
+    host.close()
+    with open(log_file) as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == LOG_COLUMNS
+    return rows
+
+def test_every_policy_sees_the_same_input(log_file):
+    host = make_host(log_file)
+    for cpu in (0.91, 0.93):
+        tick(host, cpu, serving=3, desired=4)
+    assert host.policies['reactive'].cpu == 0.93
+    assert host.policies['adaptive'].history.last() == 0.93
+    rows = read_log(host, log_file)
+    assert len(rows) == 2 * len(host.policies)
+    for n in ('0', '1'):
+        inputs = {(r['CPU'], r['Replicas'], r['Desired']) for r in rows if r['Tick'] == n}
+        assert inputs == {(str(0.91 if n == '0' else 0.93), '3', '4')}
+
+def test_one_batched_predict_per_tick(log_file):
+    host = make_host(log_file, load=0.3)  # Nobody scales, so the static policy keeps its window
+    for i in range(3):
+        tick(host, 0.3 + i / 100)
+    batches = host.model.batches
+    assert [b.shape for b in batches] == [(2, WINDOW_SIZE, 1)] * 3  # adaptive and static_ai, never reactive
+    assert np.allclose(batches[-1][:, -1, 0], 0.32)
+
+def test_only_the_active_request_is_returned(log_file):
+    host = make_host(log_file, active='static_ai', shadows=('adaptive', 'reactive'))
+    request = tick(host, 0.9)
+    rows = {r['Policy']: r for r in read_log(host, log_file)}
+    assert request == 3 and rows['static_ai']['Request'] == '3' and rows['static_ai']['Acted'] == '1'
+    assert all(r['Acted'] == '0' and r['Role'] == 'shadow' for name, r in rows.items() if name != 'static_ai')
+
+def test_shadow_requests_are_only_logged(log_file):
+    host = make_host(log_file, active='reactive', shadows=('adaptive', 'static_ai'), load=0.6)
+    assert tick(host, 0.6) is None  # Reactive holds between its thresholds
+    rows = {r['Policy']: r for r in read_log(host, log_file)}
+    assert rows['reactive']['Request'] == '' and rows['static_ai']['Request'] == '3'
+    assert all(r['Acted'] == '0' for r in rows.values())
+
+def test_all_shadow_host_never_scales(log_file):
+    host = make_host(log_file, active=None)
+    assert tick(host, 0.9) is None
+    rows = read_log(host, log_file)
+    assert all(r['Request'] and r['Acted'] == '0' and r['Role'] == 'shadow' for r in rows)
+
+def test_every_policy_holds_while_desired_is_unknown(log_file):
+    host = make_host(log_file)
+    assert tick(host, 0.9, serving=2, desired=None) is None
+    rows = read_log(host, log_file)
+    assert len(rows) == 3 and all(r['Target'] == '' and r['Request'] == '' and r['Acted'] == '0' for r in rows)
+    assert host.policies['static_ai'].ready  # Held, so no scale-up reset its window
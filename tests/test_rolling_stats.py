@@ -0,0 +1,71 @@
+import math
+import numpy as np
+import pytest
+import rolling_stats
+from rolling_stats import BreachCounter, RollingStats, RollingWindow
+
+def check_stream(stream, size, alpha=0.2):
+    """ Every prefix of `stream` against NumPy on the same window """
+    stats, breaches = RollingStats(size, alpha), BreachCounter(float(np.median(stream)))
+    ewma, run = float('nan'), 0
+    for i, x in enumerate(stream):
+        stats.append(x)
+        window = stream[max(0, i + 1 - size):i + 1]
+        assert np.array_equal(stats.window(np.float64), window)
+        assert math.isclose(stats.mean(), window.mean(), rel_tol=1e-9, abs_tol=1e-9)
+        # Variance, not std: near-zero spreads make sqrt amplify the last bits of cancellation
+        assert math.isclose(stats.var(), window.var(), rel_tol=1e-6, abs_tol=1e-9 * max(1.0, abs(window).max()) ** 2)
+        assert stats.min() == window.min() and stats.max() == window.max() and stats.last() == x
+        ewma = x if i == 0 else ewma + alpha * (x - ewma)
+        assert math.isclose(stats.ewma.value, ewma, rel_tol=1e-12)
+        run = run + 1 if x > breaches.threshold else 0
+        assert breaches.update(x) == run
+    assert stats.full == (len(stream) >= size)
+    return stats
+
+@pytest.mark.parametrize('seed', range(50))
+def test_random_streams_match_numpy(seed):
+    rng = np.random.default_rng(seed)
+    stream = rng.normal(rng.uniform(-1e3, 1e3), rng.uniform(0.01, 100), int(rng.integers(1, 400)))
+    if seed % 4 == 0:
+        stream = np.round(stream)  # Ties exercise the monotonic deques
+    check_stream(stream, int(rng.integers(1, 80)), float(rng.uniform(0.01, 1.0)))
+
+def test_window_of_one():
+    stats = check_stream(np.random.default_rng(1).normal(0, 10, 200), size=1)
+    assert stats.var() == 0.0 and stats.min() == stats.max() == stats.last()
+
+@pytest.mark.parametrize('extra', [-1, 0, 1])
+def test_window_around_full(extra):
+    """ Stream one short of, exactly, and one past the window size """
+    size = 60
+    stream = np.random.default_rng(2).normal(0.5, 0.1, size + extra)
+    stats = check_stream(stream, size)
+    assert stats.full == (extra >= 0) and len(stats) == min(size, len(stream))
+
+def test_clear_starts_over():
+    stats = RollingStats(10)
+    stats.extend(np.arange(25.0))
+    stats.clear()
+    stats.extend([3.0, 1.0])
+    assert stats.window(np.float64).tolist() == [3.0, 1.0] and stats.mean() == 2.0 and stats.min() == 1.0
+
+def test_empty_window_is_nan():
+    stats = RollingWindow(5)
+    assert all(math.isnan(v) for v in (stats.mean(), stats.var(), stats.min(), stats.max(), stats.last()))
+
+def test_drift_stays_bounded_before_resync():
+    """ A long stream around a large offset, ending just before a resync: the worst accumulated drift """
+    stream = 1e6 + np.random.default_rng(3).normal(0, 1, rolling_stats.RESYNC_EVERY * 10 - 1)
+    stats = RollingWindow(60)
+    stats.extend(stream)
+    assert math.isclose(stats.std(), stream[-60:].std(), rel_tol=1e-6)
+
+def test_resync_recomputes_exactly(monkeypatch):
+    monkeypatch.setattr(rolling_stats, 'RESYNC_EVERY', 1000)
+    stream = 1e6 + np.random.default_rng(4).normal(0, 1, 5000)
+    stats = RollingWindow(60)
+    stats.extend(stream)
+    window = stream[-60:]
+    assert stats._mean == float(window.mean())
+    assert stats._m2 == float(((window - window.mean()) ** 2).sum())
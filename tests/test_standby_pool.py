@@ -0,0 +1,147 @@
+import time
+import pytest
+import standby_pool
+from standby_pool import OWNER_LABEL, POOL_LABEL, StandbyPool
+
+SERVICE = 'web_app'
+
+class FakeContainer:
+    def __init__(self, labels, paused=False):
+        self.labels = labels
+        self.name = f"c{id(self)}"
+        self.attrs = {'State': {}}
+        self.paused = paused
+        self.removed = False
+
+    def reload(self):
+        pass
+
+    def pause(self):
+        self.paused = True
+
+    def unpause(self):
+        self.paused = False
+
+    def remove(self, force=False):
+        self.removed = True
+
+class FakeClient:
+    """ containers.run / containers.list (label filters ANDed, as the daemon does), services.get, networks.get """
+
+    def __init__(self, existing=()):
+        self.created = list(existing)
+        self.containers = self.services = self.networks = self
+        self.connected = []
+
+    def run(self, image, detach=True, environment=None, labels=None):
+        container = FakeContainer(labels)
+        self.created.append(container)
+        return container
+
+    def list(self, filters=None, **kwargs):
+        wanted = [label.split('=', 1) for label in filters['label']]
+        return [c for c in self.created if not c.removed and all(c.labels.get(k) == v for k, v in wanted)]
+
+    def get(self, name):
+        return self
+
+    @property
+    def attrs(self):
+        return {'Spec': {'TaskTemplate': {'ContainerSpec': {'Image': 'web:latest@sha256:abc'},
+                                          'Networks': [{'Target': 'pco_net'}]}}}
+
+    def connect(self, container, aliases=None):
+        self.connected.append((container, aliases))
+
+class FakeScaler:
+    def __init__(self, desired=1, running=1, converging=False):
+        self.desired_, self.running_, self.converging_ = desired, running, converging
+
+    def desired(self, name):
+        return self.desired_
+
+    def running(self, name):
+        return self.running_
+
+    def converging(self, name):
+        return self.converging_
+
+def make_pool(scaler=None, client=None, **kwargs):
+    return StandbyPool(client or FakeClient(), SERVICE, scaler or FakeScaler(), warmup=0, **kwargs)
+
+def fill(pool, n):
+    for _ in range(n):
+        pool._standby.append(pool._create())
+
+def test_follow_grows_at_once_and_shrinks_one_at_a_time(monkeypatch):
+    monkeypatch.setattr(standby_pool, 'SHRINK_AFTER', 3)
+    pool = make_pool(min_size=1, max_size=4)
+    pool.follow(3)
+    assert pool.target == 3
+    pool.follow(10)
+    assert pool.target == 4  # Clamped to max_size
+    for _ in range(2):
+        pool.follow(0)
+    assert pool.target == 4
+    pool.follow(0)
+    assert pool.target == 3  # One step after SHRINK_AFTER low ticks
+    pool.follow(1)
+    pool.follow(0)
+    pool.follow(3)  # At or above the target resets the low count
+    pool.follow(0)
+    pool.follow(0)
+    assert pool.target == 3
+    for _ in range(3 * 3):
+        pool.follow(-5)
+    assert pool.target == 1  # Never below min_size
+
+def test_standbys_are_labelled_attached_and_paused():
+    client = FakeClient()
+    pool = make_pool(client=client, owner='orchestrator')
+    fill(pool, 1)
+    container = pool._standby[0]
+    assert container.paused and client.connected == [(container, [SERVICE])]
+    assert container.labels[POOL_LABEL] == SERVICE and container.labels[OWNER_LABEL].endswith('-orchestrator')
+
+def test_promote_unpauses_up_to_the_pool():
+    pool = make_pool()
+    fill(pool, 2)
+    assert pool.promote(3, target_replicas=4) == 2
+    assert pool.size() == 0 and pool.promotions == 2
+    assert all(not c.paused for c, target, _ in pool._promoted) and {t for _, t, _ in pool._promoted} == {4}
+
+@pytest.mark.parametrize('scaler, retired', [
+    (FakeScaler(desired=3, running=3), True),                     # Replacement tasks running
+    (FakeScaler(desired=3, running=3, converging=True), False),   # Still converging
+    (FakeScaler(desired=3, running=2), False),                    # Not all running yet
+    (FakeScaler(desired=2, running=2, converging=True), True),    # A scale-down superseded the scale-up
+    (FakeScaler(desired=None, running=None), False),              # Service not reported: not settled
+])
+def test_handoff_retires_promoted_containers(scaler, retired):
+    pool = make_pool(scaler)
+    fill(pool, 1)
+    pool.promote(1, target_replicas=3)
+    container = pool._promoted[0][0]
+    pool._handoff()
+    assert container.removed == retired and len(pool._promoted) == (0 if retired else 1)
+
+def test_handoff_gives_up_after_the_timeout(monkeypatch):
+    pool = make_pool(FakeScaler(desired=3, running=1, converging=True))
+    fill(pool, 1)
+    pool.promote(1, target_replicas=3)
+    monkeypatch.setattr(standby_pool, 'HANDOFF_TIMEOUT', -1)
+    pool._handoff()
+    assert pool._promoted == []
+
+def test_leftovers_of_other_owners_are_kept():
+    client = FakeClient()
+    previous = make_pool(client=client, owner='orchestrator')
+    other = make_pool(client=client, owner='policy_host')
+    fill(previous, 2)
+    fill(other, 1)
+    other_service = FakeContainer({POOL_LABEL: 'api', OWNER_LABEL: previous.owner})
+    client.created.append(other_service)
+
+    make_pool(client=client, owner='orchestrator')._remove_leftovers()
+    assert all(c.removed for c in previous._standby)
+    assert not any(c.removed for c in other._standby) and not other_service.removed